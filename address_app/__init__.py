@@ -4,7 +4,12 @@ __all__ = [
     "__app_name__",
     "__version__",
     "AdbConnector",
+    "AsyncAdbConnector",
+    "ShardedAdbConnector",
+    "Follower",
     "get_supported_formats",
+    "get_supported_compressions",
+    "get_supported_storages",
     "get_logger",
     "set_logger_level",
 ]
@@ -12,4 +17,12 @@ __all__ = [
 # initialize logger
 from .base import get_logger, set_logger_level
 
-from .adb import AdbConnector, get_supported_formats
+from .adb import (
+    AdbConnector,
+    get_supported_formats,
+    get_supported_compressions,
+    get_supported_storages,
+)
+from .async_adb import AsyncAdbConnector
+from .sharded_adb import ShardedAdbConnector
+from .replication import Follower
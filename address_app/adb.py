@@ -1,40 +1,49 @@
-from typing import Optional, Union, Dict
+from functools import partial
+from typing import IO, Dict, Iterable, Optional, Union
 from pathlib import Path
 
 from .base import get_logger
-from .serialize import SerializeStrategyRegistry, get_supported_formats
-from .storage import DbFileSystemStorage
-from .database import DatabaseManager
-from .view import ViewerRegistry
+from .serialize import (
+    SerializeStrategyRegistry,
+    get_supported_formats,
+    get_supported_compressions,
+)
+from .storage import StorageFactory, get_supported_storages
+from .database import DatabaseManager, ChangeLog, RELATIVE_CHANGE_LOG_PATH
+from .view import ViewerRegistry, iter_books
+from .connector_pool import ConnectorPool
 
 logger = get_logger()
 
 
-class _SingletonRootMeta(type):
+class _PooledRootMeta(type):
     """
-    A metaclass for creating singleton instances based on a root path.
-    Singleton instances are created once per root path. If an instance with
-    the same root path (specified in any way) is requested again, the original instance is returned.
+    A metaclass pooling instances by root path. An instance is created once per root
+    path; requesting the same root path again (specified in any way) returns the
+    pooled instance, until the pool evicts it (see `ConnectorPool`).
+
+    The pool is unbounded by default. Processes serving many roots bound it with
+    `configure_pool`; creation is thread-safe, so two threads asking for a new root
+    get the same instance.
 
     Attributes:
-        _instances (dict): A dictionary holding instances, keyed by root path.
+        pool (ConnectorPool): The instances, keyed by resolved root path.
         _default_key (str): The default key used when no root path is specified.
 
     Usage example:
-        class RootPathSingleton(metaclass=_SingletonRootMeta):
+        class RootPathSingleton(metaclass=_PooledRootMeta):
             def __init__(self, root=None):
                 self.root = root or "default_path"
 
-        # Creating instances
         instance_a = RootPathSingleton("/path/to/root")
-        instance_b = RootPathSingleton("/path/to/root")  # This will return the same instance as instance_a
-        instance_c = RootPathSingleton()  # This will create a new instance with the default path
+        instance_b = RootPathSingleton("/path/to/root")  # Same instance as instance_a
+        instance_c = RootPathSingleton()  # A new instance with the default path
 
-        assert instance_a is instance_b  # True, because they refer to the same instance
-        assert instance_a is not instance_c  # True, because they are different instances
+        assert instance_a is instance_b
+        assert instance_a is not instance_c
     """
 
-    _instances = {}
+    pool = ConnectorPool()
     _default_key = "default"
 
     def __call__(cls, *args, **kwargs):
@@ -49,17 +58,22 @@ class _SingletonRootMeta(type):
         except Exception as e:
             logger.error(f"Invalid root path provided: {root_arg}. Using default.")
 
-        if key not in cls._instances:
-            cls._instances[key] = super().__call__(*args, **kwargs)
-        return cls._instances[key]
+        return cls.pool.get(key, partial(super().__call__, *args, **kwargs))
+
+    def configure_pool(
+        cls, max_size: Optional[int] = None, idle_ttl: Optional[float] = None
+    ):
+        """Bound the number of pooled instances and the time they stay pooled unused,
+        see `ConnectorPool`.
+        """
+        cls.pool.configure(max_size, idle_ttl)
 
-    @classmethod
     def clear_instances(cls):
-        """Utility method to clear instances, mainly for testing purposes."""
-        cls._instances.clear()
+        """Release all the pooled instances, mainly for testing purposes."""
+        cls.pool.clear()
 
 
-class AdbConnector(metaclass=_SingletonRootMeta):
+class AdbConnector(metaclass=_PooledRootMeta):
     """
     Provides functionality for managing address books with persistent storage.
 
@@ -68,18 +82,41 @@ class AdbConnector(metaclass=_SingletonRootMeta):
 
     Args:
         root (Optional[str]): The root directory for database storage. If not specified, a default location is used.
+        format (Optional[str]): The serialization format of the database file, see `get_supported_formats`,
+                optionally compressed, e.g. "json.gz" (see `get_supported_compressions`).
+        storage (Optional[str]): The storage kind, see `get_supported_storages`. Default is "filesystem".
+        **storage_options: Storage specific options, e.g. `durability="full"` or `group_commit=True`
+            for the filesystem storage, and `write_behind=True` (or a dict of WriteBehindStorage
+            options) to flush writes in the background, `shared_cache=True` to share the
+            loaded database with the other processes using the same storage file, and
+            `replicate=True` to log changes for followers (see `Follower`).
+        change_log (bool): Persist the change events of the database manager in
+            `<root>/adb/adb.changes`, for consumers in other processes (see `ChangeLog`).
 
     Methods are documented with their functionality.
     """
 
-    def __init__(self, root: Optional[str] = None, format: Optional[str] = "json"):
-        if format and format not in get_supported_formats():
+    def __init__(
+        self,
+        root: Optional[str] = None,
+        format: Optional[str] = "json",
+        storage: Optional[str] = "filesystem",
+        change_log: bool = False,
+        **storage_options,
+    ):
+        if format and not SerializeStrategyRegistry.is_supported(format):
             logger.warning(
                 f"Unsupported serialization format: {format}. Using default: json"
             )
         strategy = SerializeStrategyRegistry.get_strategy_for_extension(format)
-        self._storage = DbFileSystemStorage(strategy, root)
-        self._db_manager = DatabaseManager(self._storage)
+        self._storage = StorageFactory.create_storage(
+            storage, strategy, root, **storage_options
+        )
+        log = None
+        if change_log:
+            log_path = Path(self._storage.root_as_str()) / RELATIVE_CHANGE_LOG_PATH
+            log = ChangeLog(log_path)
+        self._db_manager = DatabaseManager(self._storage, log)
 
     @property
     def db_manager(self) -> DatabaseManager:
@@ -105,7 +142,7 @@ class AdbConnector(metaclass=_SingletonRootMeta):
     def storage_filepath(self) -> str:
         """
         Returns the file path for the database storage.
-        The actual database is stored in a file within the root directory: `<root>/adb/adb.pickle`.
+        The actual database is stored in a file within the root directory: `<root>/adb/adb.<format>`.
 
         Returns:
             str: The file path for the database storage.
@@ -119,7 +156,7 @@ class AdbConnector(metaclass=_SingletonRootMeta):
         Args:
             format (str): The format of the serialization strategy to use.
         """
-        if format not in get_supported_formats():
+        if not SerializeStrategyRegistry.is_supported(format):
             logger.warning(
                 f"Unsupported serialization format: {format}. Using default: json"
             )
@@ -127,18 +164,75 @@ class AdbConnector(metaclass=_SingletonRootMeta):
             SerializeStrategyRegistry.get_strategy_for_extension(format)
         )
 
-    def render(self, format: str = "html") -> Union[str, None]:
+    def render(
+        self,
+        format: str = "html",
+        books: Optional[Iterable[str]] = None,
+        offset: int = 0,
+        limit: Optional[int] = None,
+    ) -> Union[str, None]:
         """
-        Renders the database contents using the specified format.
+        Renders the database contents using the specified format. Renderings are
+        cached: while the database is unchanged it is returned as is, otherwise only
+        the books that changed are rendered again (see `ViewerRegistry.cache`).
 
         Args:
             format (str): The format to render the database contents in.
+            books (Optional[Iterable[str]]): The books to render, all by default.
+            offset (int): The number of books to skip, for paginated rendering.
+            limit (Optional[int]): The maximum number of books to render.
 
         Returns:
             Union[str, None]: The rendered database contents as a string, or None if rendering failed.
         """
-        return ViewerRegistry.render(self._storage.read(), format)
+        incarnation = self._storage.incarnation()
+        db = self._storage.read()
+        scope = self._storage.filepath_as_str()
+        return ViewerRegistry.render(
+            db, format, books, offset, limit, scope, incarnation
+        )
+
+    def render_to(
+        self,
+        file: IO[str],
+        format: str = "html",
+        books: Optional[Iterable[str]] = None,
+        offset: int = 0,
+        limit: Optional[int] = None,
+        workers: Optional[int] = 1,
+    ) -> Union[int, None]:
+        """
+        Renders the database contents into a text file, book by book and in chunks,
+        so the rendering is never held in memory whole, e.g. for large exports.
+
+        Args:
+            file (IO[str]): The file-like object to write to.
+            format (str): The format to render the database contents in.
+            books (Optional[Iterable[str]]): The books to render, all by default.
+            offset (int): The number of books to skip, for paginated rendering.
+            limit (Optional[int]): The maximum number of books to render.
+            workers (Optional[int]): The number of processes rendering the books in
+                parallel, all the CPUs if None. The default renders in this thread.
+
+        Returns:
+            Union[int, None]: The number of characters written, or None if rendering failed.
+        """
+        db = self._storage.read()
+        books = iter_books(db, books, offset, limit)
+        return ViewerRegistry.write(books, file, format, workers)
+
+    def flush(self) -> None:
+        """Writes changes buffered by the storage (e.g. in write-behind mode)."""
+        self._storage.flush()
+
+    def close(self) -> None:
+        """Writes buffered changes and releases the resources of the storage. The
+        connector leaves the pool: connecting to the root again creates a new one.
+        """
+        type(self).pool.discard(self)
+        self._storage.close()
 
     def delete(self) -> None:
         """Deletes the database storage file and its parent directory if it is empty."""
         self._storage.delete()
+        ViewerRegistry.cache.invalidate(self._storage.filepath_as_str())
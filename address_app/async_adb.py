@@ -0,0 +1,110 @@
+from typing import IO, Iterable, Optional, Union
+
+from .adb import AdbConnector
+from .database.async_db_manager import AsyncDatabaseManager
+
+
+class AsyncAdbConnector:
+    """
+    Asyncio interface to an AdbConnector: storage operations run in executors
+    instead of blocking the event loop (see `AsyncDatabaseManager`).
+
+    The connector wraps the `AdbConnector` of the same root, so synchronous and
+    asynchronous code can share a database. Creating it opens the storage, which
+    may read or create the storage file: create connectors at startup, or with
+    `await loop.run_in_executor(None, AsyncAdbConnector, root)` from a running loop.
+
+    Args:
+        root (Optional[str]): The root directory for database storage.
+        format (Optional[str]): The serialization format, see `AdbConnector`.
+        storage (Optional[str]): The storage kind, see `AdbConnector`.
+        max_workers (Optional[int]): Number of threads serving reads.
+        **storage_options: Storage specific options, see `AdbConnector`.
+
+    Example:
+        >>> async with AsyncAdbConnector("tests") as adb:
+        ...     await adb.db_manager.create_empty_book("Friends")
+        ...     books = await adb.db_manager.list_books()
+    """
+
+    def __init__(
+        self,
+        root: Optional[str] = None,
+        format: Optional[str] = "json",
+        storage: Optional[str] = "filesystem",
+        max_workers: Optional[int] = None,
+        **storage_options,
+    ):
+        self._connector = AdbConnector(root, format, storage, **storage_options)
+        self._db_manager = AsyncDatabaseManager(
+            self._connector.db_manager, max_workers
+        )
+
+    @property
+    def connector(self) -> AdbConnector:
+        """The synchronous connector."""
+        return self._connector
+
+    @property
+    def db_manager(self) -> AsyncDatabaseManager:
+        """Returns the asynchronous database manager."""
+        return self._db_manager
+
+    @property
+    def root(self) -> str:
+        """Returns the root path for the database storage."""
+        return self._connector.root
+
+    @property
+    def storage_filepath(self) -> str:
+        """Returns the file path for the database storage."""
+        return self._connector.storage_filepath
+
+    async def change_strategy(self, format: str) -> None:
+        """See `AdbConnector.change_strategy`. Runs after the pending writes."""
+        await self._db_manager.run_write(self._connector.change_strategy, format)
+
+    async def render(
+        self,
+        format: str = "html",
+        books: Optional[Iterable[str]] = None,
+        offset: int = 0,
+        limit: Optional[int] = None,
+    ) -> Union[str, None]:
+        """See `AdbConnector.render`."""
+        return await self._db_manager.run_read(
+            self._connector.render, format, books, offset, limit
+        )
+
+    async def render_to(
+        self,
+        file: IO[str],
+        format: str = "html",
+        books: Optional[Iterable[str]] = None,
+        offset: int = 0,
+        limit: Optional[int] = None,
+        workers: Optional[int] = 1,
+    ) -> Union[int, None]:
+        """See `AdbConnector.render_to`."""
+        return await self._db_manager.run_read(
+            self._connector.render_to, file, format, books, offset, limit, workers
+        )
+
+    async def flush(self) -> None:
+        """See `AdbConnector.flush`."""
+        await self._db_manager.run_write(self._connector.flush)
+
+    async def close(self) -> None:
+        """Writes buffered changes, then stops the executors of the connector."""
+        await self._db_manager.run_write(self._connector.close)
+        self._db_manager.shutdown(wait=False)
+
+    async def delete(self) -> None:
+        """See `AdbConnector.delete`."""
+        await self._db_manager.run_write(self._connector.delete)
+
+    async def __aenter__(self) -> "AsyncAdbConnector":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
@@ -12,3 +12,13 @@ DEFAULT_STORAGE_FULL_PATH = f"{DEFAULT_ROOT_PATH}/{RELATIVE_STORAGE_PATH}"
 
 #: Validation regex for phone number: 0-9, (), +, -, space and empty string
 VALIDATE_PHONE_NO_REGEX = re.compile(r"^(?:[0-9()\+\-\s]*|[\s]*)$")
+
+#: Durability of storage writes. Every level writes to a temporary file and atomically
+#: replaces the storage file, so a crash never leaves a half-written database.
+#: - "none": no fsync; the OS decides when data reaches the disk.
+#: - "fsync": the new file is fsynced before it replaces the old one.
+#: - "full": additionally fsyncs the directory, so the replacement itself survives a power loss.
+DURABILITY_NONE = "none"
+DURABILITY_FSYNC = "fsync"
+DURABILITY_FULL = "full"
+DURABILITY_LEVELS = (DURABILITY_NONE, DURABILITY_FSYNC, DURABILITY_FULL)
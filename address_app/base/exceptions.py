@@ -22,6 +22,88 @@ class AddressBookExistsException(AddressAppException):
         super().__init__(message)
 
 
+class AddressBookNotFoundException(AddressAppException):
+    title = "Address Book Not Found"
+
+    def __init__(self, book_name: str = None):
+        message = (
+            f"`{book_name}` not found" if book_name else "Address Book not found"
+        )
+        super().__init__(message)
+
+
+class ContactExistsException(AddressAppException):
+    title = "Contact Exists"
+
+    def __init__(self, contact: str, book_name: str):
+        message = f"Contact '{contact}' already exists in '{book_name}'"
+        super().__init__(message)
+
+
+class ContactNotFoundException(AddressAppException):
+    title = "Contact Not Found"
+
+    def __init__(self, contact: str):
+        message = f"Contact '{contact}' not found"
+        super().__init__(message)
+
+
+class InvalidBookNameException(AddressAppException):
+    title = "Invalid Book Name"
+
+    def __init__(self, book_name):
+        message = f"Invalid book name: {book_name!r}. Book names are non-empty strings."
+        super().__init__(message)
+
+
+# Storage
+class UnknownStorageException(AddressAppException):
+    title = "Storage Exception"
+
+    def __init__(self, name: str):
+        message = f"Storage {name} not found"
+        super().__init__(message)
+
+
+class MigrationException(AddressAppException):
+    title = "Migration Exception"
+
+    def __init__(self, source: str, target: str, reason: str):
+        message = f"Migration from {source} to {target} failed: {reason}"
+        super().__init__(message)
+
+
+class VersionConflictException(AddressAppException):
+    title = "Version Conflict"
+
+    def __init__(self, expected: int, actual: int):
+        message = (
+            f"The database changed since it was read: version {actual}, "
+            f"expected {expected}"
+        )
+        super().__init__(message)
+
+
+class BackupNotFoundException(AddressAppException):
+    title = "Backup Not Found"
+
+    def __init__(self, backup_dir: str, backup_id: Optional[str] = None):
+        message = (
+            f"Backup {backup_id} not found in {backup_dir}"
+            if backup_id
+            else f"No backup found in {backup_dir}"
+        )
+        super().__init__(message)
+
+
+class StorageClosedException(AddressAppException):
+    title = "Storage Closed"
+
+    def __init__(self, storage: str):
+        message = f"The {storage} storage is closed"
+        super().__init__(message)
+
+
 # Address Book Exceptions
 class InvalidContactDataException(AddressAppException):
     title = "Invalid Contact Data"
@@ -101,6 +183,12 @@ class NotImplementerSerializationException(SerializationException):
         super().__init__(message)
 
 
+class UnsupportedFormatVersionException(SerializationException):
+    def __init__(self, name: str, version: int):
+        message = f"{name} format version {version} is not supported"
+        super().__init__(message)
+
+
 # class FormatModuleNotInstalledException(SerializationException):
 #     def __init__(self, module_name: str):
 #         message = f"Failed to import module {module_name}. Please run `pip install -r requirements.txt`"
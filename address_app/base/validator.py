@@ -27,7 +27,10 @@ class ContactValidation:
         """Validate the phone number of a contact.
         It must include only digits, parentheses, plus sign, hyphen, space, or be empty.
         """
-        if phone_no is not None and not re.match(VALIDATE_PHONE_NO_REGEX, phone_no):
+        if phone_no is not None and (
+            not isinstance(phone_no, str)
+            or not re.match(VALIDATE_PHONE_NO_REGEX, phone_no)
+        ):
             raise InvalidContactPhoneNumberException(phone_no)
 
     @staticmethod
@@ -0,0 +1,204 @@
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from threading import Lock, RLock
+from typing import Callable, Dict, Hashable, List, Optional, TypeVar
+
+from .base import get_logger
+
+T = TypeVar("T")
+
+
+@dataclass
+class PoolStats:
+    """Counters of a ConnectorPool."""
+
+    hits: int = 0
+    misses: int = 0
+    #: Connectors released because the pool was full
+    evictions: int = 0
+    #: Connectors released because they were idle for longer than `idle_ttl`
+    expirations: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        requests = self.hits + self.misses
+        return self.hits / requests if requests else 0.0
+
+
+class _Entry:
+    __slots__ = ("connector", "last_used")
+
+    def __init__(self, connector, last_used: float):
+        self.connector = connector
+        self.last_used = last_used
+
+
+class ConnectorPool:
+    """Thread-safe pool of connectors by key (e.g. the resolved root path), with
+    least recently used eviction.
+
+    `get` returns the pooled connector of a key, creating it on first use. Concurrent
+    requests for the same key wait for a single creation, while connectors of other
+    keys are created in parallel. When the pool holds more than `max_size`
+    connectors, the least recently used ones are evicted; connectors unused for
+    `idle_ttl` seconds expire on the next access to the pool, or on `evict_idle`.
+    Evicted and expired connectors are closed, which writes their buffered changes
+    and releases their resources, e.g. the database held in memory by write-behind
+    or shared-cache storages.
+
+    A connector is only closed once it left the pool, but code still holding it may
+    be using it: get connectors from the pool for each unit of work rather than
+    keeping them.
+
+    Args:
+        max_size (Optional[int]): Maximum number of connectors, unbounded if None.
+        idle_ttl (Optional[float]): Seconds after which an unused connector expires,
+            never if None.
+        clock (Callable[[], float]): The time source of `idle_ttl`.
+    """
+
+    def __init__(
+        self,
+        max_size: Optional[int] = None,
+        idle_ttl: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self._max_size = max_size
+        self._idle_ttl = idle_ttl
+        self._clock = clock
+        self._lock = RLock()
+        self._entries: "OrderedDict[Hashable, _Entry]" = OrderedDict()
+        self._creating: Dict[Hashable, Lock] = {}
+        self.stats = PoolStats()
+
+    @property
+    def max_size(self) -> Optional[int]:
+        return self._max_size
+
+    @property
+    def idle_ttl(self) -> Optional[float]:
+        return self._idle_ttl
+
+    def configure(
+        self, max_size: Optional[int] = None, idle_ttl: Optional[float] = None
+    ):
+        """Change the limits of the pool, evicting connectors beyond them now."""
+        with self._lock:
+            self._max_size, self._idle_ttl = max_size, idle_ttl
+            released = self._expire() + self._evict()
+        self._release(released)
+
+    def get(self, key: Hashable, factory: Callable[[], T]) -> T:
+        """Return the connector of `key`, created with `factory()` if not pooled."""
+        with self._lock:
+            released = self._expire()
+            connector = self._hit(key)
+            if connector is None:
+                creating = self._creating.setdefault(key, Lock())
+        self._release(released)
+        if connector is not None:
+            return connector
+
+        with creating:
+            with self._lock:
+                connector = self._hit(key)
+            if connector is not None:
+                return connector
+            try:
+                connector = factory()
+            except BaseException:
+                with self._lock:
+                    self._creating.pop(key, None)
+                raise
+            with self._lock:
+                # Pop under the same acquisition as the insert, so a late
+                # arrival finds either the creation lock or the entry.
+                self._creating.pop(key, None)
+                self.stats.misses += 1
+                self._entries[key] = _Entry(connector, self._clock())
+                released = self._evict()
+        self._release(released)
+        return connector
+
+    def _hit(self, key: Hashable):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        self._entries.move_to_end(key)
+        entry.last_used = self._clock()
+        self.stats.hits += 1
+        return entry.connector
+
+    def _expire(self) -> list:
+        """Remove the expired entries and return their connectors. Called with the
+        lock held.
+        """
+        if self._idle_ttl is None:
+            return []
+        deadline = self._clock() - self._idle_ttl
+        expired = []
+        # Entries are kept in order of last use
+        while self._entries:
+            key, entry = next(iter(self._entries.items()))
+            if entry.last_used > deadline:
+                break
+            del self._entries[key]
+            expired.append(entry.connector)
+        self.stats.expirations += len(expired)
+        return expired
+
+    def _evict(self) -> list:
+        """Remove the least recently used entries beyond `max_size` and return their
+        connectors. Called with the lock held.
+        """
+        evicted = []
+        while self._max_size is not None and len(self._entries) > self._max_size:
+            _, entry = self._entries.popitem(last=False)
+            evicted.append(entry.connector)
+        self.stats.evictions += len(evicted)
+        return evicted
+
+    @staticmethod
+    def _release(connectors: List):
+        for connector in connectors:
+            try:
+                connector.close()
+            except Exception as e:
+                get_logger().error(f"Failed to close evicted connector: {e}")
+
+    def evict_idle(self) -> int:
+        """Release the connectors idle for longer than `idle_ttl`, return how many."""
+        with self._lock:
+            released = self._expire()
+        self._release(released)
+        return len(released)
+
+    def remove(self, key: Hashable):
+        """Remove the connector of `key` from the pool, without closing it."""
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def discard(self, connector):
+        """Remove `connector` from the pool, without closing it, e.g. because it is
+        being closed: the next `get` of its key creates a new one.
+        """
+        with self._lock:
+            for key, entry in list(self._entries.items()):
+                if entry.connector is connector:
+                    del self._entries[key]
+
+    def clear(self):
+        """Release every connector."""
+        with self._lock:
+            released = [entry.connector for entry in self._entries.values()]
+            self._entries.clear()
+        self._release(released)
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            return key in self._entries
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
@@ -1 +1,3 @@
 from .db_manager import DatabaseManager
+from .async_db_manager import AsyncDatabaseManager
+from .change_feed import ChangeEvent, ChangeLog, RELATIVE_CHANGE_LOG_PATH
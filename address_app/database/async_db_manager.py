@@ -0,0 +1,172 @@
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, List, Optional, Tuple, TypeVar, Union
+
+from .db_manager import DatabaseManager, BatchOperationTypeAlias
+from .db_schema import DbSchema
+from ..base.book import Book
+from ..base.contact import Contact
+from ..base.exceptions import AddressAppException
+
+T = TypeVar("T")
+
+#: Fields of a contact to add: name, address and phone number
+ContactFieldsTypeAlias = Tuple[str, str, str]
+
+
+class AsyncDatabaseManager:
+    """Asyncio interface to a DatabaseManager.
+
+    Storage operations block on file I/O and parsing, so they run in executors
+    owned by the manager and never on the event loop: reads in a pool of
+    `max_workers` threads, writes in a single thread, one at a time and in the order
+    they were awaited (several threads would race on the read-modify-write of
+    storages such as the filesystem one).
+
+    Writes are cancellation safe: once a write is awaited it runs to completion
+    even if the awaiting task is cancelled, so a cancelled request never leaves a
+    write half applied or silently dropped after the caller gave up on it. Reads are
+    cancelled along with the task if they did not start yet.
+
+    Args:
+        manager (DatabaseManager): The manager to run the operations of.
+        max_workers (Optional[int]): Number of threads serving reads. Default is the
+            `ThreadPoolExecutor` default.
+    """
+
+    def __init__(self, manager: DatabaseManager, max_workers: Optional[int] = None):
+        self._manager = manager
+        self._readers = ThreadPoolExecutor(max_workers, "adb-read")
+        self._writer = ThreadPoolExecutor(1, "adb-write")
+
+    @property
+    def manager(self) -> DatabaseManager:
+        """The synchronous manager."""
+        return self._manager
+
+    async def _read(self, function: Callable[..., T], *args, **kwargs) -> T:
+        loop = asyncio.get_running_loop()
+        call = functools.partial(function, *args, **kwargs)
+        return await loop.run_in_executor(self._readers, call)
+
+    async def _write(self, function: Callable[..., T], *args, **kwargs) -> T:
+        loop = asyncio.get_running_loop()
+        call = functools.partial(function, *args, **kwargs)
+        return await asyncio.shield(loop.run_in_executor(self._writer, call))
+
+    async def get_database_content(self) -> DbSchema:
+        """See `DatabaseManager.get_database_content`."""
+        return await self._read(self._manager.get_database_content)
+
+    async def list_books(self) -> List[Book]:
+        """See `DatabaseManager.list_books`."""
+        return await self._read(self._manager.list_books)
+
+    async def get_book(self, name: str) -> Union[Book, None]:
+        """See `DatabaseManager.get_book`."""
+        return await self._read(self._manager.get_book, name)
+
+    async def get_books(self, names: Iterable[str]) -> Dict[str, Union[Book, None]]:
+        """Get several books at once.
+
+        Returns:
+            Dict[str, Union[Book, None]]: The books by name, None for missing books.
+        """
+        names = list(names)
+        books = await asyncio.gather(*(self.get_book(name) for name in names))
+        return dict(zip(names, books))
+
+    async def add_book(self, book: Book) -> bool:
+        """See `DatabaseManager.add_book`."""
+        return await self._write(self._manager.add_book, book)
+
+    async def create_empty_book(self, name: str) -> bool:
+        """See `DatabaseManager.create_empty_book`."""
+        return await self._write(self._manager.create_empty_book, name)
+
+    async def add_contact(
+        self, book_name: str, name: str, address: str, phoneno: str
+    ) -> Union[Contact, None]:
+        """See `DatabaseManager.add_contact`."""
+        return await self._write(
+            self._manager.add_contact, book_name, name, address, phoneno
+        )
+
+    async def add_contacts(
+        self, book_name: str, contacts: Iterable[ContactFieldsTypeAlias]
+    ) -> List[Union[Contact, None]]:
+        """Add several contacts to a book with a single storage write, see
+        `apply_batch`.
+
+        Args:
+            book_name (str): The name of the book to add the contacts to.
+            contacts (Iterable[ContactFieldsTypeAlias]): The name, address and phone
+                number of every contact.
+
+        Returns:
+            List[Union[Contact, None]]: The added contacts, None for the contacts
+                that are invalid or already in the book, or if there is no such book.
+        """
+        results = await self.apply_batch(
+            ("add_contact", book_name, *fields) for fields in contacts
+        )
+        return [
+            None if isinstance(result, AddressAppException) else result
+            for result in results
+        ]
+
+    async def update_contact(
+        self, name: str, address: str, phoneno: str
+    ) -> Union[Contact, None]:
+        """See `DatabaseManager.update_contact`."""
+        return await self._write(self._manager.update_contact, name, address, phoneno)
+
+    async def list_contacts(self, book_name: str) -> List[Contact]:
+        """See `DatabaseManager.list_contacts`."""
+        return await self._read(self._manager.list_contacts, book_name)
+
+    async def find_contacts(self, book_name: str, **criteria) -> List[Contact]:
+        """See `DatabaseManager.find_contacts`."""
+        return await self._read(self._manager.find_contacts, book_name, **criteria)
+
+    async def find_contacts_many(
+        self, queries: Iterable[Tuple[str, Dict[str, str]]]
+    ) -> List[List[Contact]]:
+        """Run several `find_contacts` queries concurrently.
+
+        Args:
+            queries (Iterable[Tuple[str, Dict[str, str]]]): Book name and criteria of
+                every query.
+
+        Returns:
+            List[List[Contact]]: The matching contacts of each query, in order.
+        """
+        return list(
+            await asyncio.gather(
+                *(self.find_contacts(book, **criteria) for book, criteria in queries)
+            )
+        )
+
+    async def apply_batch(
+        self, operations: Iterable[BatchOperationTypeAlias]
+    ) -> List[Union[Book, Contact, AddressAppException]]:
+        """See `DatabaseManager.apply_batch`."""
+        return await self._write(self._manager.apply_batch, list(operations))
+
+    async def clear_database(self):
+        """See `DatabaseManager.clear_database`."""
+        await self._write(self._manager.clear_database)
+
+    async def run_read(self, function: Callable[..., T], *args, **kwargs) -> T:
+        """Run a blocking read, e.g. of the storage, in the reader pool."""
+        return await self._read(function, *args, **kwargs)
+
+    async def run_write(self, function: Callable[..., T], *args, **kwargs) -> T:
+        """Run a blocking write in the writer thread, after the pending writes."""
+        return await self._write(function, *args, **kwargs)
+
+    def shutdown(self, wait: bool = True):
+        """Stop the executors once the submitted operations are done."""
+        self._readers.shutdown(wait)
+        self._writer.shutdown(wait)
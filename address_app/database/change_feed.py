@@ -0,0 +1,187 @@
+import json
+import os
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from dataclasses import dataclass, field, fields
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Tuple, Type
+
+from .db_schema import BookContactIdsTypeAlias, ContactDictTypeAlias
+from ..base.consts import RELATIVE_STORAGE_PATH
+from ..storage.locks import FileLock
+from ..storage.replication import read_entries, read_last_entry
+
+#: Change log of a database, relative to its root, see `AdbConnector`
+RELATIVE_CHANGE_LOG_PATH = f"{RELATIVE_STORAGE_PATH}.changes"
+
+
+class ChangeEvent(ABC):
+    """A change of the database, emitted by `DatabaseManager` (see `subscribe`).
+
+    Events are dataclasses registered under their `kind`, which is also their
+    `"type"` in the change log.
+    """
+
+    _events: Dict[str, Type["ChangeEvent"]] = {}
+
+    #: Position in the change log, 0 if the event was not logged
+    seq = 0
+    #: Time the event was emitted, in seconds since the epoch
+    ts = 0.0
+
+    @classmethod
+    @abstractmethod
+    def kind(cls) -> str:
+        """Return the name the event is registered under, e.g. "book_created"."""
+        pass
+
+    @classmethod
+    def register_event(cls, event: Type["ChangeEvent"]) -> Type["ChangeEvent"]:
+        cls._events[event.kind()] = event
+        return event
+
+    def as_dict(self) -> dict:
+        entry = {"seq": self.seq, "ts": self.ts, "type": self.kind()}
+        entry.update((f.name, getattr(self, f.name)) for f in fields(self))
+        return entry
+
+    @classmethod
+    def from_dict(cls, entry: dict) -> "ChangeEvent":
+        event_class = cls._events[entry["type"]]
+        event = event_class(**{f.name: entry[f.name] for f in fields(event_class)})
+        event.seq, event.ts = entry["seq"], entry["ts"]
+        return event
+
+
+@ChangeEvent.register_event
+@dataclass
+class BookCreated(ChangeEvent):
+    book: str
+    contact_ids: BookContactIdsTypeAlias = field(default_factory=list)
+
+    @classmethod
+    def kind(cls) -> str:
+        return "book_created"
+
+
+@ChangeEvent.register_event
+@dataclass
+class BookRemoved(ChangeEvent):
+    book: str
+
+    @classmethod
+    def kind(cls) -> str:
+        return "book_removed"
+
+
+@ChangeEvent.register_event
+@dataclass
+class ContactAdded(ChangeEvent):
+    """A contact was added to a book, and to the database if it was in no book."""
+
+    book: str
+    contact_id: int
+    contact: ContactDictTypeAlias
+
+    @classmethod
+    def kind(cls) -> str:
+        return "contact_added"
+
+
+@ChangeEvent.register_event
+@dataclass
+class ContactUpdated(ChangeEvent):
+    """The details of a contact changed, in every book it is in."""
+
+    contact_id: int
+    contact: ContactDictTypeAlias
+
+    @classmethod
+    def kind(cls) -> str:
+        return "contact_updated"
+
+
+@ChangeEvent.register_event
+@dataclass
+class ContactRemoved(ChangeEvent):
+    """A contact left the database, e.g. with the last book it was in."""
+
+    contact_id: int
+
+    @classmethod
+    def kind(cls) -> str:
+        return "contact_removed"
+
+
+class ChangeLog:
+    """Persisted change feed: the events of a database, one JSON object per line,
+    numbered by `seq` in the order they were logged.
+
+    Consumers keep the byte offset returned by `read` and pass it back to get only
+    the later events, so catching up costs in proportion to the changes. The log is
+    shared by the processes using the database; appends are serialized by a lock
+    file next to it, which `DatabaseManager` also holds while writing the changes.
+
+    Args:
+        path (Path): The log file.
+        fsync (bool): Flush every append to the disk before returning.
+    """
+
+    def __init__(self, path: Path, fsync: bool = True):
+        self._path = Path(path)
+        self._fsync = fsync
+        self._lock = FileLock(self._path.with_name(self._path.name + ".lock"))
+
+    @property
+    def path(self) -> Path:
+        return self._path
+
+    @property
+    def last_seq(self) -> int:
+        """The sequence number of the last event, 0 if the log is empty."""
+        last = read_last_entry(self._path)
+        return last["seq"] if last else 0
+
+    @contextmanager
+    def appending(self) -> Iterator[Callable[[List[ChangeEvent]], None]]:
+        """Hold the lock of the log and yield a function appending events. Holding
+        it across a change of the database and the append of its events keeps the
+        log in the order the changes were made, across threads and processes.
+        """
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        with self._lock.exclusive():
+            yield self._append
+
+    def append(self, events: List[ChangeEvent]):
+        """Number the events and write them at the end of the log."""
+        if events:
+            with self.appending() as append:
+                append(events)
+
+    def _append(self, events: List[ChangeEvent]):
+        """Called with the lock held."""
+        seq = self.last_seq
+        lines = []
+        for event in events:
+            seq += 1
+            event.seq = seq
+            lines.append(json.dumps(event.as_dict(), separators=(",", ":")))
+        with open(self._path, "a", encoding="utf-8") as file:
+            file.write("\n".join(lines) + "\n")
+            file.flush()
+            if self._fsync:
+                os.fsync(file.fileno())
+
+    def read(self, offset: int = 0) -> Tuple[List[ChangeEvent], int]:
+        """Return the events logged from byte `offset` on, and the offset to read
+        the next ones from.
+        """
+        events = []
+        for entry, offset in read_entries(self._path, offset):
+            events.append(ChangeEvent.from_dict(entry))
+        return events, offset
+
+    def __iter__(self) -> Iterator[ChangeEvent]:
+        for entry, _ in read_entries(self._path):
+            yield ChangeEvent.from_dict(entry)
+
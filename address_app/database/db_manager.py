@@ -1,49 +1,150 @@
-from typing import Union, List
-from dataclasses import dataclass
-import fnmatch
+import time
+from contextlib import contextmanager, nullcontext
+from threading import Lock
+from typing import Callable, Iterable, Iterator, List, Optional, Tuple, Union
 
 from ..base import get_logger
-from .db_schema import DbSchema, DbBooksTypeAlias
+from .change_feed import (
+    BookCreated,
+    BookRemoved,
+    ChangeEvent,
+    ChangeLog,
+    ContactAdded,
+    ContactRemoved,
+    ContactUpdated,
+)
+from .db_schema import DbSchema
 from ..base.book import Book
 from ..base.contact import Contact
 from ..base.validator import ContactValidation
-from ..base.exceptions import InvalidContactDataException
+from ..base.exceptions import (
+    AddressAppException,
+    InvalidContactDataException,
+    AddressBookExistsException,
+    AddressBookNotFoundException,
+    ContactExistsException,
+    ContactNotFoundException,
+    InvalidBookNameException,
+)
 from ..storage.base_storage import IStorage
 
 logger = get_logger()
 
+#: A change applied by `DatabaseManager.apply_batch`: `("add_book", name)`,
+#: `("add_contact", book_name, name, address, phoneno)`, `("remove_book", name)` or
+#: `("update_contact", name, address, phoneno)`
+BatchOperationTypeAlias = Tuple
+
+#: Receives the events of the changes made through a DatabaseManager
+ObserverTypeAlias = Callable[[ChangeEvent], None]
 
-class DatabaseManager:
-    """DatabaseManager class for managing the database."""
 
-    def __init__(self, storage: IStorage):
+class DatabaseManager:
+    """DatabaseManager class for managing the database.
+
+    Every change made through the manager is described by events (see
+    `change_feed`): books created and removed, contacts added, updated and removed.
+    Once the change is written, its events are appended to the change log, if
+    any, then passed to the observers registered with `subscribe`, in the thread
+    that made the change. With a change log, writes hold its lock (see
+    `ChangeLog.appending`), so every process writing to the database must log its
+    changes for the log to be complete.
+    """
+
+    def __init__(self, storage: IStorage, change_log: Optional[ChangeLog] = None):
         """Initialize the DatabaseManager with a storage object.
 
         Args:
             storage (IStorage): The storage object to use for database operations.
+            change_log (Optional[ChangeLog]): Where to persist the change events,
+                for consumers in other processes.
 
         """
         self._storage = storage
+        self._change_log = change_log
+        self._observers: List[ObserverTypeAlias] = []
+        self._observers_lock = Lock()
+
+    @property
+    def change_log(self) -> Optional[ChangeLog]:
+        """The persisted change events, if enabled."""
+        return self._change_log
+
+    def subscribe(self, observer: ObserverTypeAlias) -> Callable[[], None]:
+        """Call `observer` with the event of every later change.
+
+        Observers run in the thread that made the change, after it was written;
+        exceptions they raise are logged and do not affect the change.
+
+        Returns:
+            Callable[[], None]: Unsubscribes the observer.
+
+        Example:
+            >>> unsubscribe = dbm.subscribe(print)
+            >>> dbm.create_empty_book("TestBook")
+            BookCreated(book='TestBook', contact_ids=[])
+            >>> unsubscribe()
+        """
+        with self._observers_lock:
+            self._observers.append(observer)
+
+        def unsubscribe():
+            with self._observers_lock:
+                if observer in self._observers:
+                    self._observers.remove(observer)
+
+        return unsubscribe
+
+    @contextmanager
+    def _changing(self) -> Iterator[List[ChangeEvent]]:
+        """Collect the events of the change made in the block, then log them and
+        pass them to the observers. The lock of the change log is held across the
+        change and the append, so the log is in the order the changes were written,
+        whatever the process writing them. Nothing is emitted if the block raises.
+        """
+        events: List[ChangeEvent] = []
+        log = self._change_log
+        with log.appending() if log is not None else nullcontext() as append:
+            yield events
+            now = time.time()
+            for event in events:
+                event.ts = now
+            if append is not None and events:
+                append(events)
+        self._notify(events)
+
+    def _notify(self, events: List[ChangeEvent]):
+        if not events:
+            return
+        with self._observers_lock:
+            observers = list(self._observers)
+        for observer in observers:
+            for event in events:
+                try:
+                    observer(event)
+                except Exception as e:
+                    logger.error(f"Change observer failed on {event.kind()}: {e}")
 
     def get_database_content(self) -> DbSchema:
         """Get the database contents.
 
         Returns:
-            DbSchema: The database contents.
+            DbSchema: A read-only snapshot of the database contents, unaffected by
+                later changes (see `DbSchema.freeze`).
 
         """
-        return self._storage.read()
+        return self._storage.snapshot()
 
-    def list_books(self) -> DbBooksTypeAlias:
+    def list_books(self) -> List[Book]:
         """List all books in the database.
 
         Returns:
-            Dict[str, List[int]]: A list of all books in the database.
+            List[Book]: A list of all books in the database.
 
         """
-        db_contents = self._storage.read()
         return [
-            Book(name, contact_ids) for name, contact_ids in db_contents.books.items()
+            Book(name, list(contact_ids))
+            for name, contact_ids in self._storage.read_books().items()
         ]
 
     def get_book(self, name: str) -> Union[Book, None]:
@@ -56,11 +157,10 @@ class DatabaseManager:
             Union[Book, None]: The book if found, otherwise None.
 
         """
-        books = self.list_books()
-        for book in books:
-            if book.name == name:
-                return book
-        return None
+        contact_ids = self._storage.read_book(name)
+        if contact_ids is None:
+            return None
+        return Book(name, list(contact_ids))
 
     def add_book(self, book: Book) -> bool:
         """Add a book to the database.
@@ -72,17 +172,18 @@ class DatabaseManager:
             bool: True if the book was added, False if it already exists.
 
         """
-        if self.get_book(book.name) is not None:
-            logger.warning(f"Book '{book.name}' already exists.")
-            return False
-        db_contents = self._storage.read()
-        db_contents.books[book.name] = book.contacts
-        self._storage.write(db_contents)
+        with self._changing() as events:
+            try:
+                self._storage.add_book(book.name, book.contacts)
+            except AddressBookExistsException:
+                logger.warning(f"Book '{book.name}' already exists.")
+                return False
+            events.append(BookCreated(book.name, list(book.contacts)))
         return True
 
     def create_empty_book(self, name: str) -> bool:
         """Create an empty book with the specified name."""
-        self.add_book(Book(name))
+        return self.add_book(Book(name, []))
 
     def add_contact(
         self, book_name: str, name: str, address: str, phoneno: str
@@ -111,26 +212,33 @@ class DatabaseManager:
             logger.warning(f"Invalid contact data: {e.message}")
             return
 
-        book = self.get_book(book_name)
-        if book is None:
-            logger.warning(f"Book '{book_name}' not found.")
-            return
-
-        db_contents = self._storage.read()
         contact = Contact(name, address, phoneno)
+        with self._changing() as events:
+            try:
+                self._storage.add_contact(book_name, contact.id, contact.as_dict())
+            except AddressBookNotFoundException:
+                logger.warning(f"Book '{book_name}' not found.")
+                return
+            except ContactExistsException:
+                logger.warning(f"Contact '{contact}' already exists in '{book_name}'")
+                return
+            events.append(ContactAdded(book_name, contact.id, contact.as_dict()))
+        return contact
 
-        # Add Contact to Book
-        if book.contact_exists(contact.id):
-            logger.warning(f"Contact '{contact}' already exists in '{book_name}'")
-            return
-        book.add_record(contact)
-        if contact.id not in db_contents.contacts:
-            db_contents.contacts[contact.id] = contact.as_dict()
+    def update_contact(
+        self, name: str, address: str, phoneno: str
+    ) -> Union[Contact, None]:
+        """Change the phone number of a contact, in every book it is in. Contacts
+        are identified by their name and address, see `Contact.id`.
 
-        # Save the updated book and contact
-        db_contents.books[book_name] = book.contacts
-        self._storage.write(db_contents)
-        return contact
+        Returns:
+            Union[Contact, None]: The updated contact if successful, otherwise None.
+        """
+        (result,) = self.apply_batch([("update_contact", name, address, phoneno)])
+        if isinstance(result, AddressAppException):
+            logger.warning(f"Contact not updated: {result.message}")
+            return None
+        return result
 
     def list_contacts(self, book_name: str) -> List[Contact]:
         """List all contacts in a book.
@@ -148,14 +256,11 @@ class DatabaseManager:
             >>> dbm.list_contacts("TestBook")
             [Contact(name='John Doe', address='123 Elm St', phone_no='555-6789')]
         """
-        book = self.get_book(book_name)
-        if book is None:
+        contacts = self._storage.read_book_contacts(book_name)
+        if contacts is None:
             logger.warning(f"Book '{book_name}' not found.")
             return []
-        db_contents = self._storage.read()
-        return [
-            Contact(**db_contents.contacts[contact_id]) for contact_id in book.contacts
-        ]
+        return [Contact(**info) for info in contacts]
 
     def find_contacts(self, book_name: str, **criteria) -> List[Contact]:
         """Find contacts in the specified book that match the criteria.
@@ -163,6 +268,7 @@ class DatabaseManager:
         Args:
             book_name (str): The name of the book to search.
             **criteria: Key-value pairs of contact attributes to match.
+                Values are glob patterns, e.g. `name="John*"`.
 
         Returns:
             List[Contact]: A list of contacts that match the criteria.
@@ -176,17 +282,165 @@ class DatabaseManager:
             >>> dbm.find_contacts("TestBook", address="123 Elm St")
             [Contact(name='John Doe', address='123 Elm St', phone_no='555-6789')]
         """
-        contacts = self.list_contacts(book_name)
-        return [
-            contact
-            for contact in contacts
-            if all(
-                fnmatch.fnmatch(str(getattr(contact, key)), value)
-                for key, value in criteria.items()
-            )
-        ]
+        contacts = self._storage.find_contacts(book_name, criteria)
+        if contacts is None:
+            logger.warning(f"Book '{book_name}' not found.")
+            return []
+        return [Contact(**info) for info in contacts]
+
+    def apply_batch(
+        self, operations: Iterable[BatchOperationTypeAlias]
+    ) -> List[Union[Book, Contact, AddressAppException]]:
+        """Apply several changes with a single read and a single write of the storage.
+
+        Operations are applied in order, each seeing the changes of the previous
+        ones. An operation that fails does not change anything and does not stop the
+        others: its exception is returned in its place instead of being raised. If
+        another writer changes the database meanwhile, the whole batch is applied
+        again to the new data (see `IStorage.update`).
+
+        Args:
+            operations (Iterable[BatchOperationTypeAlias]): `("add_book", name)`,
+                `("add_contact", book_name, name, address, phoneno)` or
+                `("remove_book", name)` tuples.
+
+        Returns:
+            List[Union[Book, Contact, AddressAppException]]: The added or removed
+                book, or the added contact, of each operation, or the reason it
+                failed.
+
+        Example:
+            >>> dbm.apply_batch([("add_book", "Work"), ("add_book", "Work")])
+            [AddressBook(name=Work, (0 contacts)), AddressBookExistsException(...)]
+        """
+        operations = list(operations)
+        for operation in operations:
+            if operation[0] not in _BATCH_OPERATIONS:
+                raise ValueError(f"Unknown batch operation: {operation[0]}")
+        results = []
+
+        def apply_all(db_contents: DbSchema) -> bool:
+            # Applied again from scratch if another writer changed the database
+            results.clear()
+            events.clear()
+            for operation in operations:
+                apply = _BATCH_OPERATIONS[operation[0]]
+                try:
+                    result = apply(db_contents, *operation[1:])
+                except AddressAppException as e:
+                    results.append(e)
+                    continue
+                results.append(result)
+                events.extend(_batch_events(operation, result, db_contents))
+            return bool(events)
+
+        with self._changing() as events:
+            self._storage.update(apply_all)
+        return results
+
+    def remove_book(self, name: str) -> bool:
+        """Remove a book, and the contacts that are in no other book.
+
+        Args:
+            name (str): The name of the book to remove.
+
+        Returns:
+            bool: True if the book was removed, False if there is no such book.
+
+        """
+        (result,) = self.apply_batch([("remove_book", name)])
+        if isinstance(result, AddressBookNotFoundException):
+            logger.warning(f"Book '{name}' not found.")
+            return False
+        return True
 
     def clear_database(self):
         """Clear the database."""
-        self._storage.write(DbSchema())
+
+        def clear(db_contents: DbSchema) -> bool:
+            events[:] = [BookRemoved(name) for name in db_contents.books]
+            events.extend(ContactRemoved(cid) for cid in db_contents.contacts)
+            db_contents.books.clear()
+            db_contents.contacts.clear()
+            return True
+
+        with self._changing() as events:
+            self._storage.update(clear)
         logger.info("Database cleared.")
+
+
+def _add_book(db_contents: DbSchema, name: str) -> Book:
+    # Checked here, as a bad name would fail the write of the whole batch
+    if not isinstance(name, str) or not name.strip():
+        raise InvalidBookNameException(name)
+    if name in db_contents.books:
+        raise AddressBookExistsException(name)
+    db_contents.books[name] = []
+    return Book(name, [])
+
+
+def _add_contact(
+    db_contents: DbSchema, book_name: str, name: str, address: str, phoneno: str
+) -> Contact:
+    ContactValidation.validate_contact(name, address, phoneno)
+    contact = Contact(name, address, phoneno)
+    contact_ids = db_contents.books.get(book_name)
+    if contact_ids is None:
+        raise AddressBookNotFoundException(book_name)
+    if contact.id in contact_ids:
+        raise ContactExistsException(name, book_name)
+    if contact.id not in db_contents.contacts:
+        db_contents.contacts[contact.id] = contact.as_dict()
+    db_contents.books[book_name] = list(contact_ids) + [contact.id]
+    return contact
+
+
+def _remove_book(db_contents: DbSchema, name: str) -> Book:
+    contact_ids = db_contents.books.get(name)
+    if contact_ids is None:
+        raise AddressBookNotFoundException(name)
+    del db_contents.books[name]
+    orphans = set(contact_ids)
+    for ids in db_contents.books.values():
+        orphans.difference_update(ids)
+    for contact_id in orphans:
+        db_contents.contacts.pop(contact_id, None)
+    return Book(name, list(contact_ids))
+
+
+def _update_contact(
+    db_contents: DbSchema, name: str, address: str, phoneno: str
+) -> Contact:
+    ContactValidation.validate_contact(name, address, phoneno)
+    contact = Contact(name, address, phoneno)
+    if contact.id not in db_contents.contacts:
+        raise ContactNotFoundException(name)
+    db_contents.contacts[contact.id] = contact.as_dict()
+    return contact
+
+
+_BATCH_OPERATIONS = {
+    "add_book": _add_book,
+    "add_contact": _add_contact,
+    "remove_book": _remove_book,
+    "update_contact": _update_contact,
+}
+
+
+def _batch_events(
+    operation: BatchOperationTypeAlias,
+    result: Union[Book, Contact],
+    db_contents: DbSchema,
+) -> List[ChangeEvent]:
+    """Return the events of a batch operation, right after it was applied."""
+    kind = operation[0]
+    if kind == "add_book":
+        return [BookCreated(result.name)]
+    if kind == "add_contact":
+        # The stored details: a contact already in another book is kept as is
+        info = dict(db_contents.contacts[result.id])
+        return [ContactAdded(operation[1], result.id, info)]
+    if kind == "remove_book":
+        orphans = [cid for cid in result.contacts if cid not in db_contents.contacts]
+        return [BookRemoved(result.name)] + [ContactRemoved(cid) for cid in orphans]
+    return [ContactUpdated(result.id, result.as_dict())]
@@ -1,4 +1,9 @@
-from typing import Dict, List
+import hashlib
+import json
+import operator
+from collections.abc import Mapping
+from types import MappingProxyType
+from typing import Dict, List, Mapping as MappingType, Optional, Tuple, Union
 from dataclasses import dataclass, field
 
 ContactDictTypeAlias = Dict[str, str]
@@ -8,6 +13,115 @@ DbContactsTypeAlias = Dict[int, ContactDictTypeAlias]
 DbBooksTypeAlias = Dict[str, BookContactIdsTypeAlias]
 
 
+class FrozenDict(dict):
+    """Read-only dict, used for snapshots (see `DbSchema.freeze`). Being a dict, it is
+    serialized like one.
+    """
+
+    def _read_only(self, *args, **kwargs):
+        raise TypeError(f"{type(self).__name__} is read-only")
+
+    __setitem__ = __delitem__ = __ior__ = _read_only
+    clear = pop = popitem = setdefault = update = _read_only
+
+    def __reduce__(self):
+        return type(self), (dict(self),)
+
+
+def _freeze_container(mapping: Mapping, freeze_value) -> Mapping:
+    if not isinstance(mapping, dict):
+        # Lazily loaded (see IndexedStrategy): values are decoded on access from
+        # data that is never modified
+        return MappingProxyType(mapping)
+    return FrozenDict(
+        (key, value if isinstance(value, (FrozenDict, tuple)) else freeze_value(value))
+        for key, value in mapping.items()
+    )
+
+
+def _fingerprint(value) -> str:
+    encoded = json.dumps(value, separators=(",", ":")).encode("utf-8")
+    return hashlib.blake2b(encoded, digest_size=16).hexdigest()
+
+
+def contact_fingerprint(info: ContactDictTypeAlias) -> str:
+    """Structural fingerprint of a contact: equal for contacts with equal fields,
+    whatever their order.
+    """
+    return _fingerprint(sorted(info.items()))
+
+
+def book_fingerprint(contact_ids: BookContactIdsTypeAlias) -> str:
+    """Structural fingerprint of the contact ids of a book, in order."""
+    return _fingerprint(list(contact_ids))
+
+
+def _same_ids(old: BookContactIdsTypeAlias, new: BookContactIdsTypeAlias) -> bool:
+    # Snapshots hold tuples rather than lists
+    return list(old) == list(new)
+
+
+def _diff_keys(old: Mapping, new: Mapping, same=operator.eq) -> Tuple[list, list, list]:
+    added = [key for key in new if key not in old]
+    removed = [key for key in old if key not in new]
+    changed = [key for key in new if key in old and not same(old[key], new[key])]
+    return added, removed, changed
+
+
+@dataclass
+class SchemaDiff:
+    """Contacts (by id) and books (by name) added, removed or changed between two
+    DbSchema objects, see `DbSchema.diff`. A diff is false when there is no change.
+    """
+
+    added_contacts: List[int] = field(default_factory=list)
+    removed_contacts: List[int] = field(default_factory=list)
+    changed_contacts: List[int] = field(default_factory=list)
+    added_books: List[str] = field(default_factory=list)
+    removed_books: List[str] = field(default_factory=list)
+    changed_books: List[str] = field(default_factory=list)
+
+    @classmethod
+    def between(
+        cls,
+        old_contacts: Mapping,
+        new_contacts: Mapping,
+        old_books: Mapping,
+        new_books: Mapping,
+        same_book=operator.eq,
+    ) -> "SchemaDiff":
+        """Diff mappings of contacts and books by id and name. Values are compared
+        with `==` (or `same_book(old, new)` for books), so they may be the contacts
+        and books or their fingerprints.
+        """
+        added_contacts, removed_contacts, changed_contacts = _diff_keys(
+            old_contacts, new_contacts
+        )
+        added_books, removed_books, changed_books = _diff_keys(
+            old_books, new_books, same_book
+        )
+        return cls(
+            added_contacts,
+            removed_contacts,
+            changed_contacts,
+            added_books,
+            removed_books,
+            changed_books,
+        )
+
+    def __bool__(self) -> bool:
+        return any(
+            (
+                self.added_contacts,
+                self.removed_contacts,
+                self.changed_contacts,
+                self.added_books,
+                self.removed_books,
+                self.changed_books,
+            )
+        )
+
+
 @dataclass
 class DbSchema:
     """
@@ -25,6 +139,9 @@ class DbSchema:
         books (Dict[str, List[int]]): A dictionary where each key is the name of an
             address book (a string), and each value is a list of IDs (integers) of
             contacts contained within that address book.
+        version (Optional[int]): The version of the stored database this schema was
+            read from, set by storages that support compare-and-swap writes (see
+            `IStorage.update`). It is not part of the data and not serialized.
 
     Example Usage:
         >>> schema = DbSchema()
@@ -56,12 +173,111 @@ class DbSchema:
 
     contacts: DbContactsTypeAlias = field(default_factory=dict)
     books: DbBooksTypeAlias = field(default_factory=dict)
+    version: Optional[int] = field(default=None, repr=False, compare=False)
+
+    def as_dict(self) -> Dict[str, Union[DbContactsTypeAlias, DbBooksTypeAlias]]:
+        """Converts the schema to plain dictionaries, e.g. for text serialization.
+        Works with lazily loaded mappings, which `dataclasses.asdict` cannot copy.
+
+        Example:
+            >>> DbSchema(books={"TestBook": []}).as_dict()
+            {'contacts': {}, 'books': {'TestBook': []}}
+        """
+        return {
+            "contacts": {cid: dict(info) for cid, info in self.contacts.items()},
+            "books": {name: list(ids) for name, ids in self.books.items()},
+        }
+
+    @property
+    def is_frozen(self) -> bool:
+        """Whether this is a read-only snapshot, see `freeze`."""
+        read_only = (FrozenDict, MappingProxyType)
+        return isinstance(self.contacts, read_only) and isinstance(
+            self.books, read_only
+        )
+
+    def freeze(self) -> "DbSchema":
+        """Returns a read-only snapshot of the schema: contacts are `FrozenDict`
+        objects and the contact ids of books are tuples.
+
+        Contacts and books that are already read-only are shared rather than copied,
+        and a snapshot is returned as is, so readers can hold on to a version while
+        writers build the next one with `evolve`.
+
+        Example:
+            >>> snapshot = DbSchema(books={"TestBook": [1]}).freeze()
+            >>> snapshot.books["TestBook"]
+            (1,)
+            >>> snapshot.books["Other"] = []
+            Traceback (most recent call last):
+            TypeError: FrozenDict is read-only
+        """
+        if self.is_frozen:
+            return self
+        return DbSchema(
+            contacts=_freeze_container(self.contacts, FrozenDict),
+            books=_freeze_container(self.books, tuple),
+            version=self.version,
+        )
+
+    def evolve(
+        self,
+        contacts: MappingType[int, ContactDictTypeAlias] = MappingProxyType({}),
+        books: MappingType[str, BookContactIdsTypeAlias] = MappingProxyType({}),
+    ) -> "DbSchema":
+        """Returns a new snapshot with the given contacts and books added or replaced.
+        All other contacts and books are shared with this one, only the containers
+        are copied. The new snapshot keeps the `version` of this one.
+
+        Example:
+            >>> v1 = DbSchema(books={"TestBook": []}).freeze()
+            >>> v2 = v1.evolve(books={"TestBook": [1]})
+            >>> v1.books["TestBook"], v2.books["TestBook"]
+            ((), (1,))
+        """
+        base = self.freeze()
+        new_contacts = FrozenDict(base.contacts)
+        dict.update(new_contacts, _freeze_container(contacts, FrozenDict))
+        new_books = FrozenDict(base.books)
+        dict.update(new_books, _freeze_container(books, tuple))
+        return DbSchema(contacts=new_contacts, books=new_books, version=base.version)
+
+    def contact_fingerprints(self) -> Dict[int, str]:
+        """Returns the fingerprint of every contact, see `contact_fingerprint`."""
+        return {cid: contact_fingerprint(info) for cid, info in self.contacts.items()}
+
+    def book_fingerprints(self) -> Dict[str, str]:
+        """Returns the fingerprint of every book, see `book_fingerprint`."""
+        return {name: book_fingerprint(ids) for name, ids in self.books.items()}
+
+    def fingerprint(self) -> str:
+        """Structural fingerprint of the whole schema. Equal schemas have the same
+        fingerprint, regardless of the order of contacts and books.
+        """
+        return _fingerprint(
+            [
+                sorted(self.contact_fingerprints().items()),
+                sorted(self.book_fingerprints().items()),
+            ]
+        )
+
+    def diff(self, other: "DbSchema") -> SchemaDiff:
+        """Returns the changes that turn this schema into `other`.
+
+        Example:
+            >>> old = DbSchema(books={"A": [], "B": []})
+            >>> diff = old.diff(DbSchema(books={"A": [1], "C": []}))
+            >>> diff.added_books, diff.removed_books, diff.changed_books
+            (['C'], ['B'], ['A'])
+        """
+        return SchemaDiff.between(
+            self.contacts, other.contacts, self.books, other.books, _same_ids
+        )
 
     def __eq__(self, __value: object) -> bool:
         if not isinstance(__value, DbSchema):
             return False
-        # TODO - Implement the comparison logic
-        return self.books.keys() == __value.books.keys()
+        return not self.diff(__value)
 
 
 if __name__ == "__main__":
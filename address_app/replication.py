@@ -0,0 +1,235 @@
+import json
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from threading import Event, RLock, Thread
+from typing import Optional, Union
+
+from .base import get_logger
+from .base.consts import DURABILITY_FSYNC, RELATIVE_STORAGE_PATH
+from .database import DatabaseManager
+from .serialize import SerializeStrategyRegistry
+from .storage import StorageFactory
+from .storage.durability import atomic_replace
+from .storage.replication import (
+    RELATIVE_REPLICATION_LOG_PATH,
+    apply_entries,
+    read_entries,
+    read_last_entry,
+)
+from .view import ViewerRegistry
+
+logger = get_logger()
+
+#: Default time between polls of the replication log, in milliseconds
+DEFAULT_POLL_INTERVAL_MS = 500
+
+#: Position of a follower in the log of its primary, relative to the follower root
+RELATIVE_CURSOR_PATH = f"{RELATIVE_STORAGE_PATH}.replica.json"
+
+
+@dataclass
+class ReplicationMetrics:
+    """Progress of a follower. Times are in seconds."""
+
+    #: Sequence number of the last entry applied
+    applied_seq: int = 0
+    #: Sequence number of the last entry of the primary, as of the last poll
+    primary_seq: int = 0
+    #: Entries applied since the follower started
+    applied_entries: int = 0
+    polls: int = 0
+    #: Time between the last change of the primary and the last change applied
+    lag_seconds: float = 0.0
+
+    @property
+    def lag_entries(self) -> int:
+        return max(0, self.primary_seq - self.applied_seq)
+
+
+class Follower:
+    """
+    A read replica of a primary database, kept up to date from the primary's
+    replication log rather than by copying its storage file.
+
+    The primary is opened with `replicate=True` (see `ReplicatedStorage`), which
+    logs its changes in `<primary root>/adb/adb.replog`. The follower stores its own
+    copy in `root`, with any format and storage, and applies new log entries on every
+    `poll`, or in the background after `start`. The position reached in the log is
+    saved in `<root>/adb/adb.replica.json` after each poll, so a restarted follower
+    resumes where it stopped; entries applied again after a crash are harmless.
+
+    The primary root only has to be readable by the follower, e.g. a mounted volume.
+    Reads go through `db_manager`; changes made to the follower directly would be
+    overwritten by the primary's.
+
+    Args:
+        primary_root (str): The root directory of the primary.
+        root (str): The root directory of the follower.
+        format (Optional[str]): The serialization format of the follower database,
+            see `AdbConnector`.
+        storage (Optional[str]): The storage kind of the follower database, see
+            `AdbConnector`.
+        **storage_options: Storage specific options, see `AdbConnector`.
+
+    Example:
+        >>> primary = AdbConnector("/data/adb", replicate=True)
+        >>> follower = Follower("/data/adb", "/mnt/replica/adb")
+        >>> primary.db_manager.create_empty_book("Friends")
+        >>> follower.poll()
+        1
+        >>> follower.db_manager.get_book("Friends")
+    """
+
+    def __init__(
+        self,
+        primary_root: str,
+        root: str,
+        format: Optional[str] = "json",
+        storage: Optional[str] = "filesystem",
+        **storage_options,
+    ):
+        strategy = SerializeStrategyRegistry.get_strategy_for_extension(format)
+        self._storage = StorageFactory.create_storage(
+            storage, strategy, root, **storage_options
+        )
+        self._db_manager = DatabaseManager(self._storage)
+        self._log_path = Path(primary_root).resolve() / RELATIVE_REPLICATION_LOG_PATH
+        self._cursor_path = Path(self._storage.root_as_str()) / RELATIVE_CURSOR_PATH
+        self._lock = RLock()
+        self._stop = Event()
+        self._thread: Optional[Thread] = None
+        self.metrics = ReplicationMetrics()
+        self._offset = 0
+        self._applied_ts = 0.0
+        self._load_cursor()
+
+    @property
+    def db_manager(self) -> DatabaseManager:
+        """Returns the database manager of the follower database, for reading."""
+        return self._db_manager
+
+    @property
+    def root(self) -> str:
+        return self._storage.root_as_str()
+
+    def _load_cursor(self):
+        try:
+            cursor = json.loads(self._cursor_path.read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return
+        self._offset = cursor["offset"]
+        self._applied_ts = cursor["ts"]
+        self.metrics.applied_seq = cursor["seq"]
+
+    def _save_cursor(self):
+        cursor = json.dumps(
+            {
+                "seq": self.metrics.applied_seq,
+                "offset": self._offset,
+                "ts": self._applied_ts,
+            }
+        )
+        self._cursor_path.parent.mkdir(parents=True, exist_ok=True)
+        atomic_replace(
+            lambda tmp_path: tmp_path.write_text(cursor, encoding="utf-8"),
+            self._cursor_path,
+            DURABILITY_FSYNC,
+        )
+
+    def poll(self) -> int:
+        """Apply the entries added to the primary's log since the last poll, with a
+        single write of the follower database.
+
+        Returns:
+            int: The number of entries applied.
+        """
+        with self._lock:
+            self.metrics.polls += 1
+            last = read_last_entry(self._log_path)
+            if last is None:
+                return 0
+            restarted = last["seq"] < self.metrics.applied_seq
+            if restarted or self._log_path.stat().st_size < self._offset:
+                # The primary started a new log, e.g. after its database was deleted
+                logger.warning(f"Replication log {self._log_path} restarted")
+                self._offset = 0
+                self._applied_ts = 0.0
+                self.metrics.applied_seq = 0
+                self._storage.delete()
+
+            entries = []
+            offset = self._offset
+            for entry, offset in read_entries(self._log_path, self._offset):
+                if entry["seq"] > self.metrics.applied_seq:
+                    entries.append(entry)
+            if entries:
+                self._storage.write(apply_entries(self._storage.read(), entries))
+                self.metrics.applied_seq = entries[-1]["seq"]
+                self.metrics.applied_entries += len(entries)
+                self._applied_ts = entries[-1]["ts"]
+            if offset != self._offset:
+                self._offset = offset
+                self._save_cursor()
+
+            self.metrics.primary_seq = max(last["seq"], self.metrics.applied_seq)
+            self.metrics.lag_seconds = (
+                max(0.0, last["ts"] - self._applied_ts)
+                if self.metrics.lag_entries
+                else 0.0
+            )
+            return len(entries)
+
+    def start(self, interval_ms: int = DEFAULT_POLL_INTERVAL_MS):
+        """Poll the primary's log every `interval_ms` milliseconds in a background
+        thread, until `stop`.
+        """
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = Thread(
+            target=self._run,
+            args=(interval_ms / 1000,),
+            name="adb-follower",
+            daemon=True,
+        )
+        self._thread.start()
+
+    def _run(self, interval: float):
+        while not self._stop.is_set():
+            try:
+                self.poll()
+            except Exception as e:
+                logger.error(f"Failed to apply the replication log: {e}")
+            self._stop.wait(interval)
+
+    def stop(self):
+        """Stop polling in the background."""
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+
+    def render(self, format: str = "html") -> Union[str, None]:
+        """Renders the follower database, see `AdbConnector.render`."""
+        return ViewerRegistry.render(self._storage.read(), format)
+
+    def close(self) -> None:
+        """Stops polling and releases the resources of the follower storage."""
+        self.stop()
+        self._storage.close()
+
+    def wait_for(self, seq: int, timeout: Optional[float] = None) -> bool:
+        """Poll until the entry `seq` of the primary's log is applied.
+
+        Returns:
+            bool: Whether it was applied before `timeout` seconds.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self.metrics.applied_seq < seq:
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            if not self.poll():
+                time.sleep(0.01)
+        return True
@@ -1 +1,5 @@
-from .serialization_registry import SerializeStrategyRegistry, get_supported_formats
+from .serialization_registry import (
+    SerializeStrategyRegistry,
+    get_supported_formats,
+    get_supported_compressions,
+)
@@ -1,8 +1,25 @@
 from abc import ABC, abstractmethod
-from ..database.db_schema import DbSchema
+from pathlib import Path
+from typing import IO, Iterable, Iterator, Tuple, Union
+from ..database.db_schema import (
+    DbSchema,
+    BookContactIdsTypeAlias,
+    ContactDictTypeAlias,
+)
+
+ContactItemTypeAlias = Tuple[int, ContactDictTypeAlias]
+BookItemTypeAlias = Tuple[str, BookContactIdsTypeAlias]
 
 
 class ISerializeStrategy(ABC):
+    #: Whether the serialized form is bytes (binary file) rather than text
+    binary = False
+    #: Whether `dump` seeks in the file, so it cannot write to a plain stream
+    seekable = False
+    #: Whether `iter_contacts`/`iter_books` read the file incrementally rather than
+    #: loading it whole
+    incremental = False
+
     @classmethod
     @abstractmethod
     def format(cls) -> str:
@@ -11,12 +28,85 @@ class ISerializeStrategy(ABC):
 
     @classmethod
     @abstractmethod
-    def serialize(cls, data: DbSchema) -> str:
+    def serialize(cls, data: DbSchema) -> Union[str, bytes]:
         """Takes DbSchema object and serializes it."""
         pass
 
     @classmethod
     @abstractmethod
-    def deserialize(cls, data: str) -> DbSchema:
+    def deserialize(cls, data: Union[str, bytes]) -> DbSchema:
         """Takes a string and deserializes it into a DbSchema object."""
         pass
+
+    @classmethod
+    def dump(cls, data: DbSchema, file: IO) -> None:
+        """Serializes the DbSchema object into an open file object.
+        The file is opened in binary mode if `binary` is set, otherwise in text mode.
+        """
+        file.write(cls.serialize(data))
+
+    @classmethod
+    def load(cls, file: IO) -> DbSchema:
+        """Deserializes a DbSchema object from an open file object."""
+        return cls.deserialize(file.read())
+
+    @classmethod
+    def write_file(cls, data: DbSchema, path: Path) -> None:
+        """Writes the serialized DbSchema object to the storage `path`."""
+        with open(path, "wb" if cls.binary else "w") as file:
+            cls.dump(data, file)
+
+    @classmethod
+    def read_file(cls, path: Path) -> DbSchema:
+        """Reads a DbSchema object from the storage `path`."""
+        with open(path, "rb" if cls.binary else "r") as file:
+            return cls.load(file)
+
+    # Item streams: contacts and books one at a time, used to convert large databases
+    # (see `storage.migration`). The defaults go through a whole DbSchema object;
+    # formats that can do better override them.
+
+    @classmethod
+    def dump_items(
+        cls,
+        contacts: Iterable[ContactItemTypeAlias],
+        books: Iterable[BookItemTypeAlias],
+        file: IO,
+    ) -> None:
+        """Serializes `(id, contact_dict)` and `(book_name, contact_ids)` items into
+        an open file object. Contacts are consumed before books.
+        """
+        cls.dump(DbSchema(contacts=dict(contacts), books=dict(books)), file)
+
+    @classmethod
+    def load_contacts(cls, file: IO) -> Iterator[ContactItemTypeAlias]:
+        """Yields the `(id, contact_dict)` items of an open file object."""
+        yield from cls.load(file).contacts.items()
+
+    @classmethod
+    def load_books(cls, file: IO) -> Iterator[BookItemTypeAlias]:
+        """Yields the `(book_name, contact_ids)` items of an open file object."""
+        yield from cls.load(file).books.items()
+
+    @classmethod
+    def write_items(
+        cls,
+        contacts: Iterable[ContactItemTypeAlias],
+        books: Iterable[BookItemTypeAlias],
+        path: Path,
+    ) -> None:
+        """Writes contact and book items to the storage `path`, see `dump_items`."""
+        with open(path, "wb" if cls.binary else "w") as file:
+            cls.dump_items(contacts, books, file)
+
+    @classmethod
+    def iter_contacts(cls, path: Path) -> Iterator[ContactItemTypeAlias]:
+        """Yields the `(id, contact_dict)` items of the storage `path`."""
+        with open(path, "rb" if cls.binary else "r") as file:
+            yield from cls.load_contacts(file)
+
+    @classmethod
+    def iter_books(cls, path: Path) -> Iterator[BookItemTypeAlias]:
+        """Yields the `(book_name, contact_ids)` items of the storage `path`."""
+        with open(path, "rb" if cls.binary else "r") as file:
+            yield from cls.load_books(file)
@@ -0,0 +1,236 @@
+import struct
+import sys
+from array import array
+from typing import Dict, Iterator, List, Tuple
+
+from .base_serialization import ISerializeStrategy
+from ..database.db_schema import DbSchema, DbContactsTypeAlias, DbBooksTypeAlias
+from ..base.exceptions import (
+    SerializationException,
+    UnsupportedFormatVersionException,
+)
+
+#: File signature of the binary format
+MAGIC = b"ADBB"
+
+#: Current version of the binary format. Readers refuse files with a newer version.
+VERSION = 1
+
+#: Contact fields written by the current version, in order
+CONTACT_FIELDS = ("name", "address", "phone_no")
+
+#: Header: magic, format version, number of sections
+_HEADER = struct.Struct("<4sHH")
+
+#: Section prefix: 4-byte tag and payload length
+_SECTION = struct.Struct("<4sQ")
+
+_U32 = struct.Struct("<I")
+
+#: String table index used for missing (None) values
+_NONE_INDEX = -1
+
+_STRINGS_TAG = b"STRS"
+_CONTACTS_TAG = b"CNTS"
+_BOOKS_TAG = b"BOOK"
+
+
+def _pack_array(typecode: str, values) -> bytes:
+    """Packs the values into little-endian bytes."""
+    arr = array(typecode, values)
+    if sys.byteorder == "big":
+        arr.byteswap()
+    return arr.tobytes()
+
+
+def _unpack_array(typecode: str, buffer, offset: int, count: int) -> Tuple[array, int]:
+    """Unpacks `count` little-endian items starting at `offset`.
+
+    Returns:
+        Tuple[array, int]: The values and the offset right after them.
+    """
+    arr = array(typecode)
+    end = offset + count * arr.itemsize
+    arr.frombytes(buffer[offset:end])
+    if sys.byteorder == "big":
+        arr.byteswap()
+    return arr, end
+
+
+class _StringTable:
+    """Collects unique strings and hands out their indexes."""
+
+    def __init__(self):
+        self._indexes: Dict[str, int] = {}
+        self.strings: List[str] = []
+
+    def index(self, value) -> int:
+        if value is None:
+            return _NONE_INDEX
+        idx = self._indexes.get(value)
+        if idx is None:
+            idx = self._indexes[value] = len(self.strings)
+            self.strings.append(value)
+        return idx
+
+
+def encode_strings(strings: List[str]) -> bytes:
+    """Encodes the string table: count, array of byte lengths, utf-8 blob."""
+    encoded = [s.encode("utf-8") for s in strings]
+    return (
+        _U32.pack(len(encoded))
+        + _pack_array("I", [len(s) for s in encoded])
+        + b"".join(encoded)
+    )
+
+
+def decode_strings(buffer, offset: int = 0) -> List[str]:
+    """Decodes a string table produced by `encode_strings`."""
+    (count,) = _U32.unpack_from(buffer, offset)
+    lengths, offset = _unpack_array("I", buffer, offset + _U32.size, count)
+    strings = []
+    for length in lengths:
+        strings.append(bytes(buffer[offset : offset + length]).decode("utf-8"))
+        offset += length
+    return strings
+
+
+def iter_sections(buffer) -> Iterator[Tuple[bytes, int, int]]:
+    """Validates the header and yields `(tag, start, end)` for every section.
+
+    Raises:
+        SerializationException: If the buffer is not in the binary format.
+        UnsupportedFormatVersionException: If the file was written by a newer version.
+    """
+    if len(buffer) < _HEADER.size:
+        raise SerializationException("Binary data is truncated")
+    magic, version, sections = _HEADER.unpack_from(buffer, 0)
+    if magic != MAGIC:
+        raise SerializationException("Binary data has an invalid signature")
+    if version > VERSION:
+        raise UnsupportedFormatVersionException("Binary", version)
+
+    offset = _HEADER.size
+    for _ in range(sections):
+        tag, length = _SECTION.unpack_from(buffer, offset)
+        start = offset + _SECTION.size
+        offset = start + length
+        if offset > len(buffer):
+            raise SerializationException("Binary data is truncated")
+        yield tag, start, offset
+
+
+def pack_sections(sections: List[Tuple[bytes, bytes]]) -> bytes:
+    """Packs the header followed by the length-prefixed sections."""
+    parts = [_HEADER.pack(MAGIC, VERSION, len(sections))]
+    for tag, payload in sections:
+        parts.append(_SECTION.pack(tag, len(payload)))
+        parts.append(payload)
+    return b"".join(parts)
+
+
+class BinaryStrategy(ISerializeStrategy):
+    """Compact binary serialization.
+
+    The file starts with a header (signature, format version, number of sections)
+    followed by length-prefixed sections, so readers can skip sections they do not know:
+
+    - ``STRS``: string table shared by contact fields and book names.
+    - ``CNTS``: contact ids and, per contact, indexes into the string table.
+    - ``BOOK``: book name indexes, book sizes and the concatenated contact ids.
+
+    Ids and indexes are packed with `array`, so decoding costs one copy per section
+    instead of parsing every value.
+    """
+
+    binary = True
+
+    @classmethod
+    def format(cls) -> str:
+        return "bin"
+
+    @classmethod
+    def serialize(cls, data: DbSchema) -> bytes:
+        strings = _StringTable()
+        field_indexes = [strings.index(f) for f in CONTACT_FIELDS]
+
+        contact_ids = list(data.contacts.keys())
+        contact_values = []
+        for cid in contact_ids:
+            info = data.contacts[cid]
+            contact_values.extend(strings.index(info.get(f)) for f in CONTACT_FIELDS)
+
+        book_names = [strings.index(name) for name in data.books]
+        book_sizes = [len(ids) for ids in data.books.values()]
+        book_ids = [cid for ids in data.books.values() for cid in ids]
+
+        contacts_payload = (
+            _U32.pack(len(contact_ids))
+            + _U32.pack(len(field_indexes))
+            + _pack_array("i", field_indexes)
+            + _pack_array("q", contact_ids)
+            + _pack_array("i", contact_values)
+        )
+        books_payload = (
+            _U32.pack(len(book_names))
+            + _pack_array("i", book_names)
+            + _pack_array("I", book_sizes)
+            + _pack_array("q", book_ids)
+        )
+        return pack_sections(
+            [
+                (_STRINGS_TAG, encode_strings(strings.strings)),
+                (_CONTACTS_TAG, contacts_payload),
+                (_BOOKS_TAG, books_payload),
+            ]
+        )
+
+    @classmethod
+    def deserialize(cls, data: bytes) -> DbSchema:
+        buffer = memoryview(data)
+        strings: List[str] = []
+        contacts: DbContactsTypeAlias = {}
+        books: DbBooksTypeAlias = {}
+
+        for tag, start, _ in iter_sections(buffer):
+            if tag == _STRINGS_TAG:
+                strings = decode_strings(buffer, start)
+            elif tag == _CONTACTS_TAG:
+                contacts = cls._decode_contacts(buffer, start, strings)
+            elif tag == _BOOKS_TAG:
+                books = cls._decode_books(buffer, start, strings)
+            # Unknown sections come from newer minor versions and are skipped
+
+        return DbSchema(contacts=contacts, books=books)
+
+    @staticmethod
+    def _decode_contacts(buffer, offset: int, strings: List[str]) -> DbContactsTypeAlias:
+        (count,) = _U32.unpack_from(buffer, offset)
+        (n_fields,) = _U32.unpack_from(buffer, offset + _U32.size)
+        fields, offset = _unpack_array("i", buffer, offset + 2 * _U32.size, n_fields)
+        keys = [strings[idx] for idx in fields]
+        ids, offset = _unpack_array("q", buffer, offset, count)
+        values, _ = _unpack_array("i", buffer, offset, count * n_fields)
+
+        contacts = {}
+        for i, cid in enumerate(ids):
+            row = values[i * n_fields : (i + 1) * n_fields]
+            contacts[cid] = {
+                key: (strings[idx] if idx != _NONE_INDEX else None)
+                for key, idx in zip(keys, row)
+            }
+        return contacts
+
+    @staticmethod
+    def _decode_books(buffer, offset: int, strings: List[str]) -> DbBooksTypeAlias:
+        (count,) = _U32.unpack_from(buffer, offset)
+        names, offset = _unpack_array("i", buffer, offset + _U32.size, count)
+        sizes, offset = _unpack_array("I", buffer, offset, count)
+        ids, _ = _unpack_array("q", buffer, offset, sum(sizes))
+
+        books = {}
+        position = 0
+        for name_idx, size in zip(names, sizes):
+            books[strings[name_idx]] = ids[position : position + size].tolist()
+            position += size
+        return books
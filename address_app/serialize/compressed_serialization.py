@@ -0,0 +1,141 @@
+import bz2
+import gzip
+import io
+import lzma
+from contextlib import contextmanager
+from typing import IO, Callable, Dict, Iterable, Iterator, Type
+
+from .base_serialization import (
+    ISerializeStrategy,
+    ContactItemTypeAlias,
+    BookItemTypeAlias,
+)
+from ..database.db_schema import DbSchema
+
+#: Opens a compressed stream over a binary file object: `opener(file, mode)`
+CodecOpenerTypeAlias = Callable[[IO, str], IO]
+
+
+def _open_gzip(file: IO, mode: str) -> IO:
+    # No file name nor timestamp in the header: identical data gives identical output
+    return gzip.GzipFile(filename="", fileobj=file, mode=mode, mtime=0)
+
+
+#: Compression codecs by file suffix, e.g. `adb.json.gz`
+CODECS: Dict[str, CodecOpenerTypeAlias] = {
+    "gz": _open_gzip,
+    "bz2": bz2.BZ2File,
+    "xz": lzma.LZMAFile,
+}
+
+
+class CompressedStrategy(ISerializeStrategy):
+    """Compresses the output of another strategy. Use `compressed` to create one.
+
+    The format is the one of the wrapped strategy followed by the codec suffix, e.g.
+    "json.gz". Data is streamed through the codec: the wrapped strategy writes to
+    (and reads from) a compressed file object, so the uncompressed document is never
+    held as a whole in memory, except for strategies that seek while dumping.
+
+    Formats that are read lazily from a mapped file (idx) are fully decompressed on
+    load instead. Item streams (`dump_items`, `load_contacts`, `load_books`) go
+    through the codec the same way.
+    """
+
+    binary = True
+    #: The wrapped strategy
+    strategy: Type[ISerializeStrategy] = None
+    #: The codec suffix, a key of `CODECS`
+    suffix: str = None
+
+    @classmethod
+    def format(cls) -> str:
+        return f"{cls.strategy.format()}.{cls.suffix}"
+
+    @classmethod
+    def serialize(cls, data: DbSchema) -> bytes:
+        buffer = io.BytesIO()
+        cls.dump(data, buffer)
+        return buffer.getvalue()
+
+    @classmethod
+    def deserialize(cls, data: bytes) -> DbSchema:
+        return cls.load(io.BytesIO(data))
+
+    @classmethod
+    def dump(cls, data: DbSchema, file: IO) -> None:
+        cls.dump_items(data.contacts.items(), data.books.items(), file)
+
+    @classmethod
+    def load(cls, file: IO) -> DbSchema:
+        with cls._open(file, "r") as stream:
+            return cls.strategy.load(stream)
+
+    @classmethod
+    def dump_items(
+        cls,
+        contacts: Iterable[ContactItemTypeAlias],
+        books: Iterable[BookItemTypeAlias],
+        file: IO,
+    ) -> None:
+        if cls.strategy.seekable:
+            buffer = io.BytesIO()
+            cls.strategy.dump_items(contacts, books, buffer)
+            with cls._open(file, "w") as stream:
+                stream.write(buffer.getbuffer())
+            return
+        with cls._open(file, "w") as stream:
+            cls.strategy.dump_items(contacts, books, stream)
+
+    @classmethod
+    def load_contacts(cls, file: IO) -> Iterator[ContactItemTypeAlias]:
+        with cls._open(file, "r") as stream:
+            yield from cls.strategy.load_contacts(stream)
+
+    @classmethod
+    def load_books(cls, file: IO) -> Iterator[BookItemTypeAlias]:
+        with cls._open(file, "r") as stream:
+            yield from cls.strategy.load_books(stream)
+
+    @classmethod
+    @contextmanager
+    def _open(cls, file: IO, mode: str) -> Iterator[IO]:
+        """Open the codec stream over `file` ("r" or "w"), in text mode if the wrapped
+        strategy is a text format.
+        """
+        with CODECS[cls.suffix](file, mode + "b") as stream:
+            if cls.strategy.binary:
+                yield stream
+                return
+            with io.TextIOWrapper(stream, encoding="utf-8", newline="") as text:
+                yield text
+
+
+_compressed: Dict[tuple, Type[CompressedStrategy]] = {}
+
+
+def compressed(
+    strategy: Type[ISerializeStrategy], suffix: str
+) -> Type[CompressedStrategy]:
+    """Return the strategy writing `strategy` compressed with the `suffix` codec.
+
+    Example:
+        >>> compressed(JSONStrategy, "gz").format()
+        'json.gz'
+    """
+    if suffix not in CODECS:
+        raise ValueError(f"Unsupported compression: {suffix}")
+    key = (strategy, suffix)
+    if key not in _compressed:
+        name = f"{strategy.__name__}{suffix.capitalize()}"
+        _compressed[key] = type(
+            name,
+            (CompressedStrategy,),
+            {
+                "strategy": strategy,
+                "suffix": suffix,
+                # Formats read through mmap are decompressed whole instead
+                "incremental": strategy.incremental and not strategy.seekable,
+            },
+        )
+    return _compressed[key]
@@ -1,19 +1,229 @@
-from .base_serialization import ISerializeStrategy
-from address_app.database.db_schema import DbSchema
-from ..base.exceptions import NotImplementerSerializationException
+import csv
+import io
+from itertools import groupby
+from pathlib import Path
+from typing import IO, Iterable, Iterator, Optional, Tuple
+
+from .base_serialization import (
+    ISerializeStrategy,
+    ContactItemTypeAlias,
+    BookItemTypeAlias,
+)
+from address_app.database.db_schema import DbSchema, ContactDictTypeAlias
+from ..base.exceptions import SerializationException
+
+#: Contact fields stored as columns of the contacts file, in order
+CONTACT_FIELDS = ("name", "address", "phone_no")
+
+#: Header of the contacts file
+CONTACTS_HEADER = ("id",) + CONTACT_FIELDS
+
+#: Header of the book members file. Empty books are stored with an empty contact_id.
+BOOK_MEMBERS_HEADER = ("book", "contact_id")
+
+#: File names inside the CSV storage directory
+CONTACTS_FILENAME = "contacts.csv"
+BOOK_MEMBERS_FILENAME = "book_members.csv"
+
+ContactRowTypeAlias = Tuple[int, ContactDictTypeAlias]
+BookMemberRowTypeAlias = Tuple[str, Optional[int]]
+
+
+def _contact_row(cid: int, info: ContactDictTypeAlias) -> list:
+    return [cid] + [
+        info.get(f) if info.get(f) is not None else "" for f in CONTACT_FIELDS
+    ]
+
+
+def _iter_members(
+    books: Iterable[BookItemTypeAlias],
+) -> Iterator[BookMemberRowTypeAlias]:
+    for book_name, ids in books:
+        if not ids:
+            yield book_name, None
+        for cid in ids:
+            yield book_name, cid
+
+
+def _group_members(
+    members: Iterable[BookMemberRowTypeAlias],
+) -> Iterator[BookItemTypeAlias]:
+    # The rows of a book are written next to each other
+    for book_name, rows in groupby(members, key=lambda row: row[0]):
+        yield book_name, [cid for _, cid in rows if cid is not None]
+
+
+def write_contacts(file: IO, contacts: Iterable[ContactRowTypeAlias]) -> None:
+    """Writes the contacts table row by row.
+
+    Args:
+        file (IO): Text file opened with `newline=""`.
+        contacts (Iterable[Tuple[int, Dict[str, str]]]): `(id, contact_dict)` pairs.
+    """
+    writer = csv.writer(file)
+    writer.writerow(CONTACTS_HEADER)
+    for cid, info in contacts:
+        writer.writerow(_contact_row(cid, info))
+
+
+def write_book_members(file: IO, members: Iterable[BookMemberRowTypeAlias]) -> None:
+    """Writes the book members table row by row.
+
+    Args:
+        file (IO): Text file opened with `newline=""`.
+        members (Iterable[Tuple[str, Optional[int]]]): `(book_name, contact_id)` pairs,
+            where a `None` contact id denotes an empty book.
+    """
+    writer = csv.writer(file)
+    writer.writerow(BOOK_MEMBERS_HEADER)
+    for book_name, cid in members:
+        writer.writerow([book_name, "" if cid is None else cid])
+
+
+def _check_header(row, expected: Tuple[str, ...]) -> None:
+    if tuple(row) != expected:
+        raise SerializationException(f"Unexpected CSV header: {row}")
+
+
+def iter_contacts(rows: Iterator[list]) -> Iterator[ContactRowTypeAlias]:
+    """Parses contacts table rows lazily, stopping at the first empty row.
+    Empty values are read back as None.
+    """
+    _check_header(next(rows, ()), CONTACTS_HEADER)
+    for row in rows:
+        if not row:
+            return
+        yield int(row[0]), {
+            key: (value if value != "" else None)
+            for key, value in zip(CONTACT_FIELDS, row[1:])
+        }
+
+
+def iter_book_members(rows: Iterator[list]) -> Iterator[BookMemberRowTypeAlias]:
+    """Parses book members table rows lazily, stopping at the first empty row."""
+    _check_header(next(rows, ()), BOOK_MEMBERS_HEADER)
+    for row in rows:
+        if not row:
+            return
+        yield row[0], (int(row[1]) if row[1] else None)
+
+
+def build_schema(
+    contacts: Iterable[ContactRowTypeAlias], members: Iterable[BookMemberRowTypeAlias]
+) -> DbSchema:
+    """Assembles a DbSchema object from contact and book member rows."""
+    data = DbSchema(contacts=dict(contacts))
+    for book_name, cid in members:
+        ids = data.books.setdefault(book_name, [])
+        if cid is not None:
+            ids.append(cid)
+    return data
 
 
 class CSVStrategy(ISerializeStrategy):
+    """CSV serialization using two tables: contacts and book members.
+
+    On disk the storage path is a directory holding `contacts.csv` and
+    `book_members.csv`. Both are written and read row by row; the module-level
+    `write_*`/`iter_*` helpers can be used directly to stream data from or into
+    other tools without building a DbSchema object.
+
+    As a single string (`serialize`/`deserialize`) the contacts table is followed
+    by an empty line and the book members table.
+    """
+
+    incremental = True
+
     @classmethod
     def format(cls) -> str:
         return "csv"
 
     @classmethod
     def serialize(cls, data: DbSchema) -> str:
-        # TODO here we should use two files, one for contacts and one for books
-        raise NotImplementerSerializationException("CSV")
+        buffer = io.StringIO(newline="")
+        cls.dump(data, buffer)
+        return buffer.getvalue()
 
     @classmethod
     def deserialize(cls, data: str) -> DbSchema:
-        # TODO here we should use two files, one for contacts and one for books
-        raise NotImplementerSerializationException("CSV")
+        return cls.load(io.StringIO(data, newline=""))
+
+    @classmethod
+    def dump(cls, data: DbSchema, file: IO) -> None:
+        cls.dump_items(data.contacts.items(), data.books.items(), file)
+
+    @classmethod
+    def load(cls, file: IO) -> DbSchema:
+        rows = csv.reader(file)
+        contacts = dict(iter_contacts(rows))
+        return build_schema(contacts.items(), iter_book_members(rows))
+
+    @classmethod
+    def dump_items(
+        cls,
+        contacts: Iterable[ContactItemTypeAlias],
+        books: Iterable[BookItemTypeAlias],
+        file: IO,
+    ) -> None:
+        write_contacts(file, contacts)
+        file.write("\r\n")
+        write_book_members(file, _iter_members(books))
+
+    @classmethod
+    def load_contacts(cls, file: IO) -> Iterator[ContactItemTypeAlias]:
+        yield from iter_contacts(csv.reader(file))
+
+    @classmethod
+    def load_books(cls, file: IO) -> Iterator[BookItemTypeAlias]:
+        rows = csv.reader(file)
+        for _ in iter_contacts(rows):
+            pass
+        yield from _group_members(iter_book_members(rows))
+
+    @classmethod
+    def write_file(cls, data: DbSchema, path: Path) -> None:
+        cls.write_items(data.contacts.items(), data.books.items(), path)
+
+    @classmethod
+    def write_items(
+        cls,
+        contacts: Iterable[ContactItemTypeAlias],
+        books: Iterable[BookItemTypeAlias],
+        path: Path,
+    ) -> None:
+        cls.write_rows(path, contacts, _iter_members(books))
+
+    @classmethod
+    def read_file(cls, path: Path) -> DbSchema:
+        return build_schema(cls.iter_contacts(path), cls.iter_book_members(path))
+
+    @classmethod
+    def write_rows(
+        cls,
+        path: Path,
+        contacts: Iterable[ContactRowTypeAlias],
+        members: Iterable[BookMemberRowTypeAlias],
+    ) -> None:
+        """Streams contact and book member rows into the CSV storage directory."""
+        path.mkdir(parents=True, exist_ok=True)
+        with open(path / CONTACTS_FILENAME, "w", newline="") as file:
+            write_contacts(file, contacts)
+        with open(path / BOOK_MEMBERS_FILENAME, "w", newline="") as file:
+            write_book_members(file, members)
+
+    @classmethod
+    def iter_contacts(cls, path: Path) -> Iterator[ContactRowTypeAlias]:
+        """Lazily yields `(id, contact_dict)` rows from the CSV storage directory."""
+        with open(path / CONTACTS_FILENAME, "r", newline="") as file:
+            yield from iter_contacts(csv.reader(file))
+
+    @classmethod
+    def iter_book_members(cls, path: Path) -> Iterator[BookMemberRowTypeAlias]:
+        """Lazily yields `(book_name, contact_id)` rows from the CSV storage directory."""
+        with open(path / BOOK_MEMBERS_FILENAME, "r", newline="") as file:
+            yield from iter_book_members(csv.reader(file))
+
+    @classmethod
+    def iter_books(cls, path: Path) -> Iterator[BookItemTypeAlias]:
+        """Lazily yields `(book_name, contact_ids)` items from the storage directory."""
+        yield from _group_members(cls.iter_book_members(path))
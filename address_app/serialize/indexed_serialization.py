@@ -0,0 +1,408 @@
+import io
+import mmap
+import struct
+import sys
+from abc import abstractmethod
+from array import array
+from bisect import bisect_left
+from collections.abc import MutableMapping
+from pathlib import Path
+from typing import IO, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .base_serialization import (
+    ISerializeStrategy,
+    ContactItemTypeAlias,
+    BookItemTypeAlias,
+)
+from ..database.db_schema import (
+    DbSchema,
+    ContactDictTypeAlias,
+    BookContactIdsTypeAlias,
+)
+from ..base.exceptions import (
+    SerializationException,
+    UnsupportedFormatVersionException,
+)
+
+#: File signature of the indexed format
+MAGIC = b"ADBI"
+
+#: Current version of the indexed format. Readers refuse files with a newer version.
+VERSION = 1
+
+#: Contact fields written by the current version, in order
+CONTACT_FIELDS = ("name", "address", "phone_no")
+
+#: Header: magic, format version, flags (reserved), offset of the index
+_HEADER = struct.Struct("<4sHHQ")
+
+_U32 = struct.Struct("<I")
+_I32 = struct.Struct("<i")
+_BOOK_ENTRY = struct.Struct("<QI")
+
+_LITTLE_ENDIAN = sys.byteorder == "little"
+
+
+def _array_bytes(typecode: str, values) -> bytes:
+    arr = array(typecode, values)
+    if not _LITTLE_ENDIAN:
+        arr.byteswap()
+    return arr.tobytes()
+
+
+def _array_view(buffer: memoryview, offset: int, count: int, typecode: str):
+    """Returns a read-only sequence of `count` little-endian items at `offset`.
+    On little-endian machines this is a zero-copy view into the buffer.
+    """
+    size = array(typecode).itemsize
+    chunk = buffer[offset : offset + count * size]
+    if _LITTLE_ENDIAN:
+        return chunk.cast(typecode)
+    arr = array(typecode, chunk.tobytes())
+    arr.byteswap()
+    return arr
+
+
+def _encode_text(value: Optional[str]) -> bytes:
+    if value is None:
+        return _I32.pack(-1)
+    encoded = value.encode("utf-8")
+    return _I32.pack(len(encoded)) + encoded
+
+
+class _IndexReader:
+    """Random access to an indexed database file held in a buffer (usually an mmap).
+
+    Only the book index is decoded up front; contact records and book id lists are
+    decoded from the buffer on access.
+
+    Args:
+        buffer: The indexed data.
+        owned (bool): Whether `close` also closes the buffer, e.g. an mmap opened
+            for the reader.
+    """
+
+    def __init__(self, buffer, owned: bool = False):
+        self._owned = buffer if owned else None
+        self._buffer = memoryview(buffer)
+        if len(self._buffer) < _HEADER.size:
+            raise SerializationException("Indexed data is truncated")
+        magic, version, _, offset = _HEADER.unpack_from(self._buffer, 0)
+        if magic != MAGIC:
+            raise SerializationException("Indexed data has an invalid signature")
+        if version > VERSION:
+            raise UnsupportedFormatVersionException("Indexed", version)
+
+        n_fields, offset = self._u32(offset)
+        self.fields = []
+        for _ in range(n_fields):
+            name, offset = self._text(offset)
+            self.fields.append(name)
+
+        n_contacts, offset = self._u32(offset)
+        self._ids = _array_view(self._buffer, offset, n_contacts, "q")
+        offset += n_contacts * 8
+        self._offsets = _array_view(self._buffer, offset, n_contacts, "Q")
+        offset += n_contacts * 8
+
+        n_books, offset = self._u32(offset)
+        self._books: Dict[str, Tuple[int, int]] = {}
+        for _ in range(n_books):
+            name, offset = self._text(offset)
+            self._books[name] = _BOOK_ENTRY.unpack_from(self._buffer, offset)
+            offset += _BOOK_ENTRY.size
+
+    def _u32(self, offset: int) -> Tuple[int, int]:
+        return _U32.unpack_from(self._buffer, offset)[0], offset + _U32.size
+
+    def _text(self, offset: int) -> Tuple[Optional[str], int]:
+        (length,) = _I32.unpack_from(self._buffer, offset)
+        offset += _I32.size
+        if length < 0:
+            return None, offset
+        end = offset + length
+        return bytes(self._buffer[offset:end]).decode("utf-8"), end
+
+    def contact_count(self) -> int:
+        return len(self._ids)
+
+    def contact_ids(self) -> Iterator[int]:
+        for i in range(len(self._ids)):
+            yield self._ids[i]
+
+    def has_contact(self, cid: int) -> bool:
+        i = bisect_left(self._ids, cid)
+        return i < len(self._ids) and self._ids[i] == cid
+
+    def contact(self, cid: int) -> ContactDictTypeAlias:
+        i = bisect_left(self._ids, cid)
+        if i == len(self._ids) or self._ids[i] != cid:
+            raise KeyError(cid)
+        offset = self._offsets[i]
+        info = {}
+        for key in self.fields:
+            info[key], offset = self._text(offset)
+        return info
+
+    def book_names(self) -> List[str]:
+        return list(self._books)
+
+    def has_book(self, name: str) -> bool:
+        return name in self._books
+
+    def book(self, name: str) -> BookContactIdsTypeAlias:
+        offset, count = self._books[name]
+        return list(_array_view(self._buffer, offset, count, "q"))
+
+    def close(self):
+        """Release the buffer; the reader must not be used afterwards."""
+        for view in (self._ids, self._offsets, self._buffer):
+            if isinstance(view, memoryview):
+                view.release()
+        if self._owned is not None:
+            self._owned.close()
+
+
+class _OverlayMapping(MutableMapping):
+    """Mapping backed by an index reader, with in-memory changes layered on top.
+    Subclasses read the indexed entries with the `_base_*` methods.
+    """
+
+    def __init__(self, reader: _IndexReader):
+        self._reader = reader
+        self._changed = {}
+        self._removed = set()
+
+    @abstractmethod
+    def _base_keys(self) -> Iterator:
+        """Return the keys of the indexed entries."""
+        pass
+
+    @abstractmethod
+    def _base_len(self) -> int:
+        """Return the number of indexed entries."""
+        pass
+
+    @abstractmethod
+    def _base_contains(self, key) -> bool:
+        """Return whether `key` is indexed."""
+        pass
+
+    @abstractmethod
+    def _base_get(self, key):
+        """Return the indexed value of `key`, or raise KeyError."""
+        pass
+
+    def __getitem__(self, key):
+        if key in self._changed:
+            return self._changed[key]
+        if key in self._removed:
+            raise KeyError(key)
+        return self._base_get(key)
+
+    def __setitem__(self, key, value):
+        self._changed[key] = value
+        self._removed.discard(key)
+
+    def __delitem__(self, key):
+        if key not in self:
+            raise KeyError(key)
+        self._changed.pop(key, None)
+        if self._base_contains(key):
+            self._removed.add(key)
+
+    def __contains__(self, key) -> bool:
+        if key in self._changed:
+            return True
+        return key not in self._removed and self._base_contains(key)
+
+    def __iter__(self) -> Iterator:
+        for key in self._base_keys():
+            if key not in self._removed:
+                yield key
+        yield from [key for key in self._changed if not self._base_contains(key)]
+
+    def __len__(self) -> int:
+        added = sum(1 for key in self._changed if not self._base_contains(key))
+        return self._base_len() - len(self._removed) + added
+
+    def __repr__(self) -> str:
+        return repr(dict(self.items()))
+
+    def close(self):
+        """Release the index reader, see `IndexedStrategy.close`."""
+        self._reader.close()
+
+
+class _LazyContacts(_OverlayMapping):
+    """Contacts decoded from the index on every access; they are not cached,
+    so updated contacts must be assigned back to the mapping.
+    """
+
+    def _base_keys(self) -> Iterator[int]:
+        return self._reader.contact_ids()
+
+    def _base_len(self) -> int:
+        return self._reader.contact_count()
+
+    def _base_contains(self, key) -> bool:
+        return isinstance(key, int) and self._reader.has_contact(key)
+
+    def _base_get(self, key) -> ContactDictTypeAlias:
+        if not isinstance(key, int):
+            raise KeyError(key)
+        return self._reader.contact(key)
+
+
+class _LazyBooks(_OverlayMapping):
+    """Book id lists decoded on first access and kept, so in-place changes stick.
+    Decoded lists are kept apart from the changes, which only assignments make.
+    """
+
+    def __init__(self, reader: _IndexReader):
+        super().__init__(reader)
+        self._decoded: Dict[str, BookContactIdsTypeAlias] = {}
+
+    def _base_keys(self) -> Iterator[str]:
+        return iter(self._reader.book_names())
+
+    def _base_len(self) -> int:
+        return len(self._reader.book_names())
+
+    def _base_contains(self, key) -> bool:
+        return self._reader.has_book(key)
+
+    def _base_get(self, key) -> BookContactIdsTypeAlias:
+        ids = self._decoded.get(key)
+        if ids is None:
+            if not self._reader.has_book(key):
+                raise KeyError(key)
+            ids = self._decoded[key] = self._reader.book(key)
+        return ids
+
+
+class IndexedStrategy(ISerializeStrategy):
+    """Binary format with an index, read through `mmap` and decoded lazily.
+
+    Layout: a header (signature, version, index offset), then the contact records
+    (length-prefixed fields) and the contact id list of every book, then the index:
+    the sorted contact ids with their record offsets and, per book, the offset and
+    size of its id list.
+
+    Reading a file maps it into memory and decodes only the index of books. Contacts
+    and book id lists are decoded when accessed, so listing the contacts of one book
+    touches only the pages of that book and of its contacts.
+
+    Since loaded data stays backed by the mapped file, the file must not be
+    overwritten in place: storages write a new file and swap it in (see
+    `storage.durability.atomic_write`). The file is unmapped when the data is
+    garbage collected, or by `close`.
+    """
+
+    binary = True
+    seekable = True
+    incremental = True
+
+    @classmethod
+    def format(cls) -> str:
+        return "idx"
+
+    @classmethod
+    def serialize(cls, data: DbSchema) -> bytes:
+        buffer = io.BytesIO()
+        cls.dump(data, buffer)
+        return buffer.getvalue()
+
+    @classmethod
+    def deserialize(cls, data: bytes) -> DbSchema:
+        return cls._lazy_schema(_IndexReader(data))
+
+    @classmethod
+    def dump(cls, data: DbSchema, file: IO) -> None:
+        cls.dump_items(data.contacts.items(), data.books.items(), file)
+
+    @classmethod
+    def dump_items(
+        cls,
+        contacts: Iterable[ContactItemTypeAlias],
+        books: Iterable[BookItemTypeAlias],
+        file: IO,
+    ) -> None:
+        # Records are written as they come; only the index is kept in memory
+        file.write(_HEADER.pack(MAGIC, VERSION, 0, 0))
+        position = _HEADER.size
+
+        contact_offsets = []
+        for cid, info in contacts:
+            record = b"".join(_encode_text(info.get(f)) for f in CONTACT_FIELDS)
+            contact_offsets.append((cid, position))
+            file.write(record)
+            position += len(record)
+        contact_offsets.sort()
+
+        book_entries = []
+        for name, ids in books:
+            book_entries.append((name, position, len(ids)))
+            chunk = _array_bytes("q", ids)
+            file.write(chunk)
+            position += len(chunk)
+
+        index = [_U32.pack(len(CONTACT_FIELDS))]
+        index.extend(_encode_text(f) for f in CONTACT_FIELDS)
+        index.append(_U32.pack(len(contact_offsets)))
+        index.append(_array_bytes("q", (cid for cid, _ in contact_offsets)))
+        index.append(_array_bytes("Q", (offset for _, offset in contact_offsets)))
+        index.append(_U32.pack(len(book_entries)))
+        for name, offset, count in book_entries:
+            index.append(_encode_text(name) + _BOOK_ENTRY.pack(offset, count))
+        file.write(b"".join(index))
+
+        file.seek(0)
+        file.write(_HEADER.pack(MAGIC, VERSION, 0, position))
+        file.seek(0, io.SEEK_END)
+
+    @classmethod
+    def load(cls, file: IO) -> DbSchema:
+        return cls.deserialize(file.read())
+
+    @classmethod
+    def read_file(cls, path: Path) -> DbSchema:
+        return cls._lazy_schema(cls._map_file(path))
+
+    @classmethod
+    def close(cls, data: DbSchema) -> None:
+        """Unmap the file of data loaded by `read_file` (or release the buffer of
+        `deserialize`) now. Data that was not loaded lazily is left as is; lazily
+        loaded data must not be used afterwards.
+        """
+        for mapping in (data.contacts, data.books):
+            if isinstance(mapping, _OverlayMapping):
+                mapping.close()
+
+    @classmethod
+    def iter_contacts(cls, path: Path) -> Iterator[ContactItemTypeAlias]:
+        reader = cls._map_file(path)
+        try:
+            for cid in reader.contact_ids():
+                yield cid, reader.contact(cid)
+        finally:
+            reader.close()
+
+    @classmethod
+    def iter_books(cls, path: Path) -> Iterator[BookItemTypeAlias]:
+        reader = cls._map_file(path)
+        try:
+            for name in reader.book_names():
+                yield name, reader.book(name)
+        finally:
+            reader.close()
+
+    @staticmethod
+    def _map_file(path: Path) -> _IndexReader:
+        with open(path, "rb") as file:
+            mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        return _IndexReader(mapped, owned=True)
+
+    @staticmethod
+    def _lazy_schema(reader: _IndexReader) -> DbSchema:
+        return DbSchema(contacts=_LazyContacts(reader), books=_LazyBooks(reader))
@@ -1,9 +1,13 @@
-from dataclasses import asdict
 import json
+from typing import IO, Iterable
 
 from ..database.db_schema import DbSchema
 
-from .base_serialization import ISerializeStrategy
+from .base_serialization import (
+    ISerializeStrategy,
+    ContactItemTypeAlias,
+    BookItemTypeAlias,
+)
 
 
 class JSONStrategy(ISerializeStrategy):
@@ -15,7 +19,7 @@ class JSONStrategy(ISerializeStrategy):
     @classmethod
     def serialize(cls, data: DbSchema) -> str:
         # Convert the DbSchema object to a dictionary and then to a JSON string
-        schema_dict = asdict(data)
+        schema_dict = data.as_dict()
         return json.dumps(schema_dict)
 
     @classmethod
@@ -24,8 +28,35 @@ class JSONStrategy(ISerializeStrategy):
         # schema_dict = json.loads(data)
         # return DbSchema(**schema_dict)
 
-        schema_dict = json.loads(data)
+        return cls._from_dict(json.loads(data))
 
+    @classmethod
+    def dump(cls, data: DbSchema, file: IO) -> None:
+        # json.dump writes the encoded chunks one by one instead of building the string
+        json.dump(data.as_dict(), file)
+
+    @classmethod
+    def dump_items(
+        cls,
+        contacts: Iterable[ContactItemTypeAlias],
+        books: Iterable[BookItemTypeAlias],
+        file: IO,
+    ) -> None:
+        # Same output as `dump`, written one contact and one book at a time
+        file.write('{"contacts": {')
+        for i, (cid, info) in enumerate(contacts):
+            file.write(f'{", " if i else ""}"{cid}": {json.dumps(info)}')
+        file.write('}, "books": {')
+        for i, (book_name, ids) in enumerate(books):
+            file.write(f'{", " if i else ""}{json.dumps(book_name)}: {json.dumps(ids)}')
+        file.write("}}")
+
+    @classmethod
+    def load(cls, file: IO) -> DbSchema:
+        return cls._from_dict(json.load(file))
+
+    @staticmethod
+    def _from_dict(schema_dict: dict) -> DbSchema:
         # Convert contact IDs in 'contacts' back to integers
         contacts_converted = {int(k): v for k, v in schema_dict["contacts"].items()}
 
@@ -3,8 +3,10 @@ from typing import List
 from .json_serialization import JSONStrategy
 from .xml_serialization import XMLStrategy
 from .yaml_serialization import YAMLStrategy
-
-# from .strategies.csv_serialization import CSVStrategy
+from .binary_serialization import BinaryStrategy
+from .csv_serialization import CSVStrategy
+from .indexed_serialization import IndexedStrategy
+from .compressed_serialization import CODECS, compressed
 
 from ..base.exceptions import NoAvailableSerializationException
 
@@ -21,10 +23,27 @@ class SerializeStrategyRegistry:
     def get_supported_formats(cls) -> List[str]:
         return list(cls._strategies.keys())
 
+    @classmethod
+    def get_supported_compressions(cls) -> List[str]:
+        return list(CODECS.keys())
+
+    @classmethod
+    def is_supported(cls, format: str) -> bool:
+        """Whether `format` is a supported format, optionally followed by a
+        compression suffix, e.g. "json" or "json.gz".
+        """
+        base, _, suffix = format.rpartition(".")
+        if base and suffix in CODECS:
+            format = base
+        return format in cls._strategies
+
     @classmethod
     def get_strategy_for_extension(cls, format: str = "json"):
         strategy = cls._strategies.get(format)
         if not strategy:
+            base, _, suffix = format.rpartition(".")
+            if base in cls._strategies and suffix in CODECS:
+                return compressed(cls._strategies[base], suffix)
             raise NoAvailableSerializationException(format.capitalize())
         return strategy
 
@@ -34,12 +53,25 @@ def get_supported_formats() -> List[str]:
 
     Example:
     >>> get_supported_serialization_formats()
-    ['JSON', 'XML', 'YAML']
+    ['json', 'xml', 'yaml', 'bin', 'csv', 'idx']
     """
     return SerializeStrategyRegistry.get_supported_formats()
 
 
+def get_supported_compressions() -> List[str]:
+    """Return a list of compression suffixes that can follow any supported format.
+
+    Example:
+    >>> get_supported_compressions()
+    ['gz', 'bz2', 'xz']
+    >>> AdbConnector("path/to/db", format="json.gz")
+    """
+    return SerializeStrategyRegistry.get_supported_compressions()
+
+
 SerializeStrategyRegistry.register_strategy(JSONStrategy)
 SerializeStrategyRegistry.register_strategy(XMLStrategy)
 SerializeStrategyRegistry.register_strategy(YAMLStrategy)
-# SerializeStrategyRegistry.register_strategy(CSVStrategy)
+SerializeStrategyRegistry.register_strategy(BinaryStrategy)
+SerializeStrategyRegistry.register_strategy(CSVStrategy)
+SerializeStrategyRegistry.register_strategy(IndexedStrategy)
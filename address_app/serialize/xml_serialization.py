@@ -1,15 +1,87 @@
 import xml.etree.ElementTree as ET
-from .base_serialization import ISerializeStrategy
+from typing import IO, Iterable, Iterator
+from xml.sax.saxutils import escape, quoteattr
+from .base_serialization import (
+    ISerializeStrategy,
+    ContactItemTypeAlias,
+    BookItemTypeAlias,
+)
 from ..database.db_schema import DbSchema
 
 
+def _iter_records(file: IO, tag: str) -> Iterator[ET.Element]:
+    """Yields the `tag` elements ("contact" or "book") of a document as they are
+    parsed. Records are dropped from the tree once handled, so memory use does not
+    grow with the size of the document.
+    """
+    parents = []
+    for event, element in ET.iterparse(file, events=("start", "end")):
+        if event == "start":
+            parents.append(element)
+            continue
+        parents.pop()
+        if len(parents) == 2 and element.tag in ("contact", "book"):
+            if element.tag == tag:
+                yield element
+            parents[-1].remove(element)
+
+
 class XMLStrategy(ISerializeStrategy):
+    incremental = True
     @classmethod
     def format(cls) -> str:
         return "xml"
 
     @classmethod
     def serialize(cls, data: DbSchema) -> str:
+        return ET.tostring(cls._to_element(data), encoding="unicode")
+
+    @classmethod
+    def deserialize(cls, data: str) -> DbSchema:
+        return cls._from_element(ET.fromstring(data))
+
+    @classmethod
+    def dump(cls, data: DbSchema, file: IO) -> None:
+        ET.ElementTree(cls._to_element(data)).write(file, encoding="unicode")
+
+    @classmethod
+    def load(cls, file: IO) -> DbSchema:
+        return cls._from_element(ET.parse(file).getroot())
+
+    @classmethod
+    def dump_items(
+        cls,
+        contacts: Iterable[ContactItemTypeAlias],
+        books: Iterable[BookItemTypeAlias],
+        file: IO,
+    ) -> None:
+        file.write("<DbSchema><contacts>")
+        for cid, info in contacts:
+            fields = "".join(
+                f"<{key} />" if value is None else f"<{key}>{escape(value)}</{key}>"
+                for key, value in info.items()
+            )
+            file.write(f'<contact id="{cid}">{fields}</contact>')
+        file.write("</contacts><books>")
+        for book_name, ids in books:
+            members = "".join(f"<contact_id>{cid}</contact_id>" for cid in ids)
+            file.write(f"<book name={quoteattr(book_name)}>{members}</book>")
+        file.write("</books></DbSchema>")
+
+    @classmethod
+    def load_contacts(cls, file: IO) -> Iterator[ContactItemTypeAlias]:
+        for contact in _iter_records(file, "contact"):
+            yield int(contact.get("id")), {child.tag: child.text for child in contact}
+
+    @classmethod
+    def load_books(cls, file: IO) -> Iterator[BookItemTypeAlias]:
+        for book in _iter_records(file, "book"):
+            yield book.get("name"), [
+                int(cid.text) for cid in book.findall("contact_id")
+            ]
+
+    @staticmethod
+    def _to_element(data: DbSchema) -> ET.Element:
         root = ET.Element("DbSchema")
         contacts = ET.SubElement(root, "contacts")
         for cid, info in data.contacts.items():
@@ -23,11 +95,10 @@ class XMLStrategy(ISerializeStrategy):
             for cid in ids:
                 ET.SubElement(book, "contact_id").text = str(cid)
 
-        return ET.tostring(root, encoding="unicode")
+        return root
 
-    @classmethod
-    def deserialize(cls, data: str) -> DbSchema:
-        root = ET.fromstring(data)
+    @staticmethod
+    def _from_element(root: ET.Element) -> DbSchema:
         contacts = {}
         for contact in root.find("contacts").findall("contact"):
             cid = int(contact.get("id"))
@@ -1,7 +1,7 @@
 from ..database.db_schema import DbSchema
 from .base_serialization import ISerializeStrategy
 import yaml
-from dataclasses import asdict
+from typing import IO
 
 
 class YAMLStrategy(ISerializeStrategy):
@@ -13,7 +13,7 @@ class YAMLStrategy(ISerializeStrategy):
     def serialize(cls, data: DbSchema) -> str:
         """Serialize the DbSchema object to a YAML string."""
         # Convert the DbSchema object to a dictionary before serialization
-        schema_dict = asdict(data)
+        schema_dict = data.as_dict()
         return yaml.dump(schema_dict)
 
     @classmethod
@@ -22,3 +22,13 @@ class YAMLStrategy(ISerializeStrategy):
         # Convert the YAML string to a dictionary and then to a DbSchema object
         schema_dict = yaml.safe_load(data)
         return DbSchema(**schema_dict)
+
+    @classmethod
+    def dump(cls, data: DbSchema, file: IO) -> None:
+        """Serialize the DbSchema object into a YAML stream."""
+        yaml.dump(data.as_dict(), file)
+
+    @classmethod
+    def load(cls, file: IO) -> DbSchema:
+        """Deserialize a YAML stream, read in chunks, to a DbSchema object."""
+        return DbSchema(**yaml.safe_load(file))
@@ -0,0 +1,447 @@
+"""HTTP API of an address book database, served with asyncio and the standard library.
+
+Endpoints (JSON unless noted):
+    GET  /books                      List books: `[{"name": ..., "size": ...}]`
+    POST /books                      Create a book: `{"name": ...}`
+    GET  /books/<name>               A book with its contacts
+    GET  /books/<name>/contacts      The contacts of a book. Query parameters (name,
+                                     address, phone_no) filter them with glob
+                                     patterns, e.g. `?name=John*`
+    POST /books/<name>/contacts      Add a contact: `{"name", "address", "phone_no"}`
+    GET  /render?format=html         The database rendered by a viewer (html, md, jsonl,
+                                     csv)
+    GET  /stats                      Request and write batching counters
+
+Connections are kept alive (HTTP/1.1). Writes received while the previous batch is
+being written, or within `batch_delay_ms`, are applied together with a single
+storage write (see `DatabaseManager.apply_batch`).
+
+Usage:
+    python -m address_app.server --root tests --format json --port 4000
+"""
+import argparse
+import asyncio
+import json
+from dataclasses import dataclass, asdict
+from http import HTTPStatus
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, unquote, urlsplit
+
+from .async_adb import AsyncAdbConnector
+from .base import get_logger
+from .base.exceptions import (
+    AddressAppException,
+    AddressBookExistsException,
+    AddressBookNotFoundException,
+    ContactExistsException,
+    InvalidBookNameException,
+    InvalidContactDataException,
+)
+from .database.async_db_manager import AsyncDatabaseManager
+from .database.db_manager import BatchOperationTypeAlias
+
+logger = get_logger()
+
+#: Default port, published by docker-compose.yml
+DEFAULT_PORT = 4000
+
+#: Default time to wait for more writes before writing a batch, in milliseconds
+DEFAULT_BATCH_DELAY_MS = 2
+
+#: Maximum number of writes applied with one storage write
+DEFAULT_MAX_BATCH = 512
+
+#: Seconds an idle keep-alive connection stays open
+KEEP_ALIVE_TIMEOUT = 15
+
+#: Fields of a contact, by which the contacts of a book can be filtered
+CONTACT_FIELDS = ("name", "address", "phone_no")
+
+#: Maximum size of a request line or header line, and of a request body
+MAX_LINE_SIZE = 8 * 1024
+MAX_BODY_SIZE = 1024 * 1024
+
+#: HTTP status of the exceptions of failed writes
+_ERROR_STATUS = {
+    AddressBookExistsException: HTTPStatus.CONFLICT,
+    ContactExistsException: HTTPStatus.CONFLICT,
+    AddressBookNotFoundException: HTTPStatus.NOT_FOUND,
+    InvalidContactDataException: HTTPStatus.BAD_REQUEST,
+    InvalidBookNameException: HTTPStatus.BAD_REQUEST,
+}
+
+#: Content type of the renderings by format, text/plain for the others
+_RENDER_CONTENT_TYPES = {
+    "html": "text/html",
+    "jsonl": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+
+class HttpError(Exception):
+    def __init__(self, status: HTTPStatus, message: Optional[str] = None):
+        self.status = status
+        self.message = message or status.phrase
+        super().__init__(self.message)
+
+
+@dataclass
+class ServerStats:
+    """Counters of an AdbServer."""
+
+    requests: int = 0
+    connections: int = 0
+    writes: int = 0
+    batches: int = 0
+
+    @property
+    def avg_batch_size(self) -> float:
+        return self.writes / self.batches if self.batches else 0.0
+
+
+class WriteBatcher:
+    """Groups concurrent writes into batches applied with a single storage write.
+
+    A batch is written as soon as the previous one is done, after waiting
+    `delay_ms` for more writes to join it, so under load batches grow with the
+    number of waiting requests while a lone write only waits `delay_ms`.
+
+    Args:
+        db_manager (AsyncDatabaseManager): The manager applying the batches.
+        stats (ServerStats): Counters to update.
+        delay_ms (float): Time to wait for more writes before writing a batch.
+        max_batch (int): Maximum number of writes in a batch.
+    """
+
+    def __init__(
+        self,
+        db_manager: AsyncDatabaseManager,
+        stats: ServerStats,
+        delay_ms: float = DEFAULT_BATCH_DELAY_MS,
+        max_batch: int = DEFAULT_MAX_BATCH,
+    ):
+        self._db_manager = db_manager
+        self._stats = stats
+        self._delay = delay_ms / 1000
+        self._max_batch = max_batch
+        self._pending: List[Tuple[BatchOperationTypeAlias, asyncio.Future]] = []
+        self._task: Optional[asyncio.Future] = None
+
+    async def submit(self, operation: BatchOperationTypeAlias):
+        """Queue a write and return its result, see `DatabaseManager.apply_batch`.
+        A write whose caller is cancelled is still applied.
+        """
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((operation, future))
+        if self._task is None:
+            self._task = asyncio.ensure_future(self._run())
+        return await future
+
+    async def _run(self):
+        try:
+            while self._pending:
+                if self._delay:
+                    await asyncio.sleep(self._delay)
+                batch = self._pending[: self._max_batch]
+                del self._pending[: self._max_batch]
+                try:
+                    results = await self._db_manager.apply_batch(
+                        operation for operation, _ in batch
+                    )
+                except Exception as e:
+                    results = [e] * len(batch)
+                    failed = True
+                else:
+                    failed = False
+                self._stats.batches += 1
+                self._stats.writes += len(batch)
+                for (_, future), result in zip(batch, results):
+                    if future.done():
+                        continue
+                    if failed:
+                        future.set_exception(result)
+                    else:
+                        future.set_result(result)
+        finally:
+            self._task = None
+
+
+class AdbServer:
+    """HTTP server of the endpoints listed in `address_app.server`.
+
+    Args:
+        adb (AsyncAdbConnector): The database to serve.
+        batch_delay_ms (float): See `WriteBatcher`.
+        max_batch (int): See `WriteBatcher`.
+    """
+
+    def __init__(
+        self,
+        adb: AsyncAdbConnector,
+        batch_delay_ms: float = DEFAULT_BATCH_DELAY_MS,
+        max_batch: int = DEFAULT_MAX_BATCH,
+    ):
+        self._adb = adb
+        self.stats = ServerStats()
+        self._batcher = WriteBatcher(
+            adb.db_manager, self.stats, batch_delay_ms, max_batch
+        )
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._connections: Dict[asyncio.StreamWriter, asyncio.Task] = {}
+
+    async def start(self, host: str = "127.0.0.1", port: int = DEFAULT_PORT):
+        """Start listening. Port 0 picks a free port, see `port`."""
+        self._server = await asyncio.start_server(
+            self._serve_connection, host, port, limit=MAX_LINE_SIZE
+        )
+
+    @property
+    def port(self) -> int:
+        return self._server.sockets[0].getsockname()[1]
+
+    async def serve_forever(self):
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def close(self):
+        """Stop listening and close the open connections, once their current
+        request, if any, is answered.
+        """
+        self._server.close()
+        connections = list(self._connections.items())
+        for writer, _ in connections:
+            writer.close()
+        await asyncio.gather(*(task for _, task in connections), return_exceptions=True)
+        await self._server.wait_closed()
+
+    async def _serve_connection(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ):
+        self.stats.connections += 1
+        self._connections[writer] = asyncio.current_task()
+        try:
+            keep_alive = True
+            while keep_alive:
+                try:
+                    request = await asyncio.wait_for(
+                        self._read_request(reader), KEEP_ALIVE_TIMEOUT
+                    )
+                except HttpError as e:
+                    self._write_response(writer, e.status, {"error": e.message}, False)
+                    break
+                if request is None:
+                    break
+                method, target, version, headers, body = request
+                connection = headers.get("connection", "").lower()
+                keep_alive = (
+                    connection != "close"
+                    if version == "HTTP/1.1"
+                    else connection == "keep-alive"
+                )
+                self.stats.requests += 1
+                status, payload = await self._dispatch(method, target, body)
+                self._write_response(writer, status, payload, keep_alive)
+                await writer.drain()
+        except (asyncio.TimeoutError, ConnectionError, asyncio.IncompleteReadError):
+            pass
+        except asyncio.CancelledError:
+            # The event loop is shutting down
+            pass
+        finally:
+            del self._connections[writer]
+            writer.close()
+
+    async def _read_request(self, reader: asyncio.StreamReader):
+        """Return the method, target, version, headers and body of the next request,
+        or None once the client closed the connection.
+        """
+        try:
+            line = await reader.readline()
+        except (asyncio.LimitOverrunError, ValueError):
+            raise HttpError(HTTPStatus.REQUEST_URI_TOO_LONG)
+        if not line:
+            return None
+        try:
+            method, target, version = line.decode("latin-1").split()
+        except ValueError:
+            raise HttpError(HTTPStatus.BAD_REQUEST, "Malformed request line")
+
+        headers: Dict[str, str] = {}
+        while True:
+            try:
+                line = await reader.readline()
+            except (asyncio.LimitOverrunError, ValueError):
+                raise HttpError(HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE)
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        if "chunked" in headers.get("transfer-encoding", "").lower():
+            raise HttpError(HTTPStatus.LENGTH_REQUIRED)
+        try:
+            length = int(headers.get("content-length", 0))
+        except ValueError:
+            raise HttpError(HTTPStatus.BAD_REQUEST, "Invalid Content-Length")
+        if length > MAX_BODY_SIZE:
+            raise HttpError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE)
+        body = await reader.readexactly(length) if length else b""
+        return method.upper(), target, version, headers, body
+
+    @staticmethod
+    def _write_response(
+        writer: asyncio.StreamWriter, status: HTTPStatus, payload, keep_alive: bool
+    ):
+        if isinstance(payload, tuple):
+            content_type, body = payload
+        else:
+            content_type = "application/json"
+            body = json.dumps(payload)
+        body = body.encode("utf-8")
+        head = (
+            f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+            f"Content-Type: {content_type}; charset=utf-8\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+        )
+        writer.write(head.encode("latin-1") + body)
+
+    async def _dispatch(self, method: str, target: str, body: bytes):
+        url = urlsplit(target)
+        parts = [unquote(part) for part in url.path.strip("/").split("/") if part]
+        query = dict(parse_qsl(url.query))
+        try:
+            return await self._route(method, parts, query, body)
+        except HttpError as e:
+            return e.status, {"error": e.message}
+        except Exception as e:
+            logger.error(f"{method} {target} failed: {e}")
+            return HTTPStatus.INTERNAL_SERVER_ERROR, {"error": "Internal error"}
+
+    async def _route(self, method: str, parts: List[str], query: dict, body: bytes):
+        db = self._adb.db_manager
+        if parts == ["books"]:
+            if method == "GET":
+                books = await db.list_books()
+                return HTTPStatus.OK, [{"name": b.name, "size": len(b)} for b in books]
+            if method == "POST":
+                name = _field(_json(body), "name")
+                book = await self._write(("add_book", name))
+                return HTTPStatus.CREATED, {"name": book.name, "size": len(book)}
+        elif len(parts) == 2 and parts[0] == "books" and method == "GET":
+            book = await db.get_book(parts[1])
+            if book is None:
+                raise HttpError(HTTPStatus.NOT_FOUND, f"`{parts[1]}` not found")
+            contacts = await db.list_contacts(parts[1])
+            return HTTPStatus.OK, {
+                "name": book.name,
+                "contacts": [contact.as_dict() for contact in contacts],
+            }
+        elif len(parts) == 3 and parts[0] == "books" and parts[2] == "contacts":
+            if method == "GET":
+                if await db.get_book(parts[1]) is None:
+                    raise HttpError(HTTPStatus.NOT_FOUND, f"`{parts[1]}` not found")
+                unknown = sorted(set(query) - set(CONTACT_FIELDS))
+                if unknown:
+                    raise HttpError(
+                        HTTPStatus.BAD_REQUEST, f"Unknown contact fields: {unknown}"
+                    )
+                if query:
+                    contacts = await db.find_contacts(parts[1], **query)
+                else:
+                    contacts = await db.list_contacts(parts[1])
+                return HTTPStatus.OK, [contact.as_dict() for contact in contacts]
+            if method == "POST":
+                fields = _json(body)
+                contact = await self._write(
+                    (
+                        "add_contact",
+                        parts[1],
+                        _field(fields, "name"),
+                        _field(fields, "address"),
+                        _field(fields, "phone_no", required=False),
+                    )
+                )
+                return HTTPStatus.CREATED, contact.as_dict()
+        elif parts == ["render"] and method == "GET":
+            format = query.get("format", "html")
+            rendered = await self._adb.render(format)
+            if rendered is None:
+                raise HttpError(HTTPStatus.BAD_REQUEST, f"Unknown format: {format}")
+            content_type = _RENDER_CONTENT_TYPES.get(format, "text/plain")
+            return HTTPStatus.OK, (content_type, rendered)
+        elif parts == ["stats"] and method == "GET":
+            return HTTPStatus.OK, dict(
+                asdict(self.stats), avg_batch_size=self.stats.avg_batch_size
+            )
+        raise HttpError(HTTPStatus.NOT_FOUND)
+
+    async def _write(self, operation: BatchOperationTypeAlias):
+        result = await self._batcher.submit(operation)
+        if isinstance(result, AddressAppException):
+            status = next(
+                (s for e, s in _ERROR_STATUS.items() if isinstance(result, e)),
+                HTTPStatus.BAD_REQUEST,
+            )
+            raise HttpError(status, result.message)
+        return result
+
+
+def _json(body: bytes) -> dict:
+    try:
+        data = json.loads(body.decode("utf-8"))
+    except (UnicodeDecodeError, ValueError):
+        raise HttpError(HTTPStatus.BAD_REQUEST, "Invalid JSON body")
+    if not isinstance(data, dict):
+        raise HttpError(HTTPStatus.BAD_REQUEST, "Expected a JSON object")
+    return data
+
+
+def _field(data: dict, name: str, required: bool = True) -> Optional[str]:
+    """Return a string field of a request body, None if it is optional and missing."""
+    value = data.get(name)
+    if value is None:
+        if required:
+            raise HttpError(HTTPStatus.BAD_REQUEST, f"Missing field: {name}")
+        return None
+    if not isinstance(value, str):
+        raise HttpError(HTTPStatus.BAD_REQUEST, f"Field {name} must be a string")
+    return value
+
+
+async def serve(
+    root: Optional[str] = None,
+    format: str = "json",
+    host: str = "127.0.0.1",
+    port: int = DEFAULT_PORT,
+    **options,
+):
+    """Serve the database of `root` until cancelled."""
+    adb = AsyncAdbConnector(root, format, **options)
+    server = AdbServer(adb)
+    await server.start(host, port)
+    logger.info(f"Serving {adb.storage_filepath} on http://{host}:{server.port}")
+    try:
+        await server.serve_forever()
+    finally:
+        await adb.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--root", default=None)
+    parser.add_argument("--format", default="json")
+    parser.add_argument("--storage", default="filesystem")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    args = parser.parse_args()
+    try:
+        asyncio.run(
+            serve(args.root, args.format, args.host, args.port, storage=args.storage)
+        )
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,373 @@
+import hashlib
+from bisect import bisect
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Union
+
+from .adb import AdbConnector
+from .base import get_logger
+from .base.book import Book
+from .base.contact import Contact
+from .base.exceptions import (
+    AddressAppException,
+    AddressBookExistsException,
+    ContactExistsException,
+)
+from .database.db_manager import BatchOperationTypeAlias
+from .database.db_schema import DbSchema
+
+logger = get_logger()
+
+#: Points of every root on the hash ring. More points spread books more evenly.
+DEFAULT_VIRTUAL_NODES = 64
+
+
+def _hash(key: str) -> int:
+    return int.from_bytes(
+        hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest(), "big"
+    )
+
+
+class HashRing:
+    """Consistent hashing of keys onto nodes.
+
+    Every node is placed at `virtual_nodes` points of a ring of 64-bit hashes, and a
+    key belongs to the node of the first point at or after its own hash. Adding a
+    node only moves the keys that now fall on its points, about 1/N of them, and
+    removing one only moves its own keys.
+
+    Example:
+        >>> ring = HashRing(["/mnt/a", "/mnt/b"])
+        >>> ring.node("Friends")
+        '/mnt/a'
+    """
+
+    def __init__(
+        self, nodes: Iterable[str] = (), virtual_nodes: int = DEFAULT_VIRTUAL_NODES
+    ):
+        self._virtual_nodes = virtual_nodes
+        self._nodes: List[str] = []
+        self._points: List[int] = []
+        self._owners: List[str] = []
+        for node in nodes:
+            self.add(node)
+
+    @property
+    def nodes(self) -> List[str]:
+        return list(self._nodes)
+
+    def add(self, node: str):
+        if node in self._nodes:
+            raise ValueError(f"{node} is already on the ring")
+        self._nodes.append(node)
+        self._rebuild()
+
+    def remove(self, node: str):
+        self._nodes.remove(node)
+        self._rebuild()
+
+    def _rebuild(self):
+        points = sorted(
+            (_hash(f"{node}#{i}"), node)
+            for node in self._nodes
+            for i in range(self._virtual_nodes)
+        )
+        self._points = [point for point, _ in points]
+        self._owners = [node for _, node in points]
+
+    def node(self, key: str) -> str:
+        """Return the node owning `key`."""
+        if not self._points:
+            raise LookupError("The ring has no nodes")
+        i = bisect(self._points, _hash(key)) % len(self._points)
+        return self._owners[i]
+
+
+class ShardedDatabaseManager:
+    """DatabaseManager interface over the databases of several roots.
+
+    Every book lives in the root its shard key hashes to (see `HashRing`), so calls
+    about one book go to a single root, while listing and searching all books fan
+    out to every root in parallel.
+
+    Args:
+        connector (ShardedAdbConnector): The connector of the roots.
+    """
+
+    def __init__(self, connector: "ShardedAdbConnector"):
+        self._connector = connector
+
+    def _manager(self, book_name: str):
+        return self._connector.shard(book_name).db_manager
+
+    def get_database_content(self) -> DbSchema:
+        """Get the contents of all the roots, merged in a read-only snapshot."""
+        snapshots = self._connector.map(
+            lambda adb: adb.db_manager.get_database_content()
+        )
+        merged = DbSchema()
+        for snapshot in snapshots:
+            merged.contacts.update(snapshot.contacts)
+            merged.books.update(snapshot.books)
+        return merged.freeze()
+
+    def list_books(self) -> List[Book]:
+        """List the books of all the roots."""
+        books = self._connector.map(lambda adb: adb.db_manager.list_books())
+        return [book for shard_books in books for book in shard_books]
+
+    def get_book(self, name: str) -> Union[Book, None]:
+        """See `DatabaseManager.get_book`."""
+        return self._manager(name).get_book(name)
+
+    def add_book(self, book: Book) -> bool:
+        """See `DatabaseManager.add_book`."""
+        return self._manager(book.name).add_book(book)
+
+    def create_empty_book(self, name: str) -> bool:
+        """See `DatabaseManager.create_empty_book`."""
+        return self._manager(name).create_empty_book(name)
+
+    def remove_book(self, name: str) -> bool:
+        """See `DatabaseManager.remove_book`."""
+        return self._manager(name).remove_book(name)
+
+    def add_contact(
+        self, book_name: str, name: str, address: str, phoneno: str
+    ) -> Union[Contact, None]:
+        """See `DatabaseManager.add_contact`."""
+        return self._manager(book_name).add_contact(book_name, name, address, phoneno)
+
+    def update_contact(
+        self, name: str, address: str, phoneno: str
+    ) -> Union[Contact, None]:
+        """See `DatabaseManager.update_contact`. Updates the contact in every root."""
+        (result,) = self.apply_batch([("update_contact", name, address, phoneno)])
+        if isinstance(result, AddressAppException):
+            logger.warning(f"Contact not updated: {result.message}")
+            return None
+        return result
+
+    def list_contacts(self, book_name: str) -> List[Contact]:
+        """See `DatabaseManager.list_contacts`."""
+        return self._manager(book_name).list_contacts(book_name)
+
+    def find_contacts(self, book_name: str, **criteria) -> List[Contact]:
+        """See `DatabaseManager.find_contacts`."""
+        return self._manager(book_name).find_contacts(book_name, **criteria)
+
+    def search(self, **criteria) -> Dict[str, List[Contact]]:
+        """Find the contacts matching the criteria in every book of every root.
+
+        Args:
+            **criteria: Glob patterns, see `DatabaseManager.find_contacts`.
+
+        Returns:
+            Dict[str, List[Contact]]: The matching contacts by book name, for the
+                books with at least one match.
+        """
+
+        def search_shard(adb: AdbConnector) -> Dict[str, List[Contact]]:
+            manager = adb.db_manager
+            found = {}
+            for book in manager.list_books():
+                contacts = manager.find_contacts(book.name, **criteria)
+                if contacts:
+                    found[book.name] = contacts
+            return found
+
+        results = {}
+        for found in self._connector.map(search_shard):
+            results.update(found)
+        return results
+
+    def apply_batch(
+        self, operations: Iterable[BatchOperationTypeAlias]
+    ) -> List[Union[Book, Contact, AddressAppException]]:
+        """See `DatabaseManager.apply_batch`. Operations are grouped by root and
+        every root applies its group with a single write, in parallel.
+
+        Contacts are not placed by book, so `update_contact` operations go to every
+        root; they fail only if the contact is in none of them.
+        """
+        operations = list(operations)
+        groups: Dict[str, List[int]] = {}
+        for i, operation in enumerate(operations):
+            if operation[0] == "update_contact":
+                roots = self._connector.roots
+            else:
+                roots = [self._connector.root_of(operation[1])]
+            for root in roots:
+                groups.setdefault(root, []).append(i)
+
+        def apply(root: str):
+            manager = self._connector.connector(root).db_manager
+            return manager.apply_batch(operations[i] for i in groups[root])
+
+        results: List = [None] * len(operations)
+        for root, group_results in zip(groups, self._connector.map(apply, groups)):
+            for i, result in zip(groups[root], group_results):
+                if results[i] is None or isinstance(results[i], AddressAppException):
+                    results[i] = result
+        return results
+
+    def clear_database(self):
+        """Clear the databases of all the roots."""
+        self._connector.map(lambda adb: adb.db_manager.clear_database())
+
+
+class ShardedAdbConnector:
+    """
+    Spreads address books over several root directories, e.g. one per disk, with
+    consistent hashing.
+
+    Books are placed by the hash of their shard key, the book name by default. A
+    `shard_key` function can place books by tenant instead, keeping all the books
+    of a tenant in one root, e.g. `shard_key=lambda name: name.split("/")[0]` for
+    names such as "acme/customers".
+
+    Every root is an `AdbConnector`, with the given format, storage and options.
+    The placement depends on the list of roots: use `add_root` and `remove_root`
+    to change it, which move only the books whose root changed. After opening the
+    roots with a different list, call `rebalance`.
+
+    Args:
+        roots (Iterable[str]): The root directories.
+        format (Optional[str]): The serialization format, see `AdbConnector`.
+        storage (Optional[str]): The storage kind, see `AdbConnector`.
+        shard_key (Optional[Callable[[str], str]]): Maps a book name to the key
+            hashed to place it. Default is the book name.
+        virtual_nodes (int): Points of every root on the hash ring.
+        **storage_options: Storage specific options, see `AdbConnector`.
+
+    Example:
+        >>> adb = ShardedAdbConnector(["/mnt/disk1/adb", "/mnt/disk2/adb"])
+        >>> adb.db_manager.create_empty_book("Friends")
+        >>> adb.root_of("Friends")
+        '/mnt/disk2/adb'
+    """
+
+    def __init__(
+        self,
+        roots: Iterable[str],
+        format: Optional[str] = "json",
+        storage: Optional[str] = "filesystem",
+        shard_key: Optional[Callable[[str], str]] = None,
+        virtual_nodes: int = DEFAULT_VIRTUAL_NODES,
+        **storage_options,
+    ):
+        self._format = format
+        self._storage = storage
+        self._storage_options = storage_options
+        self._shard_key = shard_key or (lambda name: name)
+        self._ring = HashRing(
+            (str(Path(root).resolve()) for root in roots), virtual_nodes
+        )
+        self._executor = ThreadPoolExecutor(thread_name_prefix="adb-shard")
+        self._db_manager = ShardedDatabaseManager(self)
+
+    @property
+    def db_manager(self) -> ShardedDatabaseManager:
+        """Returns the database manager routing calls to the roots."""
+        return self._db_manager
+
+    @property
+    def roots(self) -> List[str]:
+        """The resolved root directories."""
+        return self._ring.nodes
+
+    def connector(self, root: str) -> AdbConnector:
+        """Return the connector of a root, from the connector pool."""
+        return AdbConnector(root, self._format, self._storage, **self._storage_options)
+
+    def root_of(self, book_name: str) -> str:
+        """Return the root a book belongs to."""
+        return self._ring.node(self._shard_key(book_name))
+
+    def shard(self, book_name: str) -> AdbConnector:
+        """Return the connector of the root a book belongs to."""
+        return self.connector(self.root_of(book_name))
+
+    def map(self, function: Callable, roots: Optional[Iterable[str]] = None) -> list:
+        """Call `function` with the connector of every root (or with every root of
+        `roots`) in parallel, and return the results in order.
+        """
+        if roots is None:
+            calls = [(function, self.connector(root)) for root in self.roots]
+        else:
+            calls = [(function, root) for root in roots]
+        futures = [self._executor.submit(f, arg) for f, arg in calls]
+        return [future.result() for future in futures]
+
+    def add_root(self, root: str) -> int:
+        """Add a root and move to it the books that now belong to it.
+
+        Returns:
+            int: The number of books moved.
+        """
+        self._ring.add(str(Path(root).resolve()))
+        return self.rebalance()
+
+    def remove_root(self, root: str) -> int:
+        """Move the books of a root to the other roots and stop using it.
+
+        Returns:
+            int: The number of books moved.
+        """
+        root = str(Path(root).resolve())
+        self._ring.remove(root)
+        return self._move_misplaced(root)
+
+    def rebalance(self) -> int:
+        """Move every book that is not in the root it belongs to.
+
+        Returns:
+            int: The number of books moved.
+        """
+        # One root at a time: two roots moving books to the same root would race
+        return sum(self._move_misplaced(root) for root in self.roots)
+
+    def _move_misplaced(self, root: str) -> int:
+        """Move the books of `root` that belong to another root."""
+        source = self.connector(root).db_manager
+        moved = 0
+        for book in source.list_books():
+            target_root = self.root_of(book.name)
+            if target_root == root:
+                continue
+            # Copy, then remove: after a crash in between, moving again completes the
+            # copy. Contacts are added with their details, so they keep their ids.
+            operations = [("add_book", book.name)] + [
+                ("add_contact", book.name, c.name, c.address, c.phone_no)
+                for c in source.list_contacts(book.name)
+            ]
+            target = self.connector(target_root).db_manager
+            results = target.apply_batch(operations)
+            failed = [
+                result
+                for result in results
+                if isinstance(result, AddressAppException)
+                and not isinstance(
+                    result, (AddressBookExistsException, ContactExistsException)
+                )
+            ]
+            if failed:
+                raise failed[0]
+            source.remove_book(book.name)
+            moved += 1
+        if moved:
+            logger.info(f"Moved {moved} books out of {root}")
+        return moved
+
+    def flush(self) -> None:
+        """Writes buffered changes of every root."""
+        self.map(lambda adb: adb.flush())
+
+    def close(self) -> None:
+        """Writes buffered changes and releases the resources of every root."""
+        self.map(lambda adb: adb.close())
+        self._executor.shutdown()
+
+    def delete(self) -> None:
+        """Deletes the database storage of every root."""
+        self.map(lambda adb: adb.delete())
@@ -1 +1,7 @@
 from .filesystem_storage import DbFileSystemStorage, IStorage
+from .sqlite_storage import DbSqliteStorage
+from .sharded_storage import ShardedFileSystemStorage
+from .write_behind import WriteBehindStorage
+from .shared_cache import SharedCacheStorage
+from .replication import ReplicatedStorage
+from .storage_factory import StorageFactory, get_supported_storages
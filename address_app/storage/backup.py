@@ -0,0 +1,278 @@
+import hashlib
+import json
+import os
+import shutil
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from .durability import atomic_replace, remove_path
+from ..base import get_logger
+from ..base.consts import DURABILITY_FSYNC
+from ..base.exceptions import BackupNotFoundException
+from ..database.db_schema import DbSchema, DbContactsTypeAlias
+from ..serialize.base_serialization import ISerializeStrategy
+
+#: Version of the backup manifest layout
+BACKUP_VERSION = 1
+
+#: Name of the manifest file inside a backup directory
+MANIFEST_FILENAME = "manifest.json"
+
+#: Number of contact segments. Contact ids are split into equal id ranges.
+CONTACT_SEGMENTS = 64
+
+#: Contact ids are 32-bit hashes, see `Contact.id`
+_CONTACT_ID_BITS = 32
+
+
+@dataclass
+class BackupInfo:
+    """Summary of a backup, read from its manifest."""
+
+    id: str
+    #: The backup this one is a delta of, None for a full snapshot
+    parent: Optional[str]
+    #: Time of the backup, in seconds since the epoch
+    created: float
+    #: Number of segment files of the backup
+    segments: int
+    #: Segments written by this backup; the others are hard links to the parent's
+    changed: int
+    #: Size of the segments written by this backup
+    bytes_written: int
+
+    @property
+    def full(self) -> bool:
+        return self.parent is None
+
+
+def _book_segment(name: str, extension: str) -> str:
+    digest = hashlib.sha256(name.encode("utf-8")).hexdigest()[:16]
+    return f"book-{digest}.{extension}"
+
+
+def _contact_segment(contact_id: int, extension: str) -> str:
+    id_range = contact_id & ((1 << _CONTACT_ID_BITS) - 1)
+    segment = (id_range * CONTACT_SEGMENTS) >> _CONTACT_ID_BITS
+    return f"contacts-{segment:04d}.{extension}"
+
+
+def _segments(data: DbSchema, extension: str) -> Dict[str, DbSchema]:
+    """Split the database into segments: one per book, and contacts by id range."""
+    segments = {
+        _book_segment(name, extension): DbSchema(books={name: list(ids)})
+        for name, ids in data.books.items()
+    }
+    contacts: Dict[str, DbContactsTypeAlias] = {}
+    for cid, info in data.contacts.items():
+        contacts.setdefault(_contact_segment(cid, extension), {})[cid] = info
+    segments.update(
+        (filename, DbSchema(contacts=segment))
+        for filename, segment in contacts.items()
+    )
+    return segments
+
+
+def _link(source: Path, target: Path):
+    """Hard link a segment file (or the files of a segment directory), or copy it
+    where hard links are not supported.
+    """
+    if source.is_dir():
+        target.mkdir()
+        for path in source.iterdir():
+            _link(path, target / path.name)
+        return
+    try:
+        os.link(source, target)
+    except OSError:
+        shutil.copy2(source, target)
+
+
+def _size(path: Path) -> int:
+    if path.is_dir():
+        return sum(_size(child) for child in path.iterdir())
+    return path.stat().st_size
+
+
+def _read_manifest(path: Path) -> dict:
+    with open(path / MANIFEST_FILENAME, "r") as file:
+        return json.load(file)
+
+
+def _info(manifest: dict) -> BackupInfo:
+    return BackupInfo(
+        id=manifest["id"],
+        parent=manifest["parent"],
+        created=manifest["created"],
+        segments=len(manifest["segments"]),
+        changed=len(manifest["changed"]),
+        bytes_written=manifest["bytes_written"],
+    )
+
+
+def _manifests(backup_dir: Path) -> List[dict]:
+    """Return the manifests of the backups, oldest first. Directories left behind
+    by an interrupted `atomic_replace` hold a manifest too, but not their id.
+    """
+    if not backup_dir.is_dir():
+        return []
+    manifests = []
+    for path in sorted(backup_dir.iterdir()):
+        if path.suffix == ".tmp" or not (path / MANIFEST_FILENAME).exists():
+            continue
+        manifest = _read_manifest(path)
+        if manifest["id"] == path.name:
+            manifests.append(manifest)
+    return manifests
+
+
+def list_backups(backup_dir: Path) -> List[BackupInfo]:
+    """Return the backups of a backup directory, oldest first."""
+    return [_info(manifest) for manifest in _manifests(Path(backup_dir))]
+
+
+def create_backup(
+    data: DbSchema,
+    strategy: ISerializeStrategy,
+    backup_dir: Path,
+    full: bool = False,
+    durability: str = DURABILITY_FSYNC,
+) -> BackupInfo:
+    """Back up the database into a new directory of `backup_dir`.
+
+    The database is split into segments, one per book and one per id range of
+    contacts, each serialized with `strategy`. Unless `full` is set or there is no
+    earlier backup, the backup is a delta of the latest one: only the segments whose
+    data changed (see `DbSchema.fingerprint`) are written, the others are hard links
+    to the files of the latest backup. A backup therefore costs in proportion to the
+    changes since the previous one, while every backup directory still holds all of
+    its segments, so older backups can be removed (see `remove_backups`).
+
+    Returns:
+        BackupInfo: The new backup.
+    """
+    backup_dir = Path(backup_dir)
+    manifests = _manifests(backup_dir)
+    parent = manifests[-1] if manifests and not full else None
+    sequence = int(manifests[-1]["id"].split("-")[0]) + 1 if manifests else 1
+    created = time.time()
+    timestamp = time.strftime("%Y%m%dT%H%M%S", time.gmtime(created))
+    backup_id = f"{sequence:06d}-{timestamp}"
+
+    extension = strategy.format()
+    segments = _segments(data, extension)
+    fingerprints = {
+        filename: segment.fingerprint() for filename, segment in segments.items()
+    }
+    parent_fingerprints = parent["segments"] if parent else {}
+    parent_format = parent["format"] if parent else None
+    changed = [
+        filename
+        for filename, fingerprint in fingerprints.items()
+        if parent_format != extension
+        or parent_fingerprints.get(filename) != fingerprint
+    ]
+    manifest = {
+        "version": BACKUP_VERSION,
+        "id": backup_id,
+        "parent": parent["id"] if parent else None,
+        "created": created,
+        "format": extension,
+        "books": {name: _book_segment(name, extension) for name in data.books},
+        "segments": fingerprints,
+        "changed": changed,
+        "bytes_written": 0,
+    }
+
+    def write(tmp_path: Path):
+        tmp_path.mkdir(parents=True)
+        for filename in changed:
+            strategy.write_file(segments[filename], tmp_path / filename)
+            manifest["bytes_written"] += _size(tmp_path / filename)
+        changed_set = set(changed)
+        for filename in segments:
+            if filename not in changed_set:
+                _link(backup_dir / parent["id"] / filename, tmp_path / filename)
+        with open(tmp_path / MANIFEST_FILENAME, "w") as file:
+            json.dump(manifest, file)
+
+    atomic_replace(write, backup_dir / backup_id, durability)
+    info = _info(manifest)
+    get_logger().info(
+        f"Backup {backup_id}: {info.changed} of {info.segments} segments written, "
+        f"{info.bytes_written} bytes"
+    )
+    return info
+
+
+def load_backup(
+    strategy: ISerializeStrategy, backup_dir: Path, backup_id: Optional[str] = None
+) -> DbSchema:
+    """Return the database as of a backup, the latest one by default.
+
+    The oldest backup of its chain that is still present is loaded whole, then the
+    changed segments of every later backup are replayed over it, in order.
+
+    Args:
+        strategy (ISerializeStrategy): The strategy the backup was written with.
+        backup_dir (Path): The backup directory.
+        backup_id (Optional[str]): The backup, see `list_backups`.
+
+    Raises:
+        BackupNotFoundException: If there is no such backup.
+        ValueError: If the backup was written with another strategy.
+    """
+    backup_dir = Path(backup_dir)
+    manifests = {manifest["id"]: manifest for manifest in _manifests(backup_dir)}
+    if backup_id is None and manifests:
+        backup_id = max(manifests)
+    if backup_id not in manifests:
+        raise BackupNotFoundException(str(backup_dir), backup_id)
+    if manifests[backup_id]["format"] != strategy.format():
+        raise ValueError(
+            f"Backup {backup_id} is in {manifests[backup_id]['format']} format, "
+            f"not {strategy.format()}"
+        )
+
+    # A backup in another format than its parent wrote all of its segments
+    chain = [manifests[backup_id]]
+    while chain[-1]["parent"] in manifests:
+        parent = manifests[chain[-1]["parent"]]
+        if parent["format"] != strategy.format():
+            break
+        chain.append(parent)
+    chain.reverse()
+
+    segments: Dict[str, DbSchema] = {}
+    for i, manifest in enumerate(chain):
+        filenames = manifest["segments"] if i == 0 else manifest["changed"]
+        for filename in filenames:
+            path = backup_dir / manifest["id"] / filename
+            segments[filename] = strategy.read_file(path)
+        # Segments of removed books and emptied contact ranges
+        for filename in set(segments) - set(manifest["segments"]):
+            del segments[filename]
+
+    data = DbSchema()
+    for filename, segment in segments.items():
+        data.contacts.update(segment.contacts)
+        data.books.update((name, list(ids)) for name, ids in segment.books.items())
+    return data
+
+
+def remove_backups(backup_dir: Path, keep: int) -> List[str]:
+    """Remove all but the `keep` latest backups. Later backups stay complete, as
+    they hold hard links to the segments they share with the removed ones.
+
+    Returns:
+        List[str]: The ids of the removed backups.
+    """
+    backup_dir = Path(backup_dir)
+    manifests = _manifests(backup_dir)
+    count = max(0, len(manifests) - keep)
+    removed = [manifest["id"] for manifest in manifests[:count]]
+    for backup_id in removed:
+        remove_path(backup_dir / backup_id)
+    return removed
@@ -1,13 +1,259 @@
+import fnmatch
+import random
+import time
 from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Callable, Dict, Hashable, List, Optional, Tuple
 
-# TODO: Implement the Factory pattern for creating different storage objects
+from ..base import get_logger
+from ..base.exceptions import (
+    AddressBookExistsException,
+    AddressBookNotFoundException,
+    ContactExistsException,
+    VersionConflictException,
+)
+from ..database.db_schema import (
+    DbSchema,
+    DbBooksTypeAlias,
+    BookContactIdsTypeAlias,
+    ContactDictTypeAlias,
+)
+from ..serialize.base_serialization import ISerializeStrategy
+
+#: Default number of times `IStorage.update` applies a mutation again after a
+#: version conflict, before giving up
+DEFAULT_UPDATE_RETRIES = 100
+
+#: Upper bound of the random delay before applying a mutation again, in seconds
+_MAX_RETRY_DELAY = 0.05
 
 
 class IStorage(ABC):
+    """Storage of the database.
+
+    Implementations must provide `read` and `write` of the whole DbSchema object.
+    The finer-grained operations used by DatabaseManager are implemented here as a
+    read-modify-write of the whole schema (see `update`); storages that can do
+    better (e.g. a database) override them.
+
+    Storages that version the stored database set `DbSchema.version` on the data
+    they read, and `write` with an `expected_version` only replaces the database if
+    it is still at that version, so that concurrent read-modify-writes, from threads
+    or processes, never silently drop each other's changes.
+    """
+
+    #: Whether the database lives in a storage file (or directory) whose version,
+    #: see `durability.stat_key`, changes whenever the database does
+    file_based = False
+
+    @classmethod
+    @abstractmethod
+    def kind(cls) -> str:
+        """Return the name the storage is registered under, e.g. "filesystem"."""
+        pass
+
+    @classmethod
+    def create(
+        cls, strategy: ISerializeStrategy, root: Optional[Path] = None, **options
+    ) -> "IStorage":
+        """Create the storage for the given root. Used by StorageFactory.
+        `options` are storage specific keyword arguments.
+        """
+        return cls(strategy, root, **options)
+
+    @abstractmethod
+    def write(
+        self, data: DbSchema, expected_version: Optional[int] = None
+    ) -> Optional[int]:
+        """Replace the database with `data`.
+
+        Args:
+            data (DbSchema): The new database.
+            expected_version (Optional[int]): Only write if the stored database is
+                still at this version (compare-and-swap). Ignored by storages that
+                do not version the database.
+
+        Returns:
+            Optional[int]: The version of the stored database after the write, None
+                if the storage does not version it.
+
+        Raises:
+            VersionConflictException: If the stored database is at another version
+                than `expected_version`.
+        """
+        pass
+
+    @abstractmethod
+    def read(self) -> DbSchema:
+        pass
+
+    @abstractmethod
+    def delete(self):
+        pass
+
     @abstractmethod
-    def write(self, data):
+    def root_as_str(self) -> str:
         pass
 
     @abstractmethod
-    def read(self):
+    def filepath_as_str(self) -> str:
         pass
+
+    #: The last snapshot taken and its `_snapshot_key`
+    _snapshot: Optional[Tuple[Hashable, DbSchema]] = None
+
+    def snapshot(self) -> DbSchema:
+        """Return a read-only snapshot of the database, see `DbSchema.freeze`.
+        Storages that keep the database in memory return it without copying.
+
+        Otherwise the snapshot is a frozen copy of `read`, which costs O(n) in the
+        size of the database; it is shared by the following calls for as long as
+        `_snapshot_key` does not change.
+        """
+        key = self._snapshot_key()
+        cached = self._snapshot
+        if key is not None and cached is not None and cached[0] == key:
+            return cached[1]
+        snapshot = self.read().freeze()
+        if key is not None:
+            self._snapshot = (key, snapshot)
+        return snapshot
+
+    def _snapshot_key(self) -> Optional[Hashable]:
+        """Return a key that is cheap to get and changes whenever the database
+        does, or None if the storage has none: snapshots are then never shared.
+        It is taken before the database is read, so a snapshot is never older
+        than its key.
+        """
+        return None
+
+    def incarnation(self) -> Optional[Hashable]:
+        """Return what tells apart the successive databases of the storage, whose
+        versions start over when it is deleted, e.g. by another process. None if
+        the versions never start over.
+
+        It is taken before the database is read: while it is unchanged, so are the
+        database and its version.
+        """
+        return None
+
+    def flush(self):
+        """Write buffered changes, if the storage buffers any."""
+        pass
+
+    def close(self):
+        """Release resources held by the storage, writing buffered changes first."""
+        self.flush()
+
+    def set_strategy(self, strategy: ISerializeStrategy):
+        """Change the serialization strategy. Not every storage serializes its data."""
+        get_logger().warning(
+            f"{self.kind()} storage does not use serialization strategies"
+        )
+
+    def update(
+        self,
+        mutation: Callable[[DbSchema], bool],
+        retries: int = DEFAULT_UPDATE_RETRIES,
+    ):
+        """Read the database, change it with `mutation` and write it back, unless
+        another writer changed it in the meantime: then the mutation is applied
+        again to the new data, after a random delay, up to `retries` times.
+
+        Args:
+            mutation (Callable[[DbSchema], bool]): Changes the data it is given in
+                place and returns whether it changed anything; nothing is written
+                otherwise. It may run several times and must not have other side
+                effects. Exceptions it raises are passed on, without writing.
+            retries (int): Maximum number of times the mutation is applied again.
+
+        Raises:
+            VersionConflictException: If the database still changed under the last
+                attempt.
+        """
+        for attempt in range(retries + 1):
+            db_contents = self.read()
+            version = db_contents.version
+            if db_contents.is_frozen:
+                db_contents = DbSchema(
+                    contacts=dict(db_contents.contacts), books=dict(db_contents.books)
+                )
+            if not mutation(db_contents):
+                return
+            try:
+                self.write(db_contents, expected_version=version)
+                return
+            except VersionConflictException:
+                if attempt == retries:
+                    raise
+            time.sleep(random.uniform(0, min(_MAX_RETRY_DELAY, 0.001 * 2**attempt)))
+
+    def read_books(self) -> DbBooksTypeAlias:
+        """Return all books as a mapping of book name to contact ids."""
+        return self.read().books
+
+    def read_book(self, name: str) -> Optional[BookContactIdsTypeAlias]:
+        """Return the contact ids of a book, or None if there is no such book."""
+        return self.read().books.get(name)
+
+    def read_book_contacts(self, name: str) -> Optional[List[ContactDictTypeAlias]]:
+        """Return the contacts of a book in order, or None if there is no such book."""
+        db_contents = self.read()
+        contact_ids = db_contents.books.get(name)
+        if contact_ids is None:
+            return None
+        return [db_contents.contacts[contact_id] for contact_id in contact_ids]
+
+    def find_contacts(
+        self, book_name: str, criteria: Dict[str, str]
+    ) -> Optional[List[ContactDictTypeAlias]]:
+        """Return the contacts of a book whose fields match all the glob patterns
+        in `criteria`, or None if there is no such book.
+        """
+        contacts = self.read_book_contacts(book_name)
+        if contacts is None:
+            return None
+        return [
+            info
+            for info in contacts
+            if all(
+                fnmatch.fnmatch(str(info.get(key)), value)
+                for key, value in criteria.items()
+            )
+        ]
+
+    def add_book(self, name: str, contact_ids: BookContactIdsTypeAlias):
+        """Add a book.
+
+        Raises:
+            AddressBookExistsException: If a book with this name already exists.
+        """
+
+        def add(db_contents: DbSchema) -> bool:
+            if name in db_contents.books:
+                raise AddressBookExistsException(name)
+            db_contents.books[name] = list(contact_ids)
+            return True
+
+        self.update(add)
+
+    def add_contact(self, book_name: str, contact_id: int, info: ContactDictTypeAlias):
+        """Add a contact to a book. An already stored contact with the same id is kept.
+
+        Raises:
+            AddressBookNotFoundException: If there is no such book.
+            ContactExistsException: If the contact is already in the book.
+        """
+
+        def add(db_contents: DbSchema) -> bool:
+            contact_ids = db_contents.books.get(book_name)
+            if contact_ids is None:
+                raise AddressBookNotFoundException(book_name)
+            if contact_id in contact_ids:
+                raise ContactExistsException(info.get("name"), book_name)
+            if contact_id not in db_contents.contacts:
+                db_contents.contacts[contact_id] = info
+            db_contents.books[book_name] = list(contact_ids) + [contact_id]
+            return True
+
+        self.update(add)
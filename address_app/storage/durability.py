@@ -0,0 +1,168 @@
+import os
+from pathlib import Path
+from shutil import rmtree
+from threading import Condition
+from typing import Callable, List, Optional, Tuple
+
+from ..base.consts import DURABILITY_NONE, DURABILITY_FULL
+from ..database.db_schema import DbSchema
+from ..serialize.base_serialization import ISerializeStrategy
+
+
+def stat_key(path: Path) -> Tuple[int, int, int]:
+    """Identifies the current version of a file or directory: it changes when the
+    path is written or replaced, e.g. by another process.
+    """
+    stat = path.stat()
+    return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+
+def _fsync_path(path: Path):
+    """Flush a file, or every file of a directory, to the disk."""
+    paths = path.iterdir() if path.is_dir() else [path]
+    for file_path in paths:
+        fd = os.open(str(file_path), os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+
+def _fsync_directory(path: Path):
+    """Flush a directory entry change (e.g. a rename) to the disk. POSIX only."""
+    if not hasattr(os, "O_DIRECTORY"):
+        return
+    fd = os.open(str(path), os.O_RDONLY | os.O_DIRECTORY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _replace(tmp_path: Path, path: Path):
+    if not tmp_path.is_dir() or not path.exists():
+        os.replace(tmp_path, path)
+        return
+    # A directory cannot replace a non-empty one in a single rename: move the old one
+    # aside first. A crash in between leaves the new data in `tmp_path`.
+    old_path = path.with_name(path.name + ".old")
+    if old_path.exists():
+        rmtree(old_path)
+    os.replace(path, old_path)
+    os.replace(tmp_path, path)
+    rmtree(old_path)
+
+
+def atomic_write(
+    strategy: ISerializeStrategy, data: DbSchema, path: Path, durability: str
+):
+    """Write `data` next to `path` and atomically swap it in.
+
+    Args:
+        strategy (ISerializeStrategy): The strategy used to write the file.
+        data (DbSchema): The data to write.
+        path (Path): The storage path to replace.
+        durability (str): One of `DURABILITY_LEVELS`.
+    """
+    atomic_replace(
+        lambda tmp_path: strategy.write_file(data, tmp_path), path, durability
+    )
+
+
+def atomic_replace(write: Callable[[Path], None], path: Path, durability: str):
+    """Create the new content of `path` with `write(tmp_path)`, next to `path`, and
+    atomically swap it in. Nothing is replaced if `write` raises.
+
+    Args:
+        write (Callable[[Path], None]): Writes the new file or directory.
+        path (Path): The storage path to replace.
+        durability (str): One of `DURABILITY_LEVELS`.
+    """
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    try:
+        write(tmp_path)
+        if durability != DURABILITY_NONE:
+            _fsync_path(tmp_path)
+        _replace(tmp_path, path)
+    except BaseException:
+        remove_path(tmp_path)
+        raise
+    if durability == DURABILITY_FULL:
+        _fsync_directory(path.parent)
+
+
+def remove_path(path: Path):
+    """Remove a storage file or directory, if it exists."""
+    if path.is_dir():
+        rmtree(path, ignore_errors=True)
+    elif path.exists():
+        path.unlink()
+
+
+#: Changes the data it is given in place and returns whether it changed anything,
+#: see `IStorage.update`
+MutationTypeAlias = Callable[[DbSchema], bool]
+
+
+class _PendingUpdate:
+    __slots__ = ("mutation", "done", "error")
+
+    def __init__(self, mutation: MutationTypeAlias):
+        self.mutation = mutation
+        self.done = False
+        self.error: Optional[BaseException] = None
+
+
+class GroupCommit:
+    """Coalesces concurrent updates into a single commit.
+
+    Updates are mutations of the database (see `IStorage.update`) rather than whole
+    schemas, so none of them is lost. The first updater commits its mutation right
+    away. Mutations submitted while a commit is in progress are queued, then the
+    next commit applies all of them in order to the stored data, which is written
+    once for all of them. Every `update` returns after the commit that applied its
+    mutation, or raises the error of its mutation or of that commit.
+
+    Args:
+        commit (Callable[[List[MutationTypeAlias]], List[Optional[BaseException]]]):
+            Applies the mutations to the stored data and writes it durably, returning
+            the exception raised by each mutation, None for those that succeeded.
+    """
+
+    def __init__(
+        self,
+        commit: Callable[[List[MutationTypeAlias]], List[Optional[BaseException]]],
+    ):
+        self._commit = commit
+        self._condition = Condition()
+        self._pending: List[_PendingUpdate] = []
+        self._committing = False
+        #: Number of commits and of coalesced updates, for monitoring
+        self.commits = 0
+        self.writes = 0
+
+    def update(self, mutation: MutationTypeAlias):
+        pending = _PendingUpdate(mutation)
+        with self._condition:
+            self.writes += 1
+            self._pending.append(pending)
+            while not pending.done and self._committing:
+                self._condition.wait()
+            if not pending.done:
+                self._committing = True
+                batch, self._pending = self._pending, []
+
+        if not pending.done:
+            try:
+                errors = self._commit([update.mutation for update in batch])
+            except BaseException as e:
+                errors = [e] * len(batch)
+            with self._condition:
+                for update, error in zip(batch, errors):
+                    update.done, update.error = True, error
+                self._committing = False
+                self.commits += 1
+                self._condition.notify_all()
+
+        if pending.error is not None:
+            raise pending.error
@@ -1,60 +1,279 @@
-from typing import Optional
+from typing import Callable, List, Optional, Tuple
 from pathlib import Path
-from threading import Lock
 from shutil import rmtree
 
-from .base_storage import IStorage
+from .base_storage import DEFAULT_UPDATE_RETRIES, IStorage
+from .locks import StorageLock
+from .durability import (
+    atomic_replace,
+    atomic_write,
+    remove_path,
+    stat_key,
+    GroupCommit,
+)
+from .migration import migrate_file, MigrationReport
+from .backup import BackupInfo, create_backup, list_backups, load_backup
 from ..base import get_logger
-from ..base.consts import DEFAULT_ROOT_PATH, RELATIVE_STORAGE_PATH
+from ..base.consts import (
+    DEFAULT_ROOT_PATH,
+    RELATIVE_STORAGE_PATH,
+    DURABILITY_FSYNC,
+    DURABILITY_LEVELS,
+)
+from ..base.exceptions import VersionConflictException
 from ..database.db_schema import DbSchema
 from ..serialize.base_serialization import ISerializeStrategy
 
 
 class DbFileSystemStorage(IStorage):
-    """File system storage implementation for the database."""
+    """File system storage implementation for the database.
 
-    def __init__(self, strategy: ISerializeStrategy, root: Optional[Path]):
+    Reads and writes are guarded by a readers-writer lock on `<root>/adb/adb.lock`,
+    shared between threads and processes: readers run in parallel, a writer runs
+    alone.
+
+    Writes go to a temporary file which then atomically replaces the storage file,
+    so a crash never leaves a half-written database. A write of the same data as the
+    last one is skipped, as long as the file was not changed since (see
+    `DbSchema.fingerprint`).
+
+    The database is versioned by a counter in `<root>/adb/adb.version`, incremented
+    by every write before the storage file is replaced, so a crash in between can
+    only cause a spurious version conflict. `read` sets `DbSchema.version`, and a
+    write with an `expected_version` checks it with the write lock held (see
+    `IStorage.update`).
+
+    With group commit, `update` queues its mutation and concurrent updates are
+    applied together to the stored data under a single write lock, with one version
+    increment and one write (and fsync) for all of them, see `GroupCommit`. Writes
+    without an expected version are coalesced the same way and return None.
+
+    Args:
+        strategy (ISerializeStrategy): The serialization strategy of the storage file.
+        root (Optional[Path]): The root directory. Default is the temporary folder.
+        durability (str): One of `DURABILITY_LEVELS`, see `base.consts`.
+        group_commit (bool): Coalesce concurrent updates into a single write and fsync.
+    """
+
+    file_based = True
+
+    def __init__(
+        self,
+        strategy: ISerializeStrategy,
+        root: Optional[Path],
+        durability: str = DURABILITY_FSYNC,
+        group_commit: bool = False,
+    ):
         if root is None:
             root = DEFAULT_ROOT_PATH
+        if durability not in DURABILITY_LEVELS:
+            raise ValueError(
+                f"Unknown durability {durability}, expected one of {DURABILITY_LEVELS}"
+            )
         self._root = Path(root)
         self._storage_filepath = None
-        self._lock = Lock()
+        self._durability = durability
+        self._lock = StorageLock(self._root / f"{RELATIVE_STORAGE_PATH}.lock")
+        self._version_path = self._root / f"{RELATIVE_STORAGE_PATH}.version"
+        self._group_commit = (
+            GroupCommit(self._commit_mutations) if group_commit else None
+        )
+        #: Version of the storage file and fingerprint of the data last written to it
+        self._written: Optional[Tuple[Tuple[int, int, int], str]] = None
+        #: Number of writes skipped because the data was unchanged, for monitoring
+        self.skipped_writes = 0
         self.set_strategy(strategy)
 
+    @classmethod
+    def kind(cls) -> str:
+        return "filesystem"
+
     def set_strategy(self, strategy: ISerializeStrategy):
-        db_schema = self.read()
+        """Switch to another format, migrating the data of the current storage file
+        (see `storage.migration`). The new file replaces any existing file of that
+        format, and the old file is removed once the new one is in place.
+        """
+        old_strategy = getattr(self, "_strategy", None)
+        old_filepath = self._storage_filepath
+        self._written = None
         self._strategy = strategy
-        self._storage_filepath = (
-            self._root / f"{RELATIVE_STORAGE_PATH}.{self._strategy.format()}"
+        self._storage_filepath = self._make_storage_filepath()
+        self._storage_filepath.parent.mkdir(parents=True, exist_ok=True)
+
+        if (
+            old_filepath is None
+            or old_filepath == self._storage_filepath
+            or not old_filepath.exists()
+        ):
+            if not self._storage_filepath.exists():
+                self.write(DbSchema())
+            return
+
+        try:
+            with self._lock.writing():
+                report = self._migrate(old_strategy, old_filepath)
+        except BaseException:
+            self._strategy, self._storage_filepath = old_strategy, old_filepath
+            raise
+        get_logger().info(
+            f"Migrated {report.contacts} contacts and {report.books} books "
+            f"from {old_strategy.format()} to {strategy.format()}"
         )
-        self._create_storage_file(db_schema)
 
-    def _create_storage_file(self, db_schema: DbSchema):
-        self._storage_filepath.parent.mkdir(parents=True, exist_ok=True)
-        if not self._storage_filepath.exists():
-            self.write(db_schema)
+    def _migrate(
+        self, old_strategy: ISerializeStrategy, old_filepath: Path
+    ) -> MigrationReport:
+        """Convert the storage at `old_filepath` to the current strategy and path,
+        then remove it. Called with the write lock held.
+        """
+        report = migrate_file(
+            old_strategy,
+            old_filepath,
+            self._strategy,
+            self._storage_filepath,
+            self._durability,
+        )
+        remove_path(old_filepath)
+        return report
+
+    def _make_storage_filepath(self) -> Path:
+        return self._root / f"{RELATIVE_STORAGE_PATH}.{self._strategy.format()}"
 
     def is_initialized(self) -> bool:
         return self._storage_filepath.exists()
 
-    def write(self, data: DbSchema):
-        with self._lock:
-            data_serialized = self._strategy.serialize(data=data)
-            with open(self._storage_filepath, "w") as file:
-                file.write(data_serialized)
+    def write(
+        self, data: DbSchema, expected_version: Optional[int] = None
+    ) -> Optional[int]:
+        if self._group_commit is not None and expected_version is None:
+
+            def replace(db_contents: DbSchema) -> bool:
+                # Copied, as the mutations coalesced after this one change it
+                db_contents.contacts = dict(data.contacts)
+                db_contents.books = {
+                    name: list(ids) for name, ids in data.books.items()
+                }
+                return True
+
+            self._group_commit.update(replace)
+            return None
+        return self._commit(data, expected_version)
+
+    def update(
+        self,
+        mutation: Callable[[DbSchema], bool],
+        retries: int = DEFAULT_UPDATE_RETRIES,
+    ):
+        if self._group_commit is None:
+            return super().update(mutation, retries)
+        # Applied under the write lock: there are no conflicts to retry
+        self._group_commit.update(mutation)
+
+    def _commit(self, data: DbSchema, expected_version: Optional[int] = None) -> int:
+        with self._lock.writing():
+            version = self._read_version()
+            if expected_version is not None and expected_version != version:
+                raise VersionConflictException(expected_version, version)
+            return self._replace(data, version)
+
+    def _commit_mutations(
+        self, mutations: List[Callable[[DbSchema], bool]]
+    ) -> List[Optional[BaseException]]:
+        """Apply the mutations of a group commit in order to the stored data and
+        write it once. A failing mutation may have changed the data partly, so the
+        others are then applied again, from the stored data.
+        """
+        errors: List[Optional[BaseException]] = [None] * len(mutations)
+        with self._lock.writing():
+            while True:
+                data = self._read_file()
+                changed = False
+                for i, mutation in enumerate(mutations):
+                    if errors[i] is not None:
+                        continue
+                    try:
+                        changed = mutation(data) or changed
+                    except Exception as e:
+                        errors[i] = e
+                        break
+                else:
+                    break
+            if changed:
+                self._replace(data, self._read_version())
+        return errors
+
+    def _replace(self, data: DbSchema, version: int) -> int:
+        """Write the data as the version after `version`, unless it is the data
+        last written. Called with the write lock held.
+        """
+        fingerprint = data.fingerprint()
+        if self._written is not None and self._written == (
+            self._stat_key(),
+            fingerprint,
+        ):
+            self.skipped_writes += 1
+            return version
+        self._write_version(version + 1)
+        self._write(data)
+        self._written = (self._stat_key(), fingerprint)
+        return version + 1
+
+    def _read_version(self) -> int:
+        """Return the version of the database, 0 if it was never written."""
+        try:
+            return int(self._version_path.read_text())
+        except (FileNotFoundError, ValueError):
+            return 0
+
+    def incarnation(self) -> Optional[Tuple[int, int, int]]:
+        """The version file is replaced on every write, see `_write_version`."""
+        if not self._version_path.exists():
+            return None
+        return stat_key(self._version_path)
+
+    def _write_version(self, version: int):
+        """Called with the write lock held."""
+        atomic_replace(
+            lambda tmp_path: tmp_path.write_text(str(version)),
+            self._version_path,
+            self._durability,
+        )
+
+    def _write(self, data: DbSchema):
+        """Write the data to the storage path. Called with the write lock held."""
+        atomic_write(self._strategy, data, self._storage_filepath, self._durability)
+
+    def _stat_key(self) -> Optional[Tuple[int, int, int]]:
+        if not self._storage_filepath.exists():
+            return None
+        return stat_key(self._storage_filepath)
+
+    def _snapshot_key(self) -> Tuple[int, Optional[Tuple[int, int, int]]]:
+        return self._read_version(), self._stat_key()
 
     def read(self) -> DbSchema:
         if not self._storage_filepath or not self._storage_filepath.exists():
             # get_logger().error(f"File {self._storage_filepath} not found for reading")
-            return DbSchema()
+            return DbSchema(version=self._read_version())
+
+        with self._lock.reading():
+            data = self._strategy.read_file(self._storage_filepath)
+            data.version = self._read_version()
+        return data
 
-        with open(self._storage_filepath, "r") as file:
-            return self._strategy.deserialize(data=file.read())
+    def _read_file(self) -> DbSchema:
+        """Read the storage file. Called with a lock held."""
+        if not self._storage_filepath.exists():
+            return DbSchema()
+        return self._strategy.read_file(self._storage_filepath)
 
     def delete(self):
         """Delete the storage file and its parent directory if it is empty"""
         try:
-            self._storage_filepath.unlink()
+            if self._storage_filepath.is_dir():
+                rmtree(self._storage_filepath)
+            else:
+                self._storage_filepath.unlink()
 
             rmtree(self._storage_filepath.parent)
             # self._storage_filepath.parent.rmdir()
@@ -62,6 +281,29 @@ class DbFileSystemStorage(IStorage):
         except FileNotFoundError:
             get_logger().error(f"File {self._storage_filepath} not found for deletion")
 
+    def backup(self, backup_dir: Path, full: bool = False) -> BackupInfo:
+        """Back up the database into `backup_dir`: a full snapshot the first time
+        (or if `full` is set), and then deltas of the previous backup that only
+        write the books and contacts that changed, see `backup.create_backup`.
+        """
+        return create_backup(
+            self.read(), self._strategy, backup_dir, full, self._durability
+        )
+
+    def list_backups(self, backup_dir: Path) -> List[BackupInfo]:
+        """Return the backups in `backup_dir`, oldest first."""
+        return list_backups(backup_dir)
+
+    def restore(self, backup_dir: Path, backup_id: Optional[str] = None):
+        """Replace the database with its state as of a backup, the latest one by
+        default, see `backup.load_backup`. The backup must have been made in the
+        current format.
+
+        Raises:
+            BackupNotFoundException: If there is no such backup.
+        """
+        self.write(load_backup(self._strategy, backup_dir, backup_id))
+
     def root_as_str(self) -> str:
         return str(self._root.resolve())
 
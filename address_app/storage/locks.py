@@ -0,0 +1,133 @@
+from contextlib import contextmanager
+from pathlib import Path
+from threading import Condition, Lock
+from typing import Iterator
+
+from ..base.aux_utils import try_import
+
+#: `fcntl` is POSIX only. Without it locking is limited to the current process.
+fcntl = try_import("fcntl")
+
+
+class RWLock:
+    """In-process readers-writer lock.
+
+    Any number of threads may hold the lock for reading at the same time, while a
+    writer holds it alone. Waiting writers take precedence over new readers, so a
+    steady stream of readers cannot starve writers.
+
+    Example:
+        >>> lock = RWLock()
+        >>> with lock.reading():
+        ...     pass  # other readers may run here too
+        >>> with lock.writing():
+        ...     pass  # exclusive
+    """
+
+    def __init__(self):
+        self._condition = Condition(Lock())
+        self._readers = 0
+        self._writer = False
+        self._waiting_writers = 0
+
+    def acquire_read(self):
+        with self._condition:
+            while self._writer or self._waiting_writers:
+                self._condition.wait()
+            self._readers += 1
+
+    def release_read(self):
+        with self._condition:
+            self._readers -= 1
+            if not self._readers:
+                self._condition.notify_all()
+
+    def acquire_write(self):
+        with self._condition:
+            self._waiting_writers += 1
+            while self._writer or self._readers:
+                self._condition.wait()
+            self._waiting_writers -= 1
+            self._writer = True
+
+    def release_write(self):
+        with self._condition:
+            self._writer = False
+            self._condition.notify_all()
+
+    @contextmanager
+    def reading(self) -> Iterator[None]:
+        self.acquire_read()
+        try:
+            yield
+        finally:
+            self.release_read()
+
+    @contextmanager
+    def writing(self) -> Iterator[None]:
+        self.acquire_write()
+        try:
+            yield
+        finally:
+            self.release_write()
+
+
+class FileLock:
+    """Cross-process shared/exclusive lock on a lock file, based on `fcntl.flock`.
+
+    Every acquisition opens its own file descriptor: `flock` locks belong to the
+    open file, so readers in different threads or processes share the lock while a
+    writer waits for all of them. On platforms without `fcntl` this is a no-op.
+    """
+
+    def __init__(self, path: Path):
+        self._path = Path(path)
+
+    @property
+    def path(self) -> Path:
+        return self._path
+
+    @contextmanager
+    def _locked(self, operation: int) -> Iterator[None]:
+        if fcntl is None:
+            yield
+            return
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self._path, "a") as file:
+            fcntl.flock(file.fileno(), operation)
+            try:
+                yield
+            finally:
+                fcntl.flock(file.fileno(), fcntl.LOCK_UN)
+
+    def shared(self):
+        return self._locked(fcntl.LOCK_SH if fcntl else 0)
+
+    def exclusive(self):
+        return self._locked(fcntl.LOCK_EX if fcntl else 0)
+
+
+class StorageLock:
+    """Readers-writer lock of a storage, held across threads and processes.
+
+    Reading takes the in-process lock for reading and the lock file shared;
+    writing takes both exclusively.
+    """
+
+    def __init__(self, path: Path):
+        self._rw_lock = RWLock()
+        self._file_lock = FileLock(path)
+
+    @property
+    def path(self) -> Path:
+        return self._file_lock.path
+
+    @contextmanager
+    def reading(self) -> Iterator[None]:
+        with self._rw_lock.reading(), self._file_lock.shared():
+            yield
+
+    @contextmanager
+    def writing(self) -> Iterator[None]:
+        with self._rw_lock.writing(), self._file_lock.exclusive():
+            yield
@@ -0,0 +1,129 @@
+import hashlib
+import json
+from dataclasses import dataclass
+from itertools import chain
+from pathlib import Path
+from typing import Iterable, Iterator, Tuple
+
+from .durability import atomic_replace
+from ..base.exceptions import MigrationException
+from ..serialize.base_serialization import (
+    ISerializeStrategy,
+    ContactItemTypeAlias,
+    BookItemTypeAlias,
+)
+
+#: Checksums add up item digests modulo this value, so they do not depend on order
+_CHECKSUM_MODULUS = 1 << 256
+
+
+@dataclass
+class MigrationReport:
+    """Number of contacts and books migrated, and a checksum of their content."""
+
+    contacts: int = 0
+    books: int = 0
+    checksum: int = 0
+
+    def merge(self, other: "MigrationReport"):
+        self.contacts += other.contacts
+        self.books += other.books
+        self.checksum = (self.checksum + other.checksum) % _CHECKSUM_MODULUS
+
+
+def _digest(item: list) -> int:
+    encoded = json.dumps(item, sort_keys=True).encode("utf-8")
+    return int.from_bytes(hashlib.sha256(encoded).digest(), "big")
+
+
+def _tally_contacts(
+    report: MigrationReport, contacts: Iterable[ContactItemTypeAlias]
+) -> Iterator[ContactItemTypeAlias]:
+    for cid, info in contacts:
+        report.contacts += 1
+        # Formats read empty values back as None (e.g. CSV)
+        normalized = {key: value or None for key, value in info.items()}
+        digest = _digest(["contact", cid, normalized])
+        report.checksum = (report.checksum + digest) % _CHECKSUM_MODULUS
+        yield cid, info
+
+
+def _tally_books(
+    report: MigrationReport, books: Iterable[BookItemTypeAlias]
+) -> Iterator[BookItemTypeAlias]:
+    for book_name, ids in books:
+        report.books += 1
+        digest = _digest(["book", book_name, list(ids)])
+        report.checksum = (report.checksum + digest) % _CHECKSUM_MODULUS
+        yield book_name, ids
+
+
+def read_items(
+    strategy: ISerializeStrategy, path: Path
+) -> Tuple[Iterable[ContactItemTypeAlias], Iterable[BookItemTypeAlias]]:
+    """Return the contacts and books stored in `path`, read one at a time if the
+    format supports it, or else from the whole database loaded at once.
+    """
+    if strategy.incremental:
+        return strategy.iter_contacts(path), strategy.iter_books(path)
+    data = strategy.read_file(path)
+    return data.contacts.items(), data.books.items()
+
+
+def migrate_file(
+    source: ISerializeStrategy,
+    source_path: Path,
+    target: ISerializeStrategy,
+    target_path: Path,
+    durability: str,
+) -> MigrationReport:
+    """Convert the database in `source_path` to the `target` format in `target_path`.
+
+    Contacts and books are streamed from the source file into a temporary file, so
+    when both formats support it (see `ISerializeStrategy.incremental` and
+    `dump_items`) memory use does not depend on the size of the database. The new
+    file is then read back and its counts and checksum compared with those of the
+    source before it atomically replaces `target_path`. The source file is left in
+    place.
+
+    Args:
+        source (ISerializeStrategy): The format of the source file.
+        source_path (Path): The source file (or directory).
+        target (ISerializeStrategy): The format to convert to.
+        target_path (Path): The file (or directory) to create or replace.
+        durability (str): One of `DURABILITY_LEVELS`.
+
+    Returns:
+        MigrationReport: The counts and checksum of the migrated data.
+
+    Raises:
+        MigrationException: If the new file does not hold the source data.
+    """
+    migrated = MigrationReport()
+
+    def write(tmp_path: Path):
+        contacts, books = read_items(source, source_path)
+        contacts = _tally_contacts(migrated, contacts)
+        books = _tally_books(migrated, books)
+        target.write_items(contacts, books, tmp_path)
+        # Items a writer did not consume are counted, then missed on read back
+        for _ in chain(contacts, books):
+            pass
+
+        verified = MigrationReport()
+        contacts, books = read_items(target, tmp_path)
+        for _ in chain(
+            _tally_contacts(verified, contacts), _tally_books(verified, books)
+        ):
+            pass
+        if verified != migrated:
+            raise MigrationException(
+                source.format(),
+                target.format(),
+                f"read back {verified.contacts} contacts and {verified.books} books "
+                f"of {migrated.contacts} and {migrated.books}, "
+                "or their content differs",
+            )
+
+    atomic_replace(write, target_path, durability)
+    return migrated
@@ -0,0 +1,268 @@
+import json
+import os
+import time
+from pathlib import Path
+from threading import RLock
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from .base_storage import IStorage
+from ..base.consts import RELATIVE_STORAGE_PATH
+from ..database.db_schema import (
+    DbSchema,
+    BookContactIdsTypeAlias,
+    ContactDictTypeAlias,
+)
+from ..serialize.base_serialization import ISerializeStrategy
+
+#: Replication log of a primary, relative to its root
+RELATIVE_REPLICATION_LOG_PATH = f"{RELATIVE_STORAGE_PATH}.replog"
+
+#: A replication log entry, see `ReplicationLog`
+LogEntryTypeAlias = Dict
+
+
+class ReplicationLog:
+    """Append-only log of the changes of a database, one JSON object per line.
+
+    Every entry has a sequence number `seq`, the time it was written `ts`, and the
+    new state of what changed: `contacts` maps contact ids to their details (null
+    once removed), `books` maps book names to their contact ids (null once removed)
+    and `append` maps book names to contact ids added at the end of the book.
+    Applying an entry is idempotent, so a follower can safely apply it again after a
+    crash.
+
+    Args:
+        path (Path): The log file.
+        fsync (bool): Flush every entry to the disk before returning.
+    """
+
+    def __init__(self, path: Path, fsync: bool = True):
+        self._path = Path(path)
+        self._fsync = fsync
+        self._lock = RLock()
+        self._last_seq = self._read_last_seq()
+
+    @property
+    def path(self) -> Path:
+        return self._path
+
+    @property
+    def last_seq(self) -> int:
+        """The sequence number of the last entry, 0 if the log is empty."""
+        return self._last_seq
+
+    def _read_last_seq(self) -> int:
+        last = read_last_entry(self._path)
+        return last["seq"] if last else 0
+
+    def append(
+        self,
+        contacts: Optional[Dict[int, Optional[ContactDictTypeAlias]]] = None,
+        books: Optional[Dict[str, Optional[BookContactIdsTypeAlias]]] = None,
+        append: Optional[Dict[str, BookContactIdsTypeAlias]] = None,
+    ) -> int:
+        """Write an entry and return its sequence number."""
+        with self._lock:
+            entry = {"seq": self._last_seq + 1, "ts": time.time()}
+            if contacts:
+                entry["contacts"] = contacts
+            if books:
+                entry["books"] = {name: _ids(ids) for name, ids in books.items()}
+            if append:
+                entry["append"] = {name: list(ids) for name, ids in append.items()}
+            line = json.dumps(entry, separators=(",", ":")) + "\n"
+            self._path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self._path, "a", encoding="utf-8") as file:
+                file.write(line)
+                file.flush()
+                if self._fsync:
+                    os.fsync(file.fileno())
+            self._last_seq += 1
+            return self._last_seq
+
+    def reset(self):
+        """Delete the log. The next entry starts a new log at sequence number 1."""
+        with self._lock:
+            if self._path.exists():
+                self._path.unlink()
+            self._last_seq = 0
+
+
+def _ids(ids: Optional[BookContactIdsTypeAlias]) -> Optional[list]:
+    return None if ids is None else list(ids)
+
+
+def read_entries(
+    path: Path, offset: int = 0
+) -> Iterator[Tuple[LogEntryTypeAlias, int]]:
+    """Yield the complete entries of a log from byte `offset` on, each with the
+    offset of the next entry. A line still being written is left for a later read.
+    """
+    try:
+        file = open(path, "rb")
+    except FileNotFoundError:
+        return
+    with file:
+        file.seek(offset)
+        for line in file:
+            if not line.endswith(b"\n"):
+                break
+            offset += len(line)
+            yield json.loads(line), offset
+
+
+def read_last_entry(path: Path) -> Optional[LogEntryTypeAlias]:
+    """Return the last complete entry of a log without reading all of it."""
+    try:
+        file = open(path, "rb")
+    except FileNotFoundError:
+        return None
+    with file:
+        size = file.seek(0, os.SEEK_END)
+        block = 4096
+        while True:
+            start = max(0, size - block)
+            file.seek(start)
+            lines = file.read(size - start).split(b"\n")
+            # The last element follows the last newline: empty or incomplete
+            complete = lines[:-1] if start == 0 else lines[1:-1]
+            if complete or start == 0:
+                return json.loads(complete[-1]) if complete else None
+            block *= 2
+
+
+def apply_entries(data: DbSchema, entries: List[LogEntryTypeAlias]) -> DbSchema:
+    """Return a copy of a schema with log entries applied. Only the containers are
+    copied, contacts and books are shared.
+    """
+    data = DbSchema(contacts=dict(data.contacts), books=dict(data.books))
+    for entry in entries:
+        for cid, info in entry.get("contacts", {}).items():
+            if info is None:
+                data.contacts.pop(int(cid), None)
+            else:
+                data.contacts[int(cid)] = info
+        for name, ids in entry.get("books", {}).items():
+            if ids is None:
+                data.books.pop(name, None)
+            else:
+                data.books[name] = ids
+        for name, ids in entry.get("append", {}).items():
+            book = list(data.books.get(name, ()))
+            book.extend(cid for cid in ids if cid not in book)
+            data.books[name] = book
+    return data
+
+
+class ReplicatedStorage(IStorage):
+    """Records every change of a storage in a replication log for followers (see
+    `address_app.replication.Follower`), instead of having them copy the storage
+    file.
+
+    Writes of the whole schema are diffed against the stored one (see
+    `DbSchema.diff`) and only the changed contacts and books are logged. The first
+    entry of a new log holds the whole database, so followers start from the log
+    alone. A change is logged once the underlying storage wrote it.
+
+    Only one process may write to a primary, and every process writing to it must
+    log its changes: changes made without replication never reach the followers.
+
+    Args:
+        storage (IStorage): The storage of the primary.
+        fsync (bool): Flush log entries to the disk, see `ReplicationLog`.
+    """
+
+    def __init__(self, storage: IStorage, fsync: bool = True):
+        self._storage = storage
+        self.file_based = storage.file_based
+        self._lock = RLock()
+        root = Path(storage.root_as_str())
+        self._log = ReplicationLog(root / RELATIVE_REPLICATION_LOG_PATH, fsync)
+        if not self._log.last_seq:
+            data = storage.read()
+            self._log.append(dict(data.contacts), dict(data.books))
+
+    @classmethod
+    def kind(cls) -> str:
+        return "replicated"
+
+    @property
+    def storage(self) -> IStorage:
+        """The underlying storage."""
+        return self._storage
+
+    @property
+    def log(self) -> ReplicationLog:
+        return self._log
+
+    def read(self) -> DbSchema:
+        return self._storage.read()
+
+    def snapshot(self) -> DbSchema:
+        return self._storage.snapshot()
+
+    def incarnation(self):
+        return self._storage.incarnation()
+
+    def write(
+        self, data: DbSchema, expected_version: Optional[int] = None
+    ) -> Optional[int]:
+        with self._lock:
+            old = self._storage.read()
+            diff = old.diff(data)
+            version = self._storage.write(data, expected_version)
+            if not diff:
+                return version
+            contacts = {cid: data.contacts[cid] for cid in diff.added_contacts}
+            contacts.update((cid, data.contacts[cid]) for cid in diff.changed_contacts)
+            contacts.update((cid, None) for cid in diff.removed_contacts)
+            books = {name: data.books[name] for name in diff.added_books}
+            books.update((name, data.books[name]) for name in diff.changed_books)
+            books.update((name, None) for name in diff.removed_books)
+            self._log.append(contacts, books)
+            return version
+
+    def add_book(self, name, contact_ids):
+        with self._lock:
+            self._storage.add_book(name, contact_ids)
+            self._log.append(books={name: contact_ids})
+
+    def add_contact(self, book_name, contact_id, info):
+        with self._lock:
+            self._storage.add_contact(book_name, contact_id, info)
+            self._log.append(
+                contacts={contact_id: info}, append={book_name: [contact_id]}
+            )
+
+    def read_books(self):
+        return self._storage.read_books()
+
+    def read_book(self, name):
+        return self._storage.read_book(name)
+
+    def read_book_contacts(self, name):
+        return self._storage.read_book_contacts(name)
+
+    def find_contacts(self, book_name, criteria):
+        return self._storage.find_contacts(book_name, criteria)
+
+    def set_strategy(self, strategy: ISerializeStrategy):
+        self._storage.set_strategy(strategy)
+
+    def flush(self):
+        self._storage.flush()
+
+    def close(self):
+        self._storage.close()
+
+    def delete(self):
+        # Followers start over from the first entry of the new log
+        with self._lock:
+            self._storage.delete()
+            self._log.reset()
+
+    def root_as_str(self) -> str:
+        return self._storage.root_as_str()
+
+    def filepath_as_str(self) -> str:
+        return self._storage.filepath_as_str()
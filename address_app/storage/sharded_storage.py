@@ -0,0 +1,307 @@
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from .filesystem_storage import DbFileSystemStorage
+from .durability import atomic_write, atomic_replace, remove_path, stat_key
+from .migration import migrate_file, MigrationReport
+from ..base.consts import RELATIVE_STORAGE_PATH, DURABILITY_NONE
+from ..base.exceptions import (
+    AddressBookExistsException,
+    AddressBookNotFoundException,
+    ContactExistsException,
+)
+from ..database.db_schema import (
+    DbSchema,
+    DbBooksTypeAlias,
+    DbContactsTypeAlias,
+    BookContactIdsTypeAlias,
+    ContactDictTypeAlias,
+)
+from ..serialize.base_serialization import ISerializeStrategy
+
+#: Version of the manifest layout
+MANIFEST_VERSION = 1
+
+#: Name of the manifest file inside the shards directory
+MANIFEST_FILENAME = "manifest.json"
+
+#: Default number of contact shards. Contact ids are split into equal id ranges.
+DEFAULT_CONTACT_SHARDS = 64
+
+#: Contact ids are 32-bit hashes, see `Contact.id`
+_CONTACT_ID_BITS = 32
+
+
+class ShardedFileSystemStorage(DbFileSystemStorage):
+    """File system storage split into shards: `<root>/adb/adb.<format>.shards/`.
+
+    The directory holds a manifest (`manifest.json`) mapping book names to their
+    files, one file per book with its contact ids, and contact files each holding an
+    id range of contacts. Every shard is a DbSchema object serialized with the
+    storage strategy.
+
+    A write fingerprints every shard but only writes those whose data changed (see
+    `DbSchema.fingerprint`), and the manifest is only rewritten when books are added
+    or removed, so processes editing different books do not rewrite each other's
+    files. Single-book operations only read the files of that book and of its
+    contacts.
+    """
+
+    def __init__(
+        self,
+        strategy: ISerializeStrategy,
+        root: Optional[Path],
+        contact_shards: int = DEFAULT_CONTACT_SHARDS,
+        **options,
+    ):
+        self._contact_shards = contact_shards
+        self._fingerprints: Dict[str, Tuple[Tuple[int, int, int], str]] = {}
+        super().__init__(strategy, root, **options)
+
+    @classmethod
+    def kind(cls) -> str:
+        return "sharded"
+
+    def _make_storage_filepath(self) -> Path:
+        return self._root / f"{RELATIVE_STORAGE_PATH}.{self._strategy.format()}.shards"
+
+    # Layout
+
+    def _manifest_path(self) -> Path:
+        return self._storage_filepath / MANIFEST_FILENAME
+
+    def _read_manifest(self) -> Optional[dict]:
+        if not self._storage_filepath or not self._manifest_path().exists():
+            return None
+        with open(self._manifest_path(), "r") as file:
+            manifest = json.load(file)
+        self._contact_shards = manifest["contact_shards"]
+        return manifest
+
+    def _write_manifest(self, books: Dict[str, str], directory: Optional[Path] = None):
+        manifest = {
+            "version": MANIFEST_VERSION,
+            "format": self._strategy.format(),
+            "contact_shards": self._contact_shards,
+            "books": books,
+        }
+        path = (directory or self._storage_filepath) / MANIFEST_FILENAME
+        tmp_path = path.with_suffix(".tmp")
+        with open(tmp_path, "w") as file:
+            json.dump(manifest, file)
+            if self._durability != DURABILITY_NONE:
+                file.flush()
+                os.fsync(file.fileno())
+        os.replace(tmp_path, path)
+
+    def _book_filename(self, name: str) -> str:
+        digest = hashlib.sha256(name.encode("utf-8")).hexdigest()[:16]
+        return f"book-{digest}.{self._strategy.format()}"
+
+    def _contact_shard(self, contact_id: int) -> int:
+        id_range = contact_id & ((1 << _CONTACT_ID_BITS) - 1)
+        return (id_range * self._contact_shards) >> _CONTACT_ID_BITS
+
+    def _contacts_filename(self, shard: int) -> str:
+        return f"contacts-{shard:04d}.{self._strategy.format()}"
+
+    # Shard I/O
+
+    def _read_shard(self, filename: str) -> DbSchema:
+        path = self._storage_filepath / filename
+        if not path.exists():
+            return DbSchema()
+        return self._strategy.read_file(path)
+
+    def _write_shard(self, filename: str, shard: DbSchema) -> bool:
+        """Write the shard unless the file already holds the same data.
+
+        Returns:
+            bool: True if the file was written.
+        """
+        fingerprint = shard.fingerprint()
+        path = self._storage_filepath / filename
+        if self._file_fingerprint(path) == fingerprint:
+            return False
+
+        atomic_write(self._strategy, shard, path, self._durability)
+        self._fingerprints[filename] = (stat_key(path), fingerprint)
+        return True
+
+    def _file_fingerprint(self, path: Path) -> Optional[str]:
+        """Fingerprint of the data in the file, cached while the file is unchanged on
+        disk (another process may have rewritten it).
+        """
+        if not path.exists():
+            return None
+        path_stat_key = stat_key(path)
+        cached = self._fingerprints.get(path.name)
+        if cached and cached[0] == path_stat_key:
+            return cached[1]
+        fingerprint = self._strategy.read_file(path).fingerprint()
+        self._fingerprints[path.name] = (path_stat_key, fingerprint)
+        return fingerprint
+
+    def _remove_shard(self, filename: str):
+        path = self._storage_filepath / filename
+        self._fingerprints.pop(filename, None)
+        if path.is_dir():
+            for child in path.iterdir():
+                child.unlink()
+            path.rmdir()
+        elif path.exists():
+            path.unlink()
+
+    def _read_book_ids(self, manifest: dict, name: str) -> BookContactIdsTypeAlias:
+        return list(self._read_shard(manifest["books"][name]).books.get(name, []))
+
+    def _read_contacts(self, contact_ids) -> DbContactsTypeAlias:
+        contacts = {}
+        for shard in sorted({self._contact_shard(cid) for cid in contact_ids}):
+            contacts.update(self._read_shard(self._contacts_filename(shard)).contacts)
+        return contacts
+
+    def _migrate(
+        self, old_strategy: ISerializeStrategy, old_filepath: Path
+    ) -> MigrationReport:
+        """Convert every shard to the current strategy, one file at a time, into a new
+        shards directory that then replaces the current one.
+        """
+        with open(old_filepath / MANIFEST_FILENAME, "r") as file:
+            manifest = json.load(file)
+        self._contact_shards = manifest["contact_shards"]
+        report = MigrationReport()
+
+        def migrate_shard(old_filename: str, path: Path):
+            report.merge(
+                migrate_file(
+                    old_strategy,
+                    old_filepath / old_filename,
+                    self._strategy,
+                    path,
+                    self._durability,
+                )
+            )
+
+        def write(tmp_path: Path):
+            tmp_path.mkdir()
+            books = {}
+            for name, old_filename in manifest["books"].items():
+                books[name] = self._book_filename(name)
+                migrate_shard(old_filename, tmp_path / books[name])
+            for shard in range(self._contact_shards):
+                old_filename = f"contacts-{shard:04d}.{old_strategy.format()}"
+                if (old_filepath / old_filename).exists():
+                    new_filename = self._contacts_filename(shard)
+                    migrate_shard(old_filename, tmp_path / new_filename)
+            self._write_manifest(books, tmp_path)
+
+        atomic_replace(write, self._storage_filepath, self._durability)
+        self._fingerprints.clear()
+        remove_path(old_filepath)
+        return report
+
+    # IStorage
+
+    def _write(self, data: DbSchema):
+        self._storage_filepath.mkdir(parents=True, exist_ok=True)
+        manifest = self._read_manifest()
+        old_books = manifest["books"] if manifest else {}
+
+        books = {}
+        for name, contact_ids in data.books.items():
+            books[name] = old_books.get(name) or self._book_filename(name)
+            self._write_shard(books[name], DbSchema(books={name: contact_ids}))
+
+        shards: List[DbContactsTypeAlias] = [{} for _ in range(self._contact_shards)]
+        for cid, info in data.contacts.items():
+            shards[self._contact_shard(cid)][cid] = info
+        for shard, contacts in enumerate(shards):
+            filename = self._contacts_filename(shard)
+            if contacts or (self._storage_filepath / filename).exists():
+                self._write_shard(filename, DbSchema(contacts=contacts))
+
+        for name, filename in old_books.items():
+            if name not in books:
+                self._remove_shard(filename)
+        if manifest is None or books != old_books:
+            self._write_manifest(books)
+
+    def read(self) -> DbSchema:
+        with self._lock.reading():
+            version = self._read_version()
+            manifest = self._read_manifest()
+            if manifest is None:
+                return DbSchema(version=version)
+            contacts = {}
+            for shard in range(self._contact_shards):
+                filename = self._contacts_filename(shard)
+                contacts.update(self._read_shard(filename).contacts)
+            books = {
+                name: self._read_book_ids(manifest, name) for name in manifest["books"]
+            }
+        return DbSchema(contacts=contacts, books=books, version=version)
+
+    def read_books(self) -> DbBooksTypeAlias:
+        with self._lock.reading():
+            manifest = self._read_manifest()
+            if manifest is None:
+                return {}
+            return {
+                name: self._read_book_ids(manifest, name) for name in manifest["books"]
+            }
+
+    def read_book(self, name: str) -> Optional[BookContactIdsTypeAlias]:
+        with self._lock.reading():
+            return self._read_book(name)
+
+    def _read_book(self, name: str) -> Optional[BookContactIdsTypeAlias]:
+        manifest = self._read_manifest()
+        if manifest is None or name not in manifest["books"]:
+            return None
+        return self._read_book_ids(manifest, name)
+
+    def read_book_contacts(self, name: str) -> Optional[List[ContactDictTypeAlias]]:
+        with self._lock.reading():
+            contact_ids = self._read_book(name)
+            if contact_ids is None:
+                return None
+            contacts = self._read_contacts(contact_ids)
+        return [contacts[cid] for cid in contact_ids]
+
+    def add_book(self, name: str, contact_ids: BookContactIdsTypeAlias):
+        with self._lock.writing():
+            manifest = self._read_manifest()
+            books = dict(manifest["books"]) if manifest else {}
+            if name in books:
+                raise AddressBookExistsException(name)
+            books[name] = self._book_filename(name)
+            self._write_version(self._read_version() + 1)
+            self._write_shard(books[name], DbSchema(books={name: list(contact_ids)}))
+            self._write_manifest(books)
+
+    def add_contact(self, book_name: str, contact_id: int, info: ContactDictTypeAlias):
+        with self._lock.writing():
+            manifest = self._read_manifest()
+            if manifest is None or book_name not in manifest["books"]:
+                raise AddressBookNotFoundException(book_name)
+            contact_ids = self._read_book_ids(manifest, book_name)
+            if contact_id in contact_ids:
+                raise ContactExistsException(info.get("name"), book_name)
+
+            self._write_version(self._read_version() + 1)
+            filename = self._contacts_filename(self._contact_shard(contact_id))
+            shard = self._read_shard(filename)
+            if contact_id not in shard.contacts:
+                contacts = dict(shard.contacts)
+                contacts[contact_id] = info
+                self._write_shard(filename, DbSchema(contacts=contacts))
+
+            contact_ids.append(contact_id)
+            self._write_shard(
+                manifest["books"][book_name],
+                DbSchema(books={book_name: contact_ids}),
+            )
@@ -0,0 +1,279 @@
+import hashlib
+import mmap
+import os
+import struct
+from pathlib import Path
+from typing import Optional, Tuple
+
+from .base_storage import IStorage
+from .durability import stat_key
+from .locks import FileLock
+from ..base.aux_utils import try_import
+from ..base.consts import RELATIVE_STORAGE_PATH
+from ..database.db_schema import DbSchema
+from ..serialize.base_serialization import ISerializeStrategy
+from ..serialize.indexed_serialization import IndexedStrategy
+
+#: `multiprocessing.shared_memory` is new in Python 3.8. Without it the cache is off.
+shared_memory = try_import("multiprocessing.shared_memory")
+resource_tracker = try_import("multiprocessing.resource_tracker")
+
+#: Control segment: magic, generation, size of the data segment, version of the
+#: storage file the data was read from (see `durability.stat_key`, -1 if none)
+#: and version of the database (see `DbSchema.version`, -1 if unknown)
+_CONTROL = struct.Struct("<4sQQqqqq")
+
+#: Signature of the control segment
+_MAGIC = b"ADB2"
+
+#: Storage file version recorded when there is no storage file
+_NO_FILE = (-1, -1, -1)
+
+
+def is_shared_cache_supported() -> bool:
+    """Return whether this Python has `multiprocessing.shared_memory`."""
+    return shared_memory is not None
+
+
+def _untrack(segment: "shared_memory.SharedMemory"):
+    # The resource tracker unlinks the segments a process created or attached to
+    # when it exits (Python < 3.13), which would pull them away from other workers.
+    # Segments are unlinked explicitly instead, when replaced or deleted.
+    if os.name == "posix" and resource_tracker is not None:
+        resource_tracker.unregister(segment._name, "shared_memory")
+
+
+def _attach(name: str) -> Optional["shared_memory.SharedMemory"]:
+    try:
+        segment = shared_memory.SharedMemory(name=name)
+    except FileNotFoundError:
+        return None
+    _untrack(segment)
+    return segment
+
+
+def _create(name: str, size: int) -> "shared_memory.SharedMemory":
+    try:
+        segment = shared_memory.SharedMemory(name=name, create=True, size=size)
+    except FileExistsError:
+        # Left over by a process that died while publishing
+        _unlink(name)
+        segment = shared_memory.SharedMemory(name=name, create=True, size=size)
+    _untrack(segment)
+    return segment
+
+
+def _map_readonly(name: str, size: int) -> Optional[mmap.mmap]:
+    """Map the first `size` bytes of a segment read-only. The mapping stays valid as
+    long as it is referenced, even once the segment is unlinked.
+    """
+    segment = _attach(name)
+    if segment is None:
+        return None
+    try:
+        if os.name == "posix":
+            return mmap.mmap(segment._fd, size, access=mmap.ACCESS_READ)
+        return mmap.mmap(-1, size, tagname=name, access=mmap.ACCESS_READ)
+    finally:
+        segment.close()
+
+
+def _unlink(name: str):
+    try:
+        segment = shared_memory.SharedMemory(name=name)
+    except FileNotFoundError:
+        return
+    # Attaching registered the segment with the resource tracker, unlink() unregisters it
+    segment.unlink()
+    segment.close()
+
+
+class SharedCacheStorage(IStorage):
+    """Shares the decoded database between the processes using the same storage file.
+
+    The first process to read the database publishes it in the indexed binary
+    encoding (see `IndexedStrategy`) to a shared memory segment, under a generation
+    number kept in a small control segment. Other processes, and the other
+    connectors of the same process, map that segment read-only and decode contacts
+    and books lazily from it instead of parsing the storage file, so the workers of
+    a host share a single copy of the database and start without loading it.
+
+    Every write through this storage publishes a new generation; the write and the
+    publication happen under the same lock, so writers through the cache publish in
+    the order they wrote. The control segment
+    also records the version of the storage file the data comes from, so a storage
+    file changed by any other means (e.g. a process without the cache) is read and
+    published again on the next read. Replaced segments are unlinked; processes
+    still reading them keep their mapping until they move to the new generation.
+
+    Requires `multiprocessing.shared_memory` (Python 3.8+) and a file based storage,
+    see `StorageFactory.create_storage`.
+
+    Args:
+        storage (IStorage): The storage to cache, with `file_based` set.
+    """
+
+    def __init__(self, storage: IStorage):
+        self._storage = storage
+        self._generation = 0
+        self._buffer: Optional[memoryview] = None
+        self._control: Optional["shared_memory.SharedMemory"] = None
+        self._bind()
+
+    @classmethod
+    def kind(cls) -> str:
+        return "shared_cache"
+
+    @property
+    def storage(self) -> IStorage:
+        """The underlying storage."""
+        return self._storage
+
+    @property
+    def generation(self) -> int:
+        """The generation of the shared data this process maps, 0 if none."""
+        return self._generation
+
+    def _bind(self):
+        """Name the segments and the lock after the current storage file."""
+        path = self._storage.filepath_as_str()
+        digest = hashlib.blake2b(path.encode("utf-8"), digest_size=6).hexdigest()
+        # Short names: macOS limits them to 31 characters
+        self._name = f"adb_{digest}"
+        root = Path(self._storage.root_as_str())
+        self._lock = FileLock(root / f"{RELATIVE_STORAGE_PATH}.shm.lock")
+        if self._control is not None:
+            self._control.close()
+        self._control = None
+        self._generation, self._buffer = 0, None
+
+    def _source_version(self) -> Tuple[int, int, int]:
+        path = Path(self._storage.filepath_as_str())
+        return stat_key(path) if path.exists() else _NO_FILE
+
+    def _read_control(
+        self,
+    ) -> Optional[Tuple[int, int, Tuple[int, int, int], Optional[int]]]:
+        """Return the generation, data size, source version and database version of
+        the shared data, or None if nothing was published. Called with the lock held.
+        """
+        if self._control is None:
+            self._control = _attach(self._name)
+            if self._control is None:
+                return None
+        magic, generation, size, *source, version = _CONTROL.unpack_from(
+            self._control.buf, 0
+        )
+        if magic != _MAGIC:
+            return None
+        return generation, size, tuple(source), None if version < 0 else version
+
+    def read(self) -> DbSchema:
+        source = self._source_version()
+        with self._lock.shared():
+            control = self._read_control()
+            # Without a version, writes of the data could not be compared and swapped
+            if control is not None and control[2] == source and control[3] is not None:
+                generation, size, _, version = control
+                if generation != self._generation:
+                    self._map(generation, size)
+                if self._buffer is not None:
+                    # Decodes only the book index; changes to the result stay local
+                    data = IndexedStrategy.deserialize(self._buffer)
+                    data.version = version
+                    return data
+
+        data = self._storage.read()
+        self._publish(data, source)
+        return data
+
+    def write(
+        self, data: DbSchema, expected_version: Optional[int] = None
+    ) -> Optional[int]:
+        encoded = IndexedStrategy.serialize(data)
+        # Another writer through the cache could otherwise replace the file between
+        # the write and its stat, and this data would be published as theirs
+        with self._lock.exclusive():
+            version = self._storage.write(data, expected_version)
+            self._store(encoded, self._source_version(), version)
+        return version
+
+    def _map(self, generation: int, size: int):
+        """Switch to the data segment of `generation`. Called with the lock held.
+        Data read from the previous one keeps its mapping alive until released.
+        """
+        mapped = _map_readonly(f"{self._name}_{generation}", size)
+        if mapped is not None:
+            self._generation, self._buffer = generation, memoryview(mapped)
+
+    def _publish(self, data: DbSchema, source: Tuple[int, int, int]):
+        """Publish `data`, read from the storage file at version `source`."""
+        encoded = IndexedStrategy.serialize(data)
+        with self._lock.exclusive():
+            self._store(encoded, source, data.version)
+
+    def _store(
+        self, encoded: bytes, source: Tuple[int, int, int], version: Optional[int]
+    ):
+        """Publish encoded data as a new generation. Called with the lock held."""
+        # Attach again: the control segment may have been replaced meanwhile
+        if self._control is not None:
+            self._control.close()
+            self._control = None
+        control = self._read_control()
+        if control is None:
+            if self._control is None:
+                self._control = _create(self._name, _CONTROL.size)
+            previous = 0
+        else:
+            previous = control[0]
+        generation = previous + 1
+
+        name = f"{self._name}_{generation}"
+        segment = _create(name, len(encoded))
+        segment.buf[: len(encoded)] = encoded
+        _CONTROL.pack_into(
+            self._control.buf,
+            0,
+            _MAGIC,
+            generation,
+            len(encoded),
+            *source,
+            -1 if version is None else version,
+        )
+        if previous:
+            _unlink(f"{self._name}_{previous}")
+        self._map(generation, len(encoded))
+        segment.close()
+
+    def _unlink(self):
+        """Remove the shared segments of the current storage file."""
+        with self._lock.exclusive():
+            control = self._read_control()
+            if control is not None:
+                _unlink(f"{self._name}_{control[0]}")
+            _unlink(self._name)
+
+    def set_strategy(self, strategy: ISerializeStrategy):
+        self._storage.set_strategy(strategy)
+        self._unlink()
+        self._bind()
+
+    def delete(self):
+        self._unlink()
+        self._storage.delete()
+
+    def incarnation(self):
+        return self._storage.incarnation()
+
+    def flush(self):
+        self._storage.flush()
+
+    def close(self):
+        self._storage.close()
+
+    def root_as_str(self) -> str:
+        return self._storage.root_as_str()
+
+    def filepath_as_str(self) -> str:
+        return self._storage.filepath_as_str()
@@ -0,0 +1,310 @@
+import fnmatch
+import sqlite3
+from pathlib import Path
+from threading import Lock
+from typing import Dict, List, Optional
+
+from .base_storage import IStorage
+from ..base import get_logger
+from ..base.consts import DEFAULT_ROOT_PATH, RELATIVE_STORAGE_PATH
+from ..base.exceptions import (
+    AddressBookExistsException,
+    AddressBookNotFoundException,
+    ContactExistsException,
+    VersionConflictException,
+)
+from ..database.db_schema import (
+    DbSchema,
+    SchemaDiff,
+    DbBooksTypeAlias,
+    BookContactIdsTypeAlias,
+    ContactDictTypeAlias,
+)
+from ..serialize.base_serialization import ISerializeStrategy
+
+#: Contact fields stored as columns of the contacts table
+CONTACT_FIELDS = ("name", "address", "phone_no")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS contacts (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    address TEXT NOT NULL,
+    phone_no TEXT
+);
+CREATE INDEX IF NOT EXISTS contacts_name ON contacts (name);
+CREATE INDEX IF NOT EXISTS contacts_address ON contacts (address);
+CREATE INDEX IF NOT EXISTS contacts_phone_no ON contacts (phone_no);
+CREATE TABLE IF NOT EXISTS books (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS book_members (
+    book_id INTEGER NOT NULL REFERENCES books (id) ON DELETE CASCADE,
+    contact_id INTEGER NOT NULL REFERENCES contacts (id),
+    position INTEGER NOT NULL,
+    PRIMARY KEY (book_id, contact_id)
+);
+CREATE INDEX IF NOT EXISTS book_members_position ON book_members (book_id, position);
+"""
+
+_CONTACT_COLUMNS = ", ".join(f"c.{f}" for f in CONTACT_FIELDS)
+
+
+class DbSqliteStorage(IStorage):
+    """SQLite storage for the database: `<root>/adb/adb.sqlite`.
+
+    Contacts, books and book membership are kept in tables, so DatabaseManager
+    operations run as single indexed statements in a transaction instead of
+    reading and writing the whole database.
+
+    The database is versioned by its `user_version` pragma, incremented in the
+    transaction of every change (see `IStorage.update`).
+    """
+
+    def __init__(self, root: Optional[Path] = None):
+        if root is None:
+            root = DEFAULT_ROOT_PATH
+        self._root = Path(root)
+        self._storage_filepath = self._root / f"{RELATIVE_STORAGE_PATH}.sqlite"
+        self._storage_filepath.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = Lock()
+        self._connection = sqlite3.connect(
+            str(self._storage_filepath), check_same_thread=False
+        )
+        self._connection.execute("PRAGMA foreign_keys = ON")
+        self._connection.execute("PRAGMA journal_mode = WAL")
+        self._connection.executescript(_SCHEMA)
+
+    @classmethod
+    def kind(cls) -> str:
+        return "sqlite"
+
+    @classmethod
+    def create(
+        cls, strategy: ISerializeStrategy, root: Optional[Path] = None, **options
+    ) -> "DbSqliteStorage":
+        return cls(root, **options)
+
+    def is_initialized(self) -> bool:
+        return self._storage_filepath.exists()
+
+    def write(
+        self, data: DbSchema, expected_version: Optional[int] = None
+    ) -> Optional[int]:
+        """Apply the differences between the stored data and `data` (see
+        `DbSchema.diff`); nothing is written if there is none.
+        """
+        with self._lock, self._connection:
+            # Takes the write lock now, so the version cannot change until commit
+            self._connection.execute("BEGIN IMMEDIATE")
+            version = self._version()
+            if expected_version is not None and expected_version != version:
+                raise VersionConflictException(expected_version, version)
+            diff = self._read().diff(data)
+            if not diff:
+                return version
+            self._apply(data, diff)
+            return self._bump_version()
+
+    def _version(self) -> int:
+        return self._connection.execute("PRAGMA user_version").fetchone()[0]
+
+    def _bump_version(self) -> int:
+        """Increment the version, in the current transaction, and return it."""
+        version = self._version() + 1
+        self._connection.execute(f"PRAGMA user_version = {version}")
+        return version
+
+    def _apply(self, data: DbSchema, diff: SchemaDiff):
+        self._connection.executemany(
+            "DELETE FROM books WHERE name = ?",
+            ((name,) for name in diff.removed_books),
+        )
+        # Changed books keep their row, so they keep their place in the book list
+        changed_books = {name: self._book_id(name) for name in diff.changed_books}
+        self._connection.executemany(
+            "DELETE FROM book_members WHERE book_id = ?",
+            ((book_id,) for book_id in changed_books.values()),
+        )
+        self._connection.executemany(
+            "DELETE FROM contacts WHERE id = ?",
+            ((cid,) for cid in diff.removed_contacts),
+        )
+        assignments = ", ".join(f"{f} = ?" for f in CONTACT_FIELDS)
+        self._connection.executemany(
+            f"UPDATE contacts SET {assignments} WHERE id = ?",
+            (
+                tuple(data.contacts[cid].get(f) for f in CONTACT_FIELDS) + (cid,)
+                for cid in diff.changed_contacts
+            ),
+        )
+        self._connection.executemany(
+            "INSERT INTO contacts (id, name, address, phone_no) VALUES (?, ?, ?, ?)",
+            (
+                (cid,) + tuple(data.contacts[cid].get(f) for f in CONTACT_FIELDS)
+                for cid in diff.added_contacts
+            ),
+        )
+        for name, book_id in changed_books.items():
+            self._insert_members(book_id, data.books[name])
+        for name in diff.added_books:
+            self._insert_book(name, data.books[name])
+
+    def _insert_book(self, name: str, contact_ids: BookContactIdsTypeAlias):
+        book_id = self._connection.execute(
+            "INSERT INTO books (name) VALUES (?)", (name,)
+        ).lastrowid
+        self._insert_members(book_id, contact_ids)
+
+    def _insert_members(self, book_id: int, contact_ids: BookContactIdsTypeAlias):
+        self._connection.executemany(
+            "INSERT OR IGNORE INTO book_members (book_id, contact_id, position) "
+            "VALUES (?, ?, ?)",
+            ((book_id, cid, i) for i, cid in enumerate(contact_ids)),
+        )
+
+    def read(self) -> DbSchema:
+        with self._lock, self._connection:
+            # One read transaction, so that the version matches the data
+            self._connection.execute("BEGIN")
+            data = self._read()
+            data.version = self._version()
+        return data
+
+    def _read(self) -> DbSchema:
+        contacts = {
+            row[0]: dict(zip(CONTACT_FIELDS, row[1:]))
+            for row in self._connection.execute(
+                "SELECT id, name, address, phone_no FROM contacts"
+            )
+        }
+        return DbSchema(contacts=contacts, books=self._read_books())
+
+    def read_books(self) -> DbBooksTypeAlias:
+        with self._lock:
+            return self._read_books()
+
+    def _read_books(self) -> DbBooksTypeAlias:
+        books = {
+            name: [] for (name,) in self._connection.execute("SELECT name FROM books")
+        }
+        for name, cid in self._connection.execute(
+            "SELECT b.name, m.contact_id FROM book_members m "
+            "JOIN books b ON b.id = m.book_id ORDER BY m.book_id, m.position"
+        ):
+            books[name].append(cid)
+        return books
+
+    def _book_id(self, name: str) -> Optional[int]:
+        row = self._connection.execute(
+            "SELECT id FROM books WHERE name = ?", (name,)
+        ).fetchone()
+        return row[0] if row else None
+
+    def read_book(self, name: str) -> Optional[BookContactIdsTypeAlias]:
+        with self._lock:
+            book_id = self._book_id(name)
+            if book_id is None:
+                return None
+            return [
+                cid
+                for (cid,) in self._connection.execute(
+                    "SELECT contact_id FROM book_members WHERE book_id = ? "
+                    "ORDER BY position",
+                    (book_id,),
+                )
+            ]
+
+    def read_book_contacts(self, name: str) -> Optional[List[ContactDictTypeAlias]]:
+        return self.find_contacts(name, {})
+
+    def find_contacts(
+        self, book_name: str, criteria: Dict[str, str]
+    ) -> Optional[List[ContactDictTypeAlias]]:
+        if any(key not in CONTACT_FIELDS for key in criteria):
+            return super().find_contacts(book_name, criteria)
+
+        # GLOB follows fnmatch on POSIX (case-sensitive `*`, `?`, `[...]`) and, unlike
+        # LIKE, uses the column indexes for prefix patterns.
+        clauses = []
+        params = []
+        for key, value in criteria.items():
+            if fnmatch.fnmatch("None", value):
+                # fnmatch compares a missing value as the string "None"
+                clauses.append(f"(c.{key} GLOB ? OR c.{key} IS NULL)")
+            else:
+                clauses.append(f"c.{key} GLOB ?")
+            params.append(value)
+
+        with self._lock:
+            book_id = self._book_id(book_name)
+            if book_id is None:
+                return None
+            where = "".join(f" AND {clause}" for clause in clauses)
+            rows = self._connection.execute(
+                f"SELECT {_CONTACT_COLUMNS} FROM book_members m "
+                "JOIN contacts c ON c.id = m.contact_id "
+                f"WHERE m.book_id = ?{where} ORDER BY m.position",
+                [book_id] + params,
+            )
+            return [dict(zip(CONTACT_FIELDS, row)) for row in rows]
+
+    def add_book(self, name: str, contact_ids: BookContactIdsTypeAlias):
+        with self._lock, self._connection:
+            try:
+                self._insert_book(name, contact_ids)
+            except sqlite3.IntegrityError:
+                raise AddressBookExistsException(name)
+            self._bump_version()
+
+    def add_contact(self, book_name: str, contact_id: int, info: ContactDictTypeAlias):
+        with self._lock:
+            book_id = self._book_id(book_name)
+            if book_id is None:
+                raise AddressBookNotFoundException(book_name)
+            # Checked before writing, so that adding a duplicate does not start a
+            # write transaction
+            if self._connection.execute(
+                "SELECT 1 FROM book_members WHERE book_id = ? AND contact_id = ?",
+                (book_id, contact_id),
+            ).fetchone():
+                raise ContactExistsException(info.get("name"), book_name)
+            with self._connection:
+                self._connection.execute(
+                    "INSERT OR IGNORE INTO contacts (id, name, address, phone_no) "
+                    "VALUES (?, ?, ?, ?)",
+                    (contact_id,) + tuple(info.get(f) for f in CONTACT_FIELDS),
+                )
+                try:
+                    self._connection.execute(
+                        "INSERT INTO book_members (book_id, contact_id, position) "
+                        "SELECT ?, ?, COALESCE(MAX(position) + 1, 0) "
+                        "FROM book_members WHERE book_id = ?",
+                        (book_id, contact_id, book_id),
+                    )
+                except sqlite3.IntegrityError:
+                    raise ContactExistsException(info.get("name"), book_name)
+                self._bump_version()
+
+    def delete(self):
+        """Delete the database file and its parent directory"""
+        with self._lock:
+            self._connection.close()
+            for suffix in ("", "-wal", "-shm"):
+                try:
+                    Path(f"{self._storage_filepath}{suffix}").unlink()
+                except FileNotFoundError:
+                    pass
+            try:
+                self._storage_filepath.parent.rmdir()
+            except OSError:
+                get_logger().warning(
+                    f"Directory {self._storage_filepath.parent} is not empty"
+                )
+
+    def root_as_str(self) -> str:
+        return str(self._root.resolve())
+
+    def filepath_as_str(self) -> str:
+        return str(self._storage_filepath.resolve())
@@ -0,0 +1,88 @@
+from pathlib import Path
+from typing import List, Optional, Union
+
+from .base_storage import IStorage
+from .filesystem_storage import DbFileSystemStorage
+from .sqlite_storage import DbSqliteStorage
+from .sharded_storage import ShardedFileSystemStorage
+from .write_behind import WriteBehindStorage
+from .shared_cache import SharedCacheStorage, is_shared_cache_supported
+from .replication import ReplicatedStorage
+from ..base import get_logger
+from ..base.exceptions import UnknownStorageException
+from ..serialize.base_serialization import ISerializeStrategy
+
+
+class StorageFactory:
+
+    _storages = {}
+
+    @classmethod
+    def register_storage(cls, storage):
+        cls._storages[storage.kind()] = storage
+
+    @classmethod
+    def get_supported_storages(cls) -> List[str]:
+        return list(cls._storages.keys())
+
+    @classmethod
+    def create_storage(
+        cls,
+        kind: str = "filesystem",
+        strategy: Optional[ISerializeStrategy] = None,
+        root: Optional[Path] = None,
+        write_behind: Union[bool, dict] = False,
+        shared_cache: bool = False,
+        replicate: Union[bool, dict] = False,
+        **options,
+    ) -> IStorage:
+        """Create a storage of the given kind.
+
+        Args:
+            kind (str): The registered storage kind.
+            strategy (Optional[ISerializeStrategy]): The serialization strategy, if the
+                storage uses one.
+            root (Optional[Path]): The root directory.
+            write_behind (Union[bool, dict]): Wrap the storage in a WriteBehindStorage;
+                a dict is passed as its keyword arguments.
+            shared_cache (bool): Share the loaded database with the other processes
+                using the same storage file, see SharedCacheStorage. Ignored, with a
+                warning, for storages that are not file based or if
+                `multiprocessing.shared_memory` is not available.
+            replicate (Union[bool, dict]): Log every change for followers, see
+                ReplicatedStorage; a dict is passed as its keyword arguments.
+            **options: Storage specific keyword arguments.
+        """
+        storage = cls._storages.get(kind)
+        if not storage:
+            raise UnknownStorageException(kind)
+        instance = storage.create(strategy, root, **options)
+        if replicate:
+            replicate_options = replicate if isinstance(replicate, dict) else {}
+            instance = ReplicatedStorage(instance, **replicate_options)
+        if shared_cache:
+            if not instance.file_based:
+                get_logger().warning(f"{kind} storage does not support shared_cache")
+            elif not is_shared_cache_supported():
+                get_logger().warning("shared_cache requires Python 3.8 or later")
+            else:
+                instance = SharedCacheStorage(instance)
+        if write_behind:
+            write_behind_options = write_behind if isinstance(write_behind, dict) else {}
+            instance = WriteBehindStorage(instance, **write_behind_options)
+        return instance
+
+
+def get_supported_storages() -> List[str]:
+    """Return a list of supported storage kinds.
+
+    Example:
+    >>> get_supported_storages()
+    ['filesystem', 'sqlite', 'sharded']
+    """
+    return StorageFactory.get_supported_storages()
+
+
+StorageFactory.register_storage(DbFileSystemStorage)
+StorageFactory.register_storage(DbSqliteStorage)
+StorageFactory.register_storage(ShardedFileSystemStorage)
@@ -0,0 +1,233 @@
+import atexit
+import time
+from dataclasses import dataclass
+from threading import Condition, RLock, Thread
+from typing import Optional
+
+from .base_storage import IStorage
+from ..base import get_logger
+from ..base.exceptions import (
+    AddressBookExistsException,
+    AddressBookNotFoundException,
+    ContactExistsException,
+    StorageClosedException,
+    VersionConflictException,
+)
+from ..database.db_schema import DbSchema
+from ..serialize.base_serialization import ISerializeStrategy
+
+logger = get_logger()
+
+#: Default time between background flushes, in milliseconds
+DEFAULT_FLUSH_INTERVAL_MS = 1000
+
+#: Default number of mutations that triggers a flush before the interval is over
+DEFAULT_FLUSH_EVERY = 1000
+
+
+@dataclass
+class WriteBehindMetrics:
+    """Counters of a write-behind storage. Latencies are in seconds."""
+
+    flushes: int = 0
+    failed_flushes: int = 0
+    total_flush_latency: float = 0.0
+    last_flush_latency: float = 0.0
+    max_flush_latency: float = 0.0
+    #: Mutations not yet flushed to the underlying storage
+    queue_depth: int = 0
+    max_queue_depth: int = 0
+
+    @property
+    def avg_flush_latency(self) -> float:
+        return self.total_flush_latency / self.flushes if self.flushes else 0.0
+
+
+class WriteBehindStorage(IStorage):
+    """Keeps the database in memory and writes it to another storage in the background.
+
+    `write` only replaces the in-memory schema; a background thread flushes the
+    latest state every `flush_interval_ms` milliseconds, or as soon as `flush_every`
+    mutations are pending. Mutations made since the last flush are lost if the
+    process dies, so this trades a bounded window of data loss for throughput.
+    Pending mutations are flushed by `flush()`, `close()` and at interpreter exit;
+    once closed, the storage refuses mutations. A failed flush is retried after
+    `flush_interval_ms`.
+
+    The in-memory schema is a read-only snapshot (see `DbSchema.freeze`). Every
+    mutation publishes a new version that shares the untouched contacts and books
+    with the previous one, so `read` and `snapshot` return the current version
+    without copying and readers never see a version change under them. Versions are
+    numbered (see `DbSchema.version`), and writes with an expected version are
+    compared with the in-memory one. The underlying storage is written as is: this
+    storage must be its only writer.
+
+    Args:
+        storage (IStorage): The storage to write to.
+        flush_interval_ms (int): Maximum time between flushes of pending mutations.
+        flush_every (int): Number of pending mutations that triggers a flush.
+    """
+
+    def __init__(
+        self,
+        storage: IStorage,
+        flush_interval_ms: int = DEFAULT_FLUSH_INTERVAL_MS,
+        flush_every: int = DEFAULT_FLUSH_EVERY,
+    ):
+        self._storage = storage
+        self._flush_interval = flush_interval_ms / 1000
+        self._flush_every = flush_every
+        self._lock = RLock()
+        self._flush_lock = RLock()
+        self._wakeup = Condition(self._lock)
+        self._data = storage.read().freeze()
+        self._closed = False
+        self.metrics = WriteBehindMetrics()
+
+        self._thread = Thread(target=self._run, name="adb-write-behind", daemon=True)
+        self._thread.start()
+        # The thread holds the storage until `close`, which unregisters this
+        atexit.register(self.close)
+
+    @classmethod
+    def kind(cls) -> str:
+        return "write_behind"
+
+    @property
+    def storage(self) -> IStorage:
+        """The underlying storage."""
+        return self._storage
+
+    def read(self) -> DbSchema:
+        return self._data
+
+    def snapshot(self) -> DbSchema:
+        return self._data
+
+    def write(
+        self, data: DbSchema, expected_version: Optional[int] = None
+    ) -> Optional[int]:
+        data = data.freeze()
+        with self._lock:
+            self._check_open()
+            version = self._data.version
+            if expected_version is not None and expected_version != version:
+                raise VersionConflictException(expected_version, version)
+            self._publish(data)
+            return self._data.version
+
+    def _check_open(self):
+        """Called with the lock held."""
+        if self._closed:
+            raise StorageClosedException(self.kind())
+
+    def _publish(self, data: DbSchema):
+        """Make `data` the current version. Called with the lock held."""
+        self._data = DbSchema(
+            contacts=data.contacts,
+            books=data.books,
+            version=(self._data.version or 0) + 1,
+        )
+        self.metrics.queue_depth += 1
+        self.metrics.max_queue_depth = max(
+            self.metrics.max_queue_depth, self.metrics.queue_depth
+        )
+        if self.metrics.queue_depth >= self._flush_every:
+            self._wakeup.notify()
+
+    def add_book(self, name, contact_ids):
+        with self._lock:
+            self._check_open()
+            if name in self._data.books:
+                raise AddressBookExistsException(name)
+            self._publish(self._data.evolve(books={name: contact_ids}))
+
+    def add_contact(self, book_name, contact_id, info):
+        with self._lock:
+            self._check_open()
+            contact_ids = self._data.books.get(book_name)
+            if contact_ids is None:
+                raise AddressBookNotFoundException(book_name)
+            if contact_id in contact_ids:
+                raise ContactExistsException(info.get("name"), book_name)
+            contacts = {} if contact_id in self._data.contacts else {contact_id: info}
+            books = {book_name: tuple(contact_ids) + (contact_id,)}
+            self._publish(self._data.evolve(contacts=contacts, books=books))
+
+    def flush(self):
+        """Write pending mutations to the underlying storage now."""
+        with self._flush_lock:
+            with self._lock:
+                pending = self.metrics.queue_depth
+                if not pending:
+                    return
+                # Versions are immutable: new mutations do not affect this one
+                snapshot = self._data
+                self.metrics.queue_depth = 0
+
+            start = time.perf_counter()
+            try:
+                self._storage.write(snapshot)
+            except Exception:
+                with self._lock:
+                    self.metrics.failed_flushes += 1
+                    self.metrics.queue_depth += pending
+                raise
+            latency = time.perf_counter() - start
+
+            with self._lock:
+                self.metrics.flushes += 1
+                self.metrics.last_flush_latency = latency
+                self.metrics.total_flush_latency += latency
+                self.metrics.max_flush_latency = max(
+                    self.metrics.max_flush_latency, latency
+                )
+
+    def close(self):
+        """Stop the background thread and flush pending mutations."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._wakeup.notify()
+        atexit.unregister(self.close)
+        if self._thread.is_alive():
+            self._thread.join()
+        self.flush()
+
+    def _run(self):
+        failed = False
+        while True:
+            with self._lock:
+                deadline = time.monotonic() + self._flush_interval
+                # After a failure, wait out the interval even if mutations piled up
+                while not self._closed and (
+                    failed or self.metrics.queue_depth < self._flush_every
+                ):
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._wakeup.wait(remaining)
+                if self._closed:
+                    return
+            try:
+                self.flush()
+                failed = False
+            except Exception as e:
+                failed = True
+                logger.error(f"Write-behind flush failed: {e}")
+
+    def set_strategy(self, strategy: ISerializeStrategy):
+        self.flush()
+        self._storage.set_strategy(strategy)
+
+    def delete(self):
+        self.close()
+        self._storage.delete()
+
+    def root_as_str(self) -> str:
+        return self._storage.root_as_str()
+
+    def filepath_as_str(self) -> str:
+        return self._storage.filepath_as_str()
+
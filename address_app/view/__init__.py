@@ -1 +1,2 @@
 from .view_registry import ViewerRegistry
+from .base_view import iter_books
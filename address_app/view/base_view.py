@@ -1,14 +1,102 @@
-from ..database.db_schema import DbSchema
+from ..database.db_schema import DbSchema, ContactDictTypeAlias
 from abc import ABC, abstractmethod
+from itertools import islice
+from typing import IO, Iterable, Iterator, Optional, Tuple
+
+#: Size of the writes of `IViewer.write`, in characters
+DEFAULT_WRITE_CHUNK_SIZE = 1 << 16
+
+#: A book to render: its name and its contacts, in order
+BookViewTypeAlias = Tuple[str, Iterable[ContactDictTypeAlias]]
+
+
+def iter_books(
+    db: DbSchema,
+    books: Optional[Iterable[str]] = None,
+    offset: int = 0,
+    limit: Optional[int] = None,
+) -> Iterator[BookViewTypeAlias]:
+    """Yield the books of a database to render, with their contacts looked up
+    lazily.
+
+    Args:
+        db (DbSchema): The database.
+        books (Optional[Iterable[str]]): The names of the books, all the books by
+            default. Books missing from the database are skipped.
+        offset (int): The number of books to skip, for paginated rendering.
+        limit (Optional[int]): The maximum number of books.
+    """
+    names = db.books if books is None else (name for name in books if name in db.books)
+    stop = None if limit is None else offset + limit
+    for name in islice(names, offset, stop):
+        yield name, (db.contacts[contact_id] for contact_id in db.books[name])
 
 
 class IViewer(ABC):
+    """A rendering of the database. Viewers render it one book at a time, as a
+    stream of text chunks, so a rendering never has to be held in memory whole
+    (see `write`).
+    """
+
     @classmethod
     @abstractmethod
     def name(cls) -> str:
         pass
 
+    @classmethod
+    def header(cls) -> str:
+        """The text before the first book."""
+        return ""
+
+    @classmethod
+    def footer(cls) -> str:
+        """The text after the last book."""
+        return ""
+
     @classmethod
     @abstractmethod
-    def render(cls, db: DbSchema):
+    def render_book(
+        cls, name: str, contacts: Iterable[ContactDictTypeAlias]
+    ) -> Iterator[str]:
+        """Yield the rendering of a book in chunks."""
         pass
+
+    @classmethod
+    def stream(cls, books: Iterable[BookViewTypeAlias]) -> Iterator[str]:
+        """Yield the rendering of books in chunks, see `iter_books`."""
+        yield cls.header()
+        for name, contacts in books:
+            yield from cls.render_book(name, contacts)
+        yield cls.footer()
+
+    @classmethod
+    def render(cls, db: DbSchema, books: Optional[Iterable[str]] = None) -> str:
+        """Return the rendering of a database, or of some of its books."""
+        return "".join(cls.stream(iter_books(db, books)))
+
+    @classmethod
+    def write(
+        cls,
+        books: Iterable[BookViewTypeAlias],
+        file: IO[str],
+        chunk_size: int = DEFAULT_WRITE_CHUNK_SIZE,
+    ) -> int:
+        """Write the rendering of books to a text file, `chunk_size` characters at a
+        time, so only about one chunk is held in memory.
+
+        Returns:
+            int: The number of characters written.
+        """
+        written = 0
+        buffer = []
+        size = 0
+        for chunk in cls.stream(books):
+            buffer.append(chunk)
+            size += len(chunk)
+            if size >= chunk_size:
+                file.write("".join(buffer))
+                written += size
+                buffer.clear()
+                size = 0
+        file.write("".join(buffer))
+        return written + size
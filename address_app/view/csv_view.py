@@ -0,0 +1,45 @@
+import csv
+import io
+from itertools import islice
+from typing import Iterable, Iterator
+
+from .base_view import IViewer
+from ..database.db_schema import ContactDictTypeAlias
+
+#: Contact fields exported as columns, after the book
+CONTACT_FIELDS = ("name", "address", "phone_no")
+
+#: Number of rows rendered per chunk
+ROWS_PER_CHUNK = 1024
+
+
+class CsvView(IViewer):
+    """One row per contact of every book, with the name of the book in the first
+    column. Empty books have no rows.
+    """
+
+    @classmethod
+    def format(cls) -> str:
+        return "csv"
+
+    @classmethod
+    def header(cls) -> str:
+        return ",".join(("book",) + CONTACT_FIELDS) + "\n"
+
+    @classmethod
+    def render_book(
+        cls, name: str, contacts: Iterable[ContactDictTypeAlias]
+    ) -> Iterator[str]:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, lineterminator="\n")
+        rows = (
+            [name] + [contact.get(field, "") for field in CONTACT_FIELDS]
+            for contact in contacts
+        )
+        while True:
+            writer.writerows(islice(rows, ROWS_PER_CHUNK))
+            if not buffer.tell():
+                return
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
@@ -1,5 +1,8 @@
+from html import escape
+from typing import Iterable, Iterator
+
 from .base_view import IViewer
-from ..database.db_schema import DbSchema
+from ..database.db_schema import ContactDictTypeAlias
 
 
 class HtmlView(IViewer):
@@ -8,14 +11,22 @@ class HtmlView(IViewer):
         return "html"
 
     @classmethod
-    def render(cls, db: DbSchema) -> str:
-        lines = ["<div>"]
-        for book_name in db.books:
-            lines.append(f"<h1>Address Book: {book_name}</h1><ul>")
-            for contact_id in db.books[book_name]:
-                contact_as_dict = db.contacts[contact_id]
-                for key, value in contact_as_dict.items():
-                    lines.append(f"<li>{key}: {value}</li>")
-            lines.append("</ul>")
-        lines.append("</div>")
-        return "".join(lines)
+    def header(cls) -> str:
+        return "<div>"
+
+    @classmethod
+    def footer(cls) -> str:
+        return "</div>"
+
+    @classmethod
+    def render_book(
+        cls, name: str, contacts: Iterable[ContactDictTypeAlias]
+    ) -> Iterator[str]:
+        # Names and fields are user input
+        yield f"<h1>Address Book: {escape(name)}</h1><ul>"
+        for contact_as_dict in contacts:
+            yield "".join(
+                f"<li>{escape(str(key))}: {escape(str(value))}</li>"
+                for key, value in contact_as_dict.items()
+            )
+        yield "</ul>"
@@ -0,0 +1,34 @@
+import json
+from typing import Iterable, Iterator
+
+from .base_view import IViewer
+from ..database.db_schema import ContactDictTypeAlias
+
+#: Number of lines rendered per chunk
+LINES_PER_CHUNK = 1024
+
+
+class JsonLinesView(IViewer):
+    """One JSON object per contact of every book, with the name of the book under
+    `"book"`. Empty books have no lines.
+    """
+
+    @classmethod
+    def format(cls) -> str:
+        return "jsonl"
+
+    @classmethod
+    def render_book(
+        cls, name: str, contacts: Iterable[ContactDictTypeAlias]
+    ) -> Iterator[str]:
+        encode = json.JSONEncoder(ensure_ascii=False, separators=(",", ":")).encode
+        lines = []
+        for contact in contacts:
+            line = {"book": name}
+            line.update(contact)
+            lines.append(encode(line))
+            if len(lines) == LINES_PER_CHUNK:
+                yield "\n".join(lines) + "\n"
+                lines.clear()
+        if lines:
+            yield "\n".join(lines) + "\n"
@@ -1,6 +1,8 @@
+from typing import Iterable, Iterator
+
 from .base_view import IViewer
 
-from ..database.db_schema import DbSchema
+from ..database.db_schema import ContactDictTypeAlias
 
 
 class MarkdownView(IViewer):
@@ -9,14 +11,11 @@ class MarkdownView(IViewer):
         return "md"
 
     @classmethod
-    def render(self, db: DbSchema) -> str:
-        lines = []
-        for book_name in db.books:
-            lines.append(f"# Address Book: {book_name}\n\n")
-            lines.append("## Contacts\n")
-            for contact_id in db.books[book_name]:
-                contact_as_dict = db.contacts[contact_id]
-                lines.append("### Contact\n")
-                for key, value in contact_as_dict.items():
-                    lines.append(f"- **{key}**: {value}\n")
-        return "".join(lines)
+    def render_book(
+        cls, name: str, contacts: Iterable[ContactDictTypeAlias]
+    ) -> Iterator[str]:
+        yield f"# Address Book: {name}\n\n## Contacts\n"
+        for contact_as_dict in contacts:
+            yield "### Contact\n" + "".join(
+                f"- **{key}**: {value}\n" for key, value in contact_as_dict.items()
+            )
@@ -0,0 +1,83 @@
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import IO, Iterable, Iterator, List, Optional, Type
+
+from .base_view import BookViewTypeAlias, IViewer
+
+#: Default number of contacts rendered by a worker task
+DEFAULT_TASK_CONTACTS = 20000
+
+
+def _partition(
+    books: Iterable[BookViewTypeAlias], task_contacts: int
+) -> Iterator[List[BookViewTypeAlias]]:
+    """Group books into tasks of about `task_contacts` contacts, in order."""
+    task = []
+    size = 0
+    for name, contacts in books:
+        contacts = list(contacts)
+        task.append((name, contacts))
+        # Empty books still cost a heading
+        size += max(1, len(contacts))
+        if size >= task_contacts:
+            yield task
+            task = []
+            size = 0
+    if task:
+        yield task
+
+
+def _render_books(viewer: Type[IViewer], books: List[BookViewTypeAlias]) -> str:
+    return "".join(
+        chunk
+        for name, contacts in books
+        for chunk in viewer.render_book(name, contacts)
+    )
+
+
+def write_parallel(
+    viewer: Type[IViewer],
+    books: Iterable[BookViewTypeAlias],
+    file: IO[str],
+    workers: Optional[int] = None,
+    task_contacts: int = DEFAULT_TASK_CONTACTS,
+) -> int:
+    """Write the rendering of books to a text file like `IViewer.write`, rendering
+    groups of books in a pool of `workers` processes.
+
+    The books are split into tasks of about `task_contacts` contacts, sent to the
+    workers with their contacts, and the rendered tasks are written in order. At
+    most two tasks per worker are in flight, so memory stays bounded whatever the
+    size of the database. The viewer is sent to the workers by reference: it must
+    be importable by them, as any class defined at module level.
+
+    Args:
+        viewer (Type[IViewer]): The viewer.
+        books (Iterable[BookViewTypeAlias]): The books, see `iter_books`.
+        file (IO[str]): The file-like object to write to.
+        workers (Optional[int]): The number of processes, the number of CPUs if None.
+        task_contacts (int): The number of contacts rendered by a task.
+
+    Returns:
+        int: The number of characters written.
+    """
+    workers = workers or os.cpu_count() or 1
+    written = 0
+
+    def write(text: str):
+        nonlocal written
+        file.write(text)
+        written += len(text)
+
+    write(viewer.header())
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        for task in _partition(books, task_contacts):
+            pending.append(executor.submit(_render_books, viewer, task))
+            if len(pending) >= 2 * workers:
+                write(pending.popleft().result())
+        while pending:
+            write(pending.popleft().result())
+    write(viewer.footer())
+    return written
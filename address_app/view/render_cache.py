@@ -0,0 +1,163 @@
+import hashlib
+import json
+from collections import OrderedDict
+from dataclasses import dataclass
+from threading import Lock
+from typing import Hashable, Iterable, Optional, Tuple, Type
+
+from .base_view import IViewer, iter_books
+from ..database.db_schema import DbSchema, ContactDictTypeAlias
+
+#: Default maximum size of the cached renderings, in characters
+DEFAULT_RENDER_CACHE_SIZE = 1 << 26
+
+
+@dataclass
+class RenderCacheStats:
+    """Counters of a RenderCache."""
+
+    #: Renderings returned whole, the database generation being unchanged
+    document_hits: int = 0
+    #: Book renderings reused, the contents of the book being unchanged
+    hits: int = 0
+    #: Books rendered
+    misses: int = 0
+    #: Renderings dropped because the cache was full
+    evictions: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        """The share of books whose rendering was reused."""
+        requests = self.hits + self.misses
+        return self.hits / requests if requests else 0.0
+
+
+def _contents_fingerprint(contacts: Iterable[ContactDictTypeAlias]) -> str:
+    """Fingerprint of what a book renders: its contacts in order, with their fields
+    in order.
+    """
+    contents = [list(contact.items()) for contact in contacts]
+    encoded = json.dumps(contents, separators=(",", ":")).encode("utf-8")
+    return hashlib.blake2b(encoded, digest_size=16).hexdigest()
+
+
+class RenderCache:
+    """Thread-safe cache of renderings, with least recently used eviction.
+
+    The rendering of every book is cached per format under the fingerprint of its
+    contents, so rendering a database again only renders the books that changed
+    and reuses the others. When the database is identified by a `scope` (e.g. its
+    storage file) and carries its version (see `DbSchema.version`), the whole
+    rendering is also cached for that version and returned without looking at the
+    books while the database is unchanged. Versions start over when a storage is
+    deleted, so the rendering is cached for the `incarnation` of the storage too
+    (see `IStorage.incarnation`), which tells the databases apart when the delete
+    was made by another process; `invalidate` drops the renderings of a scope.
+
+    Args:
+        max_size (int): Maximum total size of the cached renderings, in characters.
+    """
+
+    def __init__(self, max_size: int = DEFAULT_RENDER_CACHE_SIZE):
+        self._max_size = max_size
+        self._size = 0
+        self._lock = Lock()
+        self._entries: "OrderedDict[Hashable, Tuple[object, str]]" = OrderedDict()
+        self.stats = RenderCacheStats()
+
+    @property
+    def max_size(self) -> int:
+        return self._max_size
+
+    def configure(self, max_size: int = DEFAULT_RENDER_CACHE_SIZE):
+        """Change the maximum size of the cache, evicting renderings beyond it now."""
+        with self._lock:
+            self._max_size = max_size
+            self._evict()
+
+    def _get(self, key: Hashable, tag: object) -> Optional[str]:
+        entry = self._entries.get(key)
+        if entry is None or entry[0] != tag:
+            return None
+        self._entries.move_to_end(key)
+        return entry[1]
+
+    def _put(self, key: Hashable, tag: object, text: str):
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self._size -= len(old[1])
+        if len(text) > self._max_size:
+            return
+        self._entries[key] = (tag, text)
+        self._size += len(text)
+        self._evict()
+
+    def _evict(self):
+        while self._size > self._max_size:
+            _, (_, text) = self._entries.popitem(last=False)
+            self._size -= len(text)
+            self.stats.evictions += 1
+
+    def render(
+        self,
+        viewer: Type[IViewer],
+        db: DbSchema,
+        books: Optional[Iterable[str]] = None,
+        offset: int = 0,
+        limit: Optional[int] = None,
+        scope: Optional[Hashable] = None,
+        incarnation: Optional[Hashable] = None,
+    ) -> str:
+        """Return the rendering of a database by `viewer`, see `iter_books` for
+        the selection of books.
+        """
+        format = viewer.format()
+        books = None if books is None else tuple(books)
+        document_key = ("document", scope, format, books, offset, limit)
+        cache_document = scope is not None and db.version is not None
+        generation = (incarnation, db.version)
+        if cache_document:
+            with self._lock:
+                document = self._get(document_key, generation)
+                if document is not None:
+                    self.stats.document_hits += 1
+                    return document
+
+        chunks = [viewer.header()]
+        for name, contacts in iter_books(db, books, offset, limit):
+            contacts = list(contacts)
+            key = ("book", scope, format, name)
+            fingerprint = _contents_fingerprint(contacts)
+            with self._lock:
+                fragment = self._get(key, fingerprint)
+                if fragment is not None:
+                    self.stats.hits += 1
+            if fragment is None:
+                fragment = "".join(viewer.render_book(name, contacts))
+                with self._lock:
+                    self.stats.misses += 1
+                    self._put(key, fingerprint, fragment)
+            chunks.append(fragment)
+        chunks.append(viewer.footer())
+        document = "".join(chunks)
+
+        if cache_document:
+            with self._lock:
+                self._put(document_key, generation, document)
+        return document
+
+    def invalidate(self, scope: Hashable):
+        """Drop the renderings of a scope."""
+        with self._lock:
+            for key in [key for key in self._entries if key[1] == scope]:
+                self._size -= len(self._entries.pop(key)[1])
+
+    def clear(self):
+        """Drop all the renderings and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+            self.stats = RenderCacheStats()
+
+    def __len__(self) -> int:
+        return len(self._entries)
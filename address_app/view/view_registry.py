@@ -1,16 +1,27 @@
-from typing import List
+from typing import IO, Hashable, Iterable, List, Optional, Type
 
 from ..base.logger import get_logger
+from .base_view import BookViewTypeAlias, IViewer, iter_books
+from .csv_view import CsvView
 from .html_view import HtmlView
+from .jsonl_view import JsonLinesView
 from .md_view import MarkdownView
+from .parallel_view import write_parallel
+from .render_cache import DEFAULT_RENDER_CACHE_SIZE, RenderCache
 
 from ..database.db_schema import DbSchema
 
 
 class ViewerRegistry:
+    """Registry of the viewers by format. Renderings are cached (see `RenderCache`),
+    so rendering a database again only renders the books that changed.
+    """
 
     _viewers = {}
 
+    #: Renderings of `render`, see `cache.stats` for its hit rates
+    cache = RenderCache()
+
     @classmethod
     def register_viewer(cls, viewer):
         cls._viewers[viewer.format()] = viewer
@@ -20,13 +31,75 @@ class ViewerRegistry:
         return cls._viewers.keys()
 
     @classmethod
-    def render(cls, db: DbSchema, format: str = "html"):
+    def get_viewer(cls, format: str) -> Optional[Type[IViewer]]:
         viewer = cls._viewers.get(format)
         if not viewer:
             get_logger().error(f"No viewer found for format {format}")
+        return viewer
+
+    @classmethod
+    def configure_cache(cls, max_size: int = DEFAULT_RENDER_CACHE_SIZE):
+        """Bound the size of the cached renderings, in characters."""
+        cls.cache.configure(max_size)
+
+    @classmethod
+    def clear_cache(cls):
+        """Drop the cached renderings, mainly for testing purposes."""
+        cls.cache.clear()
+
+    @classmethod
+    def render(
+        cls,
+        db: DbSchema,
+        format: str = "html",
+        books: Optional[Iterable[str]] = None,
+        offset: int = 0,
+        limit: Optional[int] = None,
+        scope: Optional[Hashable] = None,
+        incarnation: Optional[Hashable] = None,
+    ):
+        """Render a database, see `iter_books` for the selection of books.
+
+        Args:
+            scope (Optional[Hashable]): Identifies the database, e.g. its storage
+                file, to reuse its whole rendering while its version is unchanged,
+                see `RenderCache`.
+            incarnation (Optional[Hashable]): The incarnation of the storage, see
+                `IStorage.incarnation`, taken before the database was read.
+        """
+        viewer = cls.get_viewer(format)
+        if not viewer:
+            return
+        return cls.cache.render(viewer, db, books, offset, limit, scope, incarnation)
+
+    @classmethod
+    def write(
+        cls,
+        books: Iterable[BookViewTypeAlias],
+        file: IO[str],
+        format: str = "html",
+        workers: Optional[int] = 1,
+    ) -> Optional[int]:
+        """Write the rendering of books to a text file chunk by chunk, see
+        `IViewer.write` and `iter_books`.
+
+        Args:
+            workers (Optional[int]): Render in this many processes (all the CPUs if
+                None), see `write_parallel`. The default renders in this thread.
+
+        Returns:
+            Optional[int]: The number of characters written, None if there is no
+                viewer for the format.
+        """
+        viewer = cls.get_viewer(format)
+        if not viewer:
             return
-        return viewer.render(db)
+        if workers == 1:
+            return viewer.write(books, file)
+        return write_parallel(viewer, books, file, workers)
 
 
 ViewerRegistry.register_viewer(HtmlView)
 ViewerRegistry.register_viewer(MarkdownView)
+ViewerRegistry.register_viewer(JsonLinesView)
+ViewerRegistry.register_viewer(CsvView)
@@ -0,0 +1,89 @@
+"""File size and save/load time of DbFileSystemStorage per format and compression.
+
+Usage:
+    python -m benchmarks.bench_compression --contacts 10000 --formats json xml
+"""
+import argparse
+import logging
+import random
+import tempfile
+import time
+from pathlib import Path
+
+import address_app
+from address_app.base.consts import DURABILITY_NONE
+from address_app.database.db_schema import DbSchema
+from address_app.serialize import SerializeStrategyRegistry, get_supported_compressions
+from address_app.storage import DbFileSystemStorage
+
+STREETS = ["Main St", "Elm St", "Oak Ave", "Maple Rd", "Cedar Ln", "Park Blvd"]
+
+
+def make_schema(contacts: int) -> DbSchema:
+    rng = random.Random(0)
+    schema = DbSchema()
+    schema.contacts = {
+        i: {
+            "name": f"Name {i}",
+            "address": f"{rng.randint(1, 999)} {rng.choice(STREETS)}",
+            "phone_no": f"555-{rng.randint(0, 9999):04d}",
+        }
+        for i in range(contacts)
+    }
+    schema.books = {f"Book {b}": list(range(b, contacts, 10)) for b in range(10)}
+    return schema
+
+
+def disk_size(path: Path) -> int:
+    if path.is_dir():
+        return sum(child.stat().st_size for child in path.iterdir())
+    return path.stat().st_size
+
+
+def best_time(function, repeat: int) -> float:
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--contacts", type=int, default=10000)
+    parser.add_argument("--formats", nargs="+", default=["json", "xml", "yaml"])
+    parser.add_argument(
+        "--compressions", nargs="+", default=[""] + get_supported_compressions()
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    address_app.set_logger_level(logging.CRITICAL)
+    schema = make_schema(args.contacts)
+    print(f"{args.contacts} contacts, best of {args.repeat}")
+    print(
+        f"{'format':<10} {'size (KiB)':>11} {'ratio':>6} "
+        f"{'save (ms)':>10} {'load (ms)':>10}"
+    )
+    with tempfile.TemporaryDirectory() as root:
+        for base in args.formats:
+            plain_size = None
+            for suffix in args.compressions:
+                format = f"{base}.{suffix}" if suffix else base
+                strategy = SerializeStrategyRegistry.get_strategy_for_extension(format)
+                storage = DbFileSystemStorage(
+                    strategy, Path(root) / format, durability=DURABILITY_NONE
+                )
+                save = best_time(lambda: storage.write(schema), args.repeat)
+                load = best_time(lambda: storage.read().as_dict(), args.repeat)
+                size = disk_size(Path(storage.filepath_as_str()))
+                plain_size = plain_size or size
+                print(
+                    f"{format:<10} {size / 1024:>11.1f} {plain_size / size:>6.1f} "
+                    f"{save * 1000:>10.1f} {load * 1000:>10.1f}"
+                )
+
+
+if __name__ == "__main__":
+    main()
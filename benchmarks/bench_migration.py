@@ -0,0 +1,75 @@
+"""Time and peak memory of converting a DbFileSystemStorage to another format.
+
+The source database is generated item by item, so it can be larger than memory.
+Peak memory is the peak resident set size of the process (POSIX only).
+
+Usage:
+    python -m benchmarks.bench_migration --contacts 1000000 --source csv --target xml
+"""
+import argparse
+import logging
+import resource
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import address_app
+from address_app.base.consts import DURABILITY_NONE, RELATIVE_STORAGE_PATH
+from address_app.serialize import SerializeStrategyRegistry
+from address_app.storage import DbFileSystemStorage
+
+#: Contacts per generated book
+BOOK_SIZE = 1000
+
+
+def iter_contacts(contacts: int):
+    for i in range(contacts):
+        info = {"name": f"Name {i}", "address": f"{i} Main St", "phone_no": "555-1234"}
+        yield i, info
+
+
+def iter_books(contacts: int):
+    for start in range(0, contacts, BOOK_SIZE):
+        end = min(start + BOOK_SIZE, contacts)
+        yield f"Book {start // BOOK_SIZE}", list(range(start, end))
+
+
+def peak_rss_mib() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return peak / 2 ** 20 if sys.platform == "darwin" else peak / 2 ** 10
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--contacts", type=int, default=100000)
+    parser.add_argument("--source", default="csv")
+    parser.add_argument("--target", default="xml")
+    args = parser.parse_args()
+
+    address_app.set_logger_level(logging.CRITICAL)
+    source = SerializeStrategyRegistry.get_strategy_for_extension(args.source)
+    target = SerializeStrategyRegistry.get_strategy_for_extension(args.target)
+    with tempfile.TemporaryDirectory() as root:
+        path = Path(root) / f"{RELATIVE_STORAGE_PATH}.{source.format()}"
+        path.parent.mkdir(parents=True)
+        source.write_items(
+            iter_contacts(args.contacts), iter_books(args.contacts), path
+        )
+        storage = DbFileSystemStorage(source, root, durability=DURABILITY_NONE)
+
+        before = peak_rss_mib()
+        start = time.perf_counter()
+        storage.set_strategy(target)
+        elapsed = time.perf_counter() - start
+
+        print(
+            f"{args.contacts} contacts, {source.format()} -> {target.format()}: "
+            f"{elapsed:.2f} s, peak RSS {before:.1f} MiB before, "
+            f"{peak_rss_mib():.1f} MiB after"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""Time to render a database to a file, in a single thread and across 1 to N
+processes.
+
+Usage:
+    python -m benchmarks.bench_render --contacts 200000 --books 200 --format html
+"""
+import argparse
+import logging
+import os
+import random
+import tempfile
+import time
+from pathlib import Path
+
+import address_app
+from address_app.database.db_schema import DbSchema
+from address_app.view import ViewerRegistry, iter_books
+
+STREETS = ["Main St", "Elm St", "Oak Ave", "Maple Rd", "Cedar Ln", "Park Blvd"]
+
+
+def make_schema(contacts: int, books: int) -> DbSchema:
+    rng = random.Random(0)
+    schema = DbSchema()
+    schema.contacts = {
+        i: {
+            "name": f"Name {i}",
+            "address": f"{rng.randint(1, 999)} {rng.choice(STREETS)}",
+            "phone_no": f"555-{rng.randint(0, 9999):04d}",
+        }
+        for i in range(contacts)
+    }
+    schema.books = {f"Book {b}": list(range(b, contacts, books)) for b in range(books)}
+    return schema
+
+
+def render_time(schema: DbSchema, path: Path, format: str, workers: int) -> float:
+    start = time.perf_counter()
+    with open(path, "w", encoding="utf-8") as file:
+        ViewerRegistry.write(iter_books(schema), file, format, workers)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--contacts", type=int, default=200000)
+    parser.add_argument("--books", type=int, default=200)
+    parser.add_argument("--format", default="html")
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count())
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    address_app.set_logger_level(logging.CRITICAL)
+    schema = make_schema(args.contacts, args.books)
+    print(
+        f"{args.contacts} contacts in {args.books} books, {args.format}, "
+        f"best of {args.repeat}"
+    )
+    print(f"{'workers':<10} {'time (ms)':>10} {'speedup':>8}")
+    with tempfile.TemporaryDirectory() as root:
+        path = Path(root) / f"export.{args.format}"
+        # 1 renders in this thread; the others go through the process pool
+        baseline = None
+        for workers in range(1, args.max_workers + 1):
+            elapsed = min(
+                render_time(schema, path, args.format, workers)
+                for _ in range(args.repeat)
+            )
+            baseline = baseline or elapsed
+            print(f"{workers:<10} {elapsed * 1000:>10.1f} {baseline / elapsed:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+"""Load test of the HTTP API server: requests per second and latency percentiles.
+
+Opens `--connections` keep-alive connections that send requests back to back for
+`--duration` seconds, a `--write-ratio` share of them adding contacts, the others
+listing the contacts of a book. Without `--port` a server is started in a
+subprocess on a temporary database.
+
+Usage:
+    python -m benchmarks.bench_server --connections 64 --duration 10 --write-ratio 0.1
+    python -m benchmarks.bench_server --port 4000  # a running server
+"""
+import argparse
+import asyncio
+import json
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from typing import List, Optional, Tuple
+
+BOOK = "Load"
+
+
+async def request(
+    reader: asyncio.StreamReader,
+    writer: asyncio.StreamWriter,
+    method: str,
+    path: str,
+    payload: Optional[dict] = None,
+) -> Tuple[int, bytes]:
+    body = json.dumps(payload).encode("utf-8") if payload is not None else b""
+    writer.write(
+        f"{method} {path} HTTP/1.1\r\nHost: localhost\r\n"
+        f"Content-Length: {len(body)}\r\n\r\n".encode("latin-1")
+        + body
+    )
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        if name.lower() == "content-length":
+            length = int(value)
+    return status, await reader.readexactly(length)
+
+
+async def client(
+    port: int, deadline: float, write_ratio: float, seed: int, latencies: List[float]
+) -> int:
+    rng = random.Random(seed)
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    errors = 0
+    i = 0
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        if rng.random() < write_ratio:
+            i += 1
+            contact = {"name": f"Name {seed}-{i}", "address": f"{i} Main St"}
+            status, _ = await request(
+                reader, writer, "POST", f"/books/{BOOK}/contacts", contact
+            )
+        else:
+            status, _ = await request(reader, writer, "GET", f"/books/{BOOK}/contacts")
+        latencies.append(time.perf_counter() - start)
+        errors += status >= 400
+    writer.close()
+    return errors
+
+
+def percentile(values: List[float], q: float) -> float:
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+def wait_for_port(port: int, timeout: float = 10):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=1).close()
+            return
+        except OSError:
+            time.sleep(0.05)
+    raise TimeoutError(f"No server on port {port}")
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def run(args) -> None:
+    reader, writer = await asyncio.open_connection("127.0.0.1", args.port)
+    await request(reader, writer, "POST", "/books", {"name": BOOK})
+    for i in range(args.contacts):
+        contact = {"name": f"Seed {i}", "address": f"{i} Elm St"}
+        await request(reader, writer, "POST", f"/books/{BOOK}/contacts", contact)
+
+    latencies: List[float] = []
+    start = time.perf_counter()
+    deadline = start + args.duration
+    errors = await asyncio.gather(
+        *(
+            client(args.port, deadline, args.write_ratio, seed, latencies)
+            for seed in range(args.connections)
+        )
+    )
+    elapsed = time.perf_counter() - start
+    _, stats = await request(reader, writer, "GET", "/stats")
+    writer.close()
+
+    latencies.sort()
+    stats = json.loads(stats)
+    print(
+        f"{len(latencies)} requests, {args.connections} connections, "
+        f"{args.write_ratio:.0%} writes, {sum(errors)} errors"
+    )
+    print(f"{len(latencies) / elapsed:.0f} requests/s")
+    print(
+        f"latency p50 {percentile(latencies, 0.5) * 1000:.2f} ms, "
+        f"p99 {percentile(latencies, 0.99) * 1000:.2f} ms, "
+        f"max {latencies[-1] * 1000:.2f} ms"
+    )
+    print(f"average write batch {stats['avg_batch_size']:.1f} writes")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--port", type=int, default=None)
+    parser.add_argument("--connections", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=5)
+    parser.add_argument("--write-ratio", type=float, default=0.1)
+    parser.add_argument("--contacts", type=int, default=100)
+    parser.add_argument("--format", default="json")
+    args = parser.parse_args()
+
+    server = None
+    with tempfile.TemporaryDirectory() as root:
+        if args.port is None:
+            args.port = free_port()
+            server = subprocess.Popen(
+                [sys.executable, "-m", "address_app.server", "--root", root]
+                + ["--format", args.format, "--port", str(args.port)],
+                stderr=subprocess.DEVNULL,
+            )
+        try:
+            wait_for_port(args.port)
+            asyncio.run(run(args))
+        finally:
+            if server is not None:
+                server.terminate()
+                server.wait()
+
+
+if __name__ == "__main__":
+    main()
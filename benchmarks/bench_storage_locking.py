@@ -0,0 +1,100 @@
+"""Read throughput of DbFileSystemStorage with 1/4/16 concurrent readers.
+
+Readers run as threads (in-process readers-writer lock) or as processes (shared
+file lock). An optional writer changes the database in a loop meanwhile.
+
+Usage:
+    python -m benchmarks.bench_storage_locking --contacts 10000 --mode process
+"""
+import argparse
+import logging
+import multiprocessing
+import tempfile
+import threading
+import time
+
+import address_app
+from address_app.database.db_schema import DbSchema
+from address_app.serialize import SerializeStrategyRegistry
+from address_app.storage import DbFileSystemStorage
+
+
+def make_schema(contacts: int) -> DbSchema:
+    schema = DbSchema()
+    schema.contacts = {
+        i: {"name": f"Name {i}", "address": f"{i} Main St", "phone_no": "555-1234"}
+        for i in range(contacts)
+    }
+    schema.books = {"Book": list(range(contacts))}
+    return schema
+
+
+def open_storage(root: str, format: str) -> DbFileSystemStorage:
+    strategy = SerializeStrategyRegistry.get_strategy_for_extension(format)
+    return DbFileSystemStorage(strategy, root)
+
+
+def read_loop(root: str, format: str, deadline: float, counter) -> None:
+    storage = open_storage(root, format)
+    reads = 0
+    while time.monotonic() < deadline:
+        storage.read()
+        reads += 1
+    with counter.get_lock():
+        counter.value += reads
+
+
+def write_loop(root: str, format: str, deadline: float, schema: DbSchema) -> None:
+    storage = open_storage(root, format)
+    writes = 0
+    while time.monotonic() < deadline:
+        # Unchanged data would not be written again
+        writes += 1
+        schema.contacts[0]["phone_no"] = f"555-{writes:04d}"
+        storage.write(schema)
+
+
+def run(root, format, mode, readers, writer, duration, schema) -> float:
+    counter = multiprocessing.Value("q", 0)
+    deadline = time.monotonic() + duration
+    worker = threading.Thread if mode == "thread" else multiprocessing.Process
+    workers = [
+        worker(target=read_loop, args=(root, format, deadline, counter))
+        for _ in range(readers)
+    ]
+    if writer:
+        workers.append(worker(target=write_loop, args=(root, format, deadline, schema)))
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+    return counter.value / duration
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--contacts", type=int, default=10000)
+    parser.add_argument("--format", default="json")
+    parser.add_argument("--mode", choices=["thread", "process"], default="thread")
+    parser.add_argument("--readers", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--writer", action="store_true", help="add a writer")
+    parser.add_argument("--duration", type=float, default=3.0)
+    args = parser.parse_args()
+
+    address_app.set_logger_level(logging.CRITICAL)
+    schema = make_schema(args.contacts)
+    with tempfile.TemporaryDirectory() as root:
+        open_storage(root, args.format).write(schema)
+        print(
+            f"{args.contacts} contacts, format={args.format}, mode={args.mode}, "
+            f"writer={'yes' if args.writer else 'no'}"
+        )
+        for readers in args.readers:
+            rate = run(
+                root, args.format, args.mode, readers, args.writer, args.duration, schema
+            )
+            print(f"{readers:>3} readers: {rate:10.1f} reads/s")
+
+
+if __name__ == "__main__":
+    main()
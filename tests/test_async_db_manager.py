@@ -0,0 +1,79 @@
+import asyncio
+import shutil
+import unittest
+from unittest.mock import patch
+
+import address_app
+from address_app.base.book import Book
+
+ROOT = "tests/async"
+
+
+class TestAsyncDatabaseManager(unittest.TestCase):
+
+    def setUp(self):
+        address_app.AdbConnector.clear_instances()
+        self.adb = address_app.AsyncAdbConnector(ROOT, "json")
+
+    def tearDown(self):
+        self.adb.connector.delete()
+        self.adb.db_manager.shutdown()
+        address_app.AdbConnector.clear_instances()
+        shutil.rmtree(ROOT, ignore_errors=True)
+
+    def test_operations(self):
+        async def run():
+            db = self.adb.db_manager
+            await db.clear_database()
+            self.assertTrue(await db.create_empty_book("Friends"))
+            self.assertFalse(await db.add_book(Book("Friends", [])))
+            added = await db.add_contacts(
+                "Friends",
+                [("John Doe", "123 Main St", "555-1234"), ("Jane Doe", "1 Elm St", "")],
+            )
+            self.assertEqual([c.name for c in added], ["John Doe", "Jane Doe"])
+
+            lookups = [db.list_contacts("Friends") for _ in range(50)]
+            results = await asyncio.gather(*lookups)
+            self.assertTrue(all(len(contacts) == 2 for contacts in results))
+            books = await db.get_books(["Friends", "Missing"])
+            self.assertEqual(len(books["Friends"]), 2)
+            self.assertIsNone(books["Missing"])
+            found = await db.find_contacts_many([("Friends", {"name": "Jane*"})])
+            self.assertEqual([c.name for c in found[0]], ["Jane Doe"])
+            self.assertIn("John Doe", await self.adb.render("md"))
+
+        asyncio.run(run())
+
+    def test_cancelled_write(self):
+        """
+        A write whose caller is cancelled still runs to completion.
+        """
+        manager = self.adb.db_manager.manager
+
+        async def run():
+            started = asyncio.Event()
+            await self.adb.db_manager.clear_database()
+            loop = asyncio.get_running_loop()
+            original = manager.create_empty_book
+
+            def slow_create(name):
+                loop.call_soon_threadsafe(started.set)
+                return original(name)
+
+            with patch.object(manager, "create_empty_book", side_effect=slow_create):
+                task = asyncio.ensure_future(
+                    self.adb.db_manager.create_empty_book("Friends")
+                )
+                await started.wait()
+                task.cancel()
+                with self.assertRaises(asyncio.CancelledError):
+                    await task
+                await self.adb.flush()  # runs after the cancelled write
+            self.assertIsNotNone(await self.adb.db_manager.get_book("Friends"))
+
+        asyncio.run(run())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,138 @@
+import random
+import shutil
+import threading
+import time
+import unittest
+from pathlib import Path
+
+import address_app
+from address_app.serialize import SerializeStrategyRegistry
+from address_app.storage import DbFileSystemStorage
+from address_app.database import DatabaseManager
+from address_app.database.change_feed import (
+    RELATIVE_CHANGE_LOG_PATH,
+    BookCreated,
+    BookRemoved,
+    ChangeLog,
+    ContactAdded,
+    ContactRemoved,
+    ContactUpdated,
+)
+
+ROOT = Path("tests/change_feed")
+
+
+class TestChangeFeed(unittest.TestCase):
+
+    def setUp(self):
+        address_app.AdbConnector.clear_instances()
+        self.adb = address_app.AdbConnector(ROOT, change_log=True)
+        self.db = self.adb.db_manager
+
+    def tearDown(self):
+        address_app.AdbConnector.clear_instances()
+        shutil.rmtree(ROOT, ignore_errors=True)
+
+    def test_subscribe(self):
+        events = []
+        unsubscribe = self.db.subscribe(events.append)
+        self.db.create_empty_book("Friends")
+        john = self.db.add_contact("Friends", "John Doe", "123 Main St", "555-1234")
+        self.db.add_contact("Friends", "John Doe", "123 Main St", "555-1234")
+        self.db.update_contact("John Doe", "123 Main St", "555-0000")
+        self.assertIsNone(self.db.update_contact("Jane Doe", "456 Elm St", "555"))
+        self.db.remove_book("Friends")
+        unsubscribe()
+        self.db.create_empty_book("Work")
+
+        self.assertEqual(
+            events,
+            [
+                BookCreated("Friends"),
+                ContactAdded("Friends", john.id, john.as_dict()),
+                ContactUpdated(
+                    john.id,
+                    {
+                        "name": "John Doe",
+                        "address": "123 Main St",
+                        "phone_no": "555-0000",
+                    },
+                ),
+                BookRemoved("Friends"),
+                ContactRemoved(john.id),
+            ],
+        )
+
+    def test_failing_observer(self):
+        def fail(event):
+            raise RuntimeError("observer failure")
+
+        events = []
+        self.db.subscribe(fail)
+        self.db.subscribe(events.append)
+        self.assertTrue(self.db.create_empty_book("Friends"))
+        self.assertEqual(events, [BookCreated("Friends")])
+
+    def test_change_log(self):
+        self.db.apply_batch([("add_book", "Friends"), ("add_book", "Work")])
+        self.db.add_contact("Work", "Jane Doe", "456 Elm St", "555-6789")
+
+        log = ChangeLog(ROOT / "adb" / "adb.changes")
+        events, offset = log.read()
+        self.assertEqual([event.seq for event in events], [1, 2, 3])
+        self.assertEqual(events[2].contact["name"], "Jane Doe")
+
+        # Consumers only read the events logged since their offset
+        self.db.clear_database()
+        events, offset = log.read(offset)
+        self.assertEqual(
+            [event.kind() for event in events],
+            ["book_removed", "book_removed", "contact_removed"],
+        )
+        self.assertEqual(log.read(offset), ([], offset))
+        self.assertEqual(log.last_seq, 6)
+
+    def test_log_order(self):
+        """
+        Writers with their own storage and log append in the order they wrote, so
+        replaying the log gives the database.
+        """
+        strategy = SerializeStrategyRegistry.get_strategy_for_extension("json")
+
+        class SlowStorage(DbFileSystemStorage):
+            # Leaves time for other writers between a write and its events
+            def write(self, data, expected_version=None):
+                version = super().write(data, expected_version)
+                time.sleep(random.uniform(0, 0.01))
+                return version
+
+        def writer(i):
+            storage = SlowStorage(strategy, ROOT)
+            db = DatabaseManager(storage, ChangeLog(ROOT / RELATIVE_CHANGE_LOG_PATH))
+            for j in range(5):
+                db.create_empty_book(f"Book {j}")
+                db.add_contact(f"Book {j}", f"Name {i}", "123 Main St", "555")
+                if (i + j) % 2:
+                    db.remove_book(f"Book {j}")
+
+        threads = [threading.Thread(target=writer, args=(i,)) for i in range(6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        books = {}
+        for event in ChangeLog(ROOT / RELATIVE_CHANGE_LOG_PATH):
+            if isinstance(event, BookCreated):
+                self.assertNotIn(event.book, books)
+                books[event.book] = set()
+            elif isinstance(event, BookRemoved):
+                del books[event.book]
+            elif isinstance(event, ContactAdded):
+                books[event.book].add(event.contact_id)
+        stored = self.db.get_database_content().books
+        self.assertEqual(books, {name: set(ids) for name, ids in stored.items()})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,72 @@
+import multiprocessing
+import shutil
+import unittest
+from pathlib import Path
+
+from address_app.base.exceptions import VersionConflictException
+from address_app.database import DatabaseManager
+from address_app.serialize import SerializeStrategyRegistry
+from address_app.storage import StorageFactory
+
+ROOT = Path("tests/concurrency")
+WRITERS = 8
+CONTACTS_PER_WRITER = 25
+
+
+def create_storage(kind: str = "filesystem"):
+    strategy = SerializeStrategyRegistry.get_strategy_for_extension("json")
+    options = {"durability": "none"} if kind == "filesystem" else {}
+    return StorageFactory.create_storage(kind, strategy, ROOT, **options)
+
+
+def add_contacts(kind: str, writer: int):
+    db = DatabaseManager(create_storage(kind))
+    for i in range(CONTACTS_PER_WRITER):
+        name = f"Writer {writer} Contact {i}"
+        if db.add_contact("Shared", name, f"{i} Main St", "555-1234") is None:
+            raise RuntimeError(f"Failed to add {name}")
+
+
+class TestOptimisticConcurrency(unittest.TestCase):
+
+    def tearDown(self):
+        shutil.rmtree(ROOT, ignore_errors=True)
+
+    def test_compare_and_swap(self):
+        for kind in ("filesystem", "sqlite"):
+            with self.subTest(kind):
+                storage = create_storage(kind)
+                storage.write(storage.read())
+                first, second = storage.read(), storage.read()
+                first.books["First"] = []
+                version = storage.write(first, expected_version=first.version)
+                self.assertEqual(version, second.version + 1)
+                second.books["Second"] = []
+                with self.assertRaises(VersionConflictException):
+                    storage.write(second, expected_version=second.version)
+                self.assertEqual(sorted(storage.read().books), ["First"])
+                storage.delete()
+
+    def test_no_lost_updates(self):
+        """
+        Writer processes adding contacts to the same book at the same time, each with
+        a read-modify-write of the whole file, lose none of them.
+        """
+        DatabaseManager(create_storage()).create_empty_book("Shared")
+        context = multiprocessing.get_context("spawn")
+        writers = [
+            context.Process(target=add_contacts, args=("filesystem", writer))
+            for writer in range(WRITERS)
+        ]
+        for writer in writers:
+            writer.start()
+        for writer in writers:
+            writer.join(60)
+        self.assertEqual([writer.exitcode for writer in writers], [0] * WRITERS)
+
+        contacts = DatabaseManager(create_storage()).list_contacts("Shared")
+        self.assertEqual(len(contacts), WRITERS * CONTACTS_PER_WRITER)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,138 @@
+import shutil
+import threading
+import time
+import unittest
+from unittest.mock import Mock
+
+import address_app
+from address_app.connector_pool import ConnectorPool
+
+
+class TestConnectorPool(unittest.TestCase):
+
+    def tearDown(self):
+        for root in ("tests/pool_a", "tests/pool_b"):
+            shutil.rmtree(root, ignore_errors=True)
+
+    def test_lru_eviction(self):
+        pool = ConnectorPool(max_size=2)
+        a, b, c = Mock(), Mock(), Mock()
+        self.assertIs(pool.get("a", lambda: a), a)
+        pool.get("b", lambda: b)
+        self.assertIs(pool.get("a", Mock), a, "Should hit")
+        pool.get("c", lambda: c)  # evicts b, the least recently used
+
+        self.assertNotIn("b", pool)
+        b.close.assert_called_once()
+        a.close.assert_not_called()
+        self.assertEqual((pool.stats.hits, pool.stats.misses), (1, 3))
+        self.assertEqual(pool.stats.evictions, 1)
+
+        pool.configure(max_size=1)
+        a.close.assert_called_once()
+        self.assertEqual(len(pool), 1)
+
+    def test_idle_ttl(self):
+        now = [0.0]
+        pool = ConnectorPool(idle_ttl=10, clock=lambda: now[0])
+        a, b = Mock(), Mock()
+        pool.get("a", lambda: a)
+        now[0] = 5
+        pool.get("b", lambda: b)
+        now[0] = 12
+        pool.get("b", Mock)
+        self.assertNotIn("a", pool)
+        a.close.assert_called_once()
+        now[0] = 30
+        self.assertEqual(pool.evict_idle(), 1)
+        self.assertEqual(pool.stats.expirations, 2)
+
+    def test_concurrent_creation(self):
+        """
+        Threads asking for the same new key get a single instance.
+        """
+        pool = ConnectorPool()
+        created = []
+
+        def factory():
+            time.sleep(0.05)
+            created.append(object())
+            return created[-1]
+
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(pool.get("a", factory)))
+            for _ in range(8)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(created), 1)
+        self.assertTrue(all(result is created[0] for result in results))
+
+    def test_creation_handoff(self):
+        """
+        A thread arriving as the creation lock is dropped finds the new entry.
+        """
+        pool = ConnectorPool()
+        inner = pool._lock
+        created = []
+        late = []
+
+        class HandoffLock:
+            armed = False
+
+            def __enter__(self):
+                return inner.__enter__()
+
+            def __exit__(self, *exc_info):
+                inner.__exit__(*exc_info)
+                if self.armed and not pool._creating:
+                    self.armed = False
+                    late.append(pool.get("a", factory))
+
+        pool._lock = HandoffLock()
+
+        def factory():
+            pool._lock.armed = not created
+            created.append(Mock())
+            return created[-1]
+
+        first = pool.get("a", factory)
+        self.assertEqual(len(created), 1)
+        self.assertIs(late[0], first)
+        self.assertIs(pool.get("a", factory), first)
+
+    def test_adb_connector_pool(self):
+        address_app.AdbConnector.clear_instances()
+        try:
+            address_app.AdbConnector.configure_pool(max_size=1)
+            adb = address_app.AdbConnector("tests/pool_a")
+            self.assertIs(address_app.AdbConnector("tests/../tests/pool_a"), adb)
+            address_app.AdbConnector("tests/pool_b")
+            self.assertIsNot(address_app.AdbConnector("tests/pool_a"), adb)
+        finally:
+            address_app.AdbConnector.configure_pool()
+            for root in ("tests/pool_a", "tests/pool_b"):
+                address_app.AdbConnector(root).delete()
+            address_app.AdbConnector.clear_instances()
+
+
+    def test_adb_connector_close(self):
+        address_app.AdbConnector.clear_instances()
+        try:
+            adb = address_app.AdbConnector("tests/pool_a", write_behind=True)
+            adb.close()
+            reopened = address_app.AdbConnector("tests/pool_a", write_behind=True)
+            self.assertIsNot(reopened, adb)
+            reopened.db_manager.create_empty_book("Y")
+            reopened.close()
+            db = address_app.AdbConnector("tests/pool_a").db_manager
+            self.assertIn("Y", db.get_database_content().books)
+        finally:
+            address_app.AdbConnector("tests/pool_a").delete()
+            address_app.AdbConnector.clear_instances()
+
+if __name__ == "__main__":
+    unittest.main()
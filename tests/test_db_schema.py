@@ -0,0 +1,71 @@
+import unittest
+from address_app.database.db_schema import DbSchema
+
+
+class TestDbSchema(unittest.TestCase):
+
+    def setUp(self):
+        self.db_schema = DbSchema(
+            contacts={
+                1: {"name": "John Doe", "address": "123 Main St", "phone_no": None},
+                2: {"name": "Jane Doe", "address": "456 Elm St", "phone_no": "5"},
+            },
+            books={"TestBook": [1, 2], "EmptyBook": []},
+        )
+
+    def test_equality(self):
+        same = DbSchema(
+            contacts={
+                2: {"phone_no": "5", "address": "456 Elm St", "name": "Jane Doe"},
+                1: {"name": "John Doe", "address": "123 Main St", "phone_no": None},
+            },
+            books={"EmptyBook": [], "TestBook": [1, 2]},
+        )
+        self.assertEqual(self.db_schema, same)
+        self.assertEqual(self.db_schema.fingerprint(), same.fingerprint())
+
+        same.books["TestBook"] = [2, 1]
+        self.assertNotEqual(self.db_schema, same, "Should compare contact order")
+        self.assertNotEqual(self.db_schema.fingerprint(), same.fingerprint())
+
+    def test_diff(self):
+        other = DbSchema(
+            contacts={
+                1: {"name": "John Doe", "address": "124 Main St", "phone_no": None},
+                3: {"name": "Craig Denver", "address": "456 Elm St", "phone_no": None},
+            },
+            books={"TestBook": [1, 3], "NewBook": []},
+        )
+        diff = self.db_schema.diff(other)
+        self.assertEqual(diff.added_contacts, [3])
+        self.assertEqual(diff.removed_contacts, [2])
+        self.assertEqual(diff.changed_contacts, [1])
+        self.assertEqual(diff.added_books, ["NewBook"])
+        self.assertEqual(diff.removed_books, ["EmptyBook"])
+        self.assertEqual(diff.changed_books, ["TestBook"])
+        self.assertTrue(diff)
+        self.assertFalse(self.db_schema.diff(self.db_schema), "Should have no change")
+
+    def test_snapshot(self):
+        snapshot = self.db_schema.freeze()
+        self.assertTrue(snapshot.is_frozen)
+        self.assertIs(snapshot.freeze(), snapshot, "Should not copy a snapshot")
+        self.assertEqual(snapshot, self.db_schema)
+        with self.assertRaises(TypeError):
+            snapshot.contacts[1]["name"] = "Jane Roe"
+        with self.assertRaises(TypeError):
+            snapshot.books["NewBook"] = ()
+
+        version = snapshot.evolve(
+            contacts={3: {"name": "Craig Denver", "address": "1 Oak St"}},
+            books={"TestBook": [1, 2, 3]},
+        )
+        self.assertEqual(snapshot.books["TestBook"], (1, 2))
+        self.assertNotIn(3, snapshot.contacts, "Should not change the old version")
+        self.assertEqual(version.books["TestBook"], (1, 2, 3))
+        self.assertIs(version.contacts[1], snapshot.contacts[1], "Should share")
+        self.assertIs(version.books["EmptyBook"], snapshot.books["EmptyBook"])
+
+
+if __name__ == "__main__":
+    unittest.main()
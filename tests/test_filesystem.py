@@ -1,7 +1,15 @@
+import shutil
+import threading
+import time
 import unittest
 from pathlib import Path
+from unittest.mock import patch
 import address_app.storage
+import address_app.database
+from address_app.storage.backup import remove_backups
+from address_app.storage.durability import GroupCommit
 from address_app.base.consts import DEFAULT_ROOT_PATH, RELATIVE_STORAGE_PATH
+from address_app.base.exceptions import BackupNotFoundException, MigrationException
 from address_app.database.db_schema import DbSchema
 from address_app.serialize import SerializeStrategyRegistry
 
@@ -31,8 +39,241 @@ class TestFileSystemStorage(unittest.TestCase):
         db_contents = self.file_storage.read()
         self.assertTrue(isinstance(db_contents, DbSchema), "Database should be empty")
 
+    def test_atomic_write(self):
+        """
+        Test that writes replace the storage file without leaving temporary files.
+        """
+        strategy = SerializeStrategyRegistry.get_strategy_for_extension("json")
+        self.file_storage = address_app.storage.DbFileSystemStorage(
+            strategy, "tests", durability="full"
+        )
+        db_schema = DbSchema(books={"TestBook": []})
+        self.file_storage.write(db_schema)
+        self.assertEqual(self.file_storage.read(), db_schema)
+        storage_dir = Path(self.file_storage.filepath_as_str()).parent
+        self.assertEqual(
+            sorted(p.name for p in storage_dir.iterdir()),
+            ["adb.json", "adb.lock", "adb.version"],
+            "Should not leave temporary files",
+        )
+
+    def test_skip_unchanged_write(self):
+        """
+        Test that writing unchanged data or a duplicate contact does not touch disk.
+        """
+        strategy = SerializeStrategyRegistry.get_strategy_for_extension("json")
+        self.file_storage = address_app.storage.DbFileSystemStorage(strategy, "tests")
+        db = address_app.database.DatabaseManager(self.file_storage)
+        db.create_empty_book("TestBook")
+        db.add_contact("TestBook", "John Doe", "123 Main St", "555-1234")
+        path = Path(self.file_storage.filepath_as_str())
+        stat = path.stat()
+
+        with patch("address_app.storage.filesystem_storage.atomic_write") as write:
+            db.add_contact("TestBook", "John Doe", "123 Main St", "555-1234")
+            self.file_storage.write(self.file_storage.read())
+            write.assert_not_called()
+        self.assertEqual(self.file_storage.skipped_writes, 1)
+        self.assertEqual(path.stat().st_mtime_ns, stat.st_mtime_ns)
+
+        # A file changed by someone else is written again
+        path.write_text('{"contacts": {}, "books": {}}')
+        self.file_storage.write(DbSchema(books={"TestBook": []}))
+        self.assertEqual(self.file_storage.read(), DbSchema(books={"TestBook": []}))
+
+    def test_snapshot(self):
+        """
+        Test that snapshots are shared until the database changes.
+        """
+        strategy = SerializeStrategyRegistry.get_strategy_for_extension("json")
+        self.file_storage = address_app.storage.DbFileSystemStorage(strategy, "tests")
+        self.file_storage.write(DbSchema(books={"TestBook": []}))
+        snapshot = self.file_storage.snapshot()
+        self.assertTrue(snapshot.is_frozen)
+        with patch.object(self.file_storage, "read") as read:
+            self.assertIs(self.file_storage.snapshot(), snapshot)
+            read.assert_not_called()
+
+        self.file_storage.write(DbSchema(books={"TestBook": [], "Other": []}))
+        self.assertEqual(
+            sorted(self.file_storage.snapshot().books), ["Other", "TestBook"]
+        )
+        self.assertEqual(sorted(snapshot.books), ["TestBook"])
+
+    def test_group_commit(self):
+        """
+        Test that concurrent updates are coalesced into fewer commits, without
+        losing any of them.
+        """
+        committed = []
+
+        def slow_commit(mutations):
+            time.sleep(0.02)
+            committed.append(len(mutations))
+            return [None] * len(mutations)
+
+        group_commit = GroupCommit(slow_commit)
+        threads = [
+            threading.Thread(target=group_commit.update, args=(lambda data: True,))
+            for _ in range(8)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(group_commit.writes, 8)
+        self.assertLess(group_commit.commits, 8, "Should coalesce updates")
+        self.assertEqual(sum(committed), 8)
+
+        # Through the storage: every concurrent add_contact is stored
+        root = Path("tests/group_commit")
+        strategy = SerializeStrategyRegistry.get_strategy_for_extension("json")
+        storage = address_app.storage.DbFileSystemStorage(
+            strategy, root, group_commit=True
+        )
+        db = address_app.database.DatabaseManager(storage)
+        db.create_empty_book("Friends")
+        threads = [
+            threading.Thread(
+                target=db.add_contact,
+                args=("Friends", f"Name {i}", "123 Main St", "555-1234"),
+            )
+            for i in range(16)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(db.list_contacts("Friends")), 16)
+        self.assertEqual(storage.read().version, storage._group_commit.commits)
+        storage.delete()
+        shutil.rmtree(root, ignore_errors=True)
+        self.file_storage = None
+
+        # A failing mutation fails alone, and its changes are not written
+        def fail(data):
+            data.books["Broken"] = []
+            raise ValueError("mutation failure")
+
+        storage = address_app.storage.DbFileSystemStorage(
+            strategy, root, group_commit=True
+        )
+        with self.assertRaises(ValueError):
+            storage.update(fail)
+        self.assertNotIn("Broken", storage.read().books)
+        storage.delete()
+        shutil.rmtree(root, ignore_errors=True)
+
+    def test_migration(self):
+        """
+        Test that changing the strategy converts the data, replaces a stale file of
+        the new format and removes the old file.
+        """
+        db_schema = DbSchema(
+            contacts={
+                1: {"name": "John Doe", "address": "123 Main St", "phone_no": None},
+                2: {"name": "Jane Doe", "address": "456 Elm St", "phone_no": "5"},
+            },
+            books={"TestBook": [2, 1], "EmptyBook": []},
+        )
+        self.file_storage = address_app.storage.DbFileSystemStorage(
+            SerializeStrategyRegistry.get_strategy_for_extension("csv"), "tests"
+        )
+        storage_dir = Path(self.file_storage.filepath_as_str()).parent
+        (storage_dir / "adb.xml.gz").write_bytes(b"stale")
+        self.file_storage.write(db_schema)
+
+        for format in ("xml.gz", "idx", "json"):
+            self.file_storage.set_strategy(
+                SerializeStrategyRegistry.get_strategy_for_extension(format)
+            )
+            self.assertEqual(self.file_storage.read().as_dict(), db_schema.as_dict())
+            self.assertEqual(
+                sorted(p.name for p in storage_dir.iterdir()),
+                sorted([f"adb.{format}", "adb.lock", "adb.version"]),
+                "Should only keep the new file",
+            )
+
+        # A conversion that loses data is rejected and the storage is unchanged
+        yaml_strategy = SerializeStrategyRegistry.get_strategy_for_extension("yaml")
+        original_write_items = yaml_strategy.write_items.__func__
+
+        def drop_first_contact(cls, contacts, books, path):
+            next(iter(contacts))
+            original_write_items(cls, contacts, books, path)
+
+        with patch.object(
+            yaml_strategy, "write_items", classmethod(drop_first_contact)
+        ):
+            with self.assertRaises(MigrationException):
+                self.file_storage.set_strategy(yaml_strategy)
+        self.assertTrue(self.file_storage.filepath_as_str().endswith("adb.json"))
+        self.assertEqual(self.file_storage.read().as_dict(), db_schema.as_dict())
+        self.assertEqual(
+            sorted(p.name for p in storage_dir.iterdir()),
+            ["adb.json", "adb.lock", "adb.version"],
+        )
+
+    def test_incremental_backup(self):
+        """
+        Test that backups after the first only write the changed segments, link the
+        others, and that every backup restores its own state.
+        """
+        backup_dir = Path("tests/backups")
+        self.addCleanup(shutil.rmtree, backup_dir, ignore_errors=True)
+        self.file_storage = address_app.storage.DbFileSystemStorage(
+            SerializeStrategyRegistry.get_strategy_for_extension("json"), "tests"
+        )
+        with self.assertRaises(BackupNotFoundException):
+            self.file_storage.restore(backup_dir)
+        data = DbSchema(
+            contacts={i << 24: {"name": f"Name {i}"} for i in range(100)},
+            books={f"Book {i}": [i << 24] for i in range(100)},
+        )
+        self.file_storage.write(data)
+        full = self.file_storage.backup(backup_dir)
+        self.assertTrue(full.full)
+        self.assertEqual(full.changed, full.segments)
+
+        data.books["Book 0"].append(1 << 24)
+        del data.books["Book 1"]
+        data.contacts[99 << 24]["name"] = "Renamed"
+        self.file_storage.write(data)
+        delta = self.file_storage.backup(backup_dir)
+        self.assertEqual(delta.parent, full.id)
+        self.assertEqual(delta.changed, 2)
+        self.assertLess(delta.bytes_written, full.bytes_written / 10)
+        linked = [
+            p for p in (backup_dir / delta.id).iterdir() if p.stat().st_nlink > 1
+        ]
+        self.assertEqual(len(linked), delta.segments - delta.changed)
+
+        self.file_storage.write(DbSchema())
+        self.file_storage.restore(backup_dir, full.id)
+        self.assertEqual(self.file_storage.read().books["Book 0"], [0])
+        self.file_storage.restore(backup_dir)
+        self.assertEqual(self.file_storage.read(), data)
+
+        # Later backups stay complete once earlier ones are removed
+        self.assertEqual(remove_backups(backup_dir, 1), [full.id])
+        self.file_storage.write(DbSchema())
+        self.file_storage.restore(backup_dir)
+        self.assertEqual(self.file_storage.read(), data)
+        self.assertEqual(
+            [b.id for b in self.file_storage.list_backups(backup_dir)], [delta.id]
+        )
+
+        # A backup interrupted before its directory was renamed is ignored
+        shutil.copytree(backup_dir / delta.id, backup_dir / f"{delta.id}.1.tmp")
+        self.assertEqual(
+            [b.id for b in self.file_storage.list_backups(backup_dir)], [delta.id]
+        )
+        self.assertEqual(self.file_storage.backup(backup_dir).parent, delta.id)
+
     def tearDown(self) -> None:
-        self.file_storage.delete()
+        if self.file_storage is not None:
+            self.file_storage.delete()
 
 
 if __name__ == "__main__":
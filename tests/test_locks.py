@@ -0,0 +1,57 @@
+import threading
+import time
+import unittest
+from pathlib import Path
+
+from address_app.storage.locks import RWLock, FileLock
+
+
+class TestLocks(unittest.TestCase):
+
+    def test_rw_lock(self):
+        """
+        Readers hold the lock together, a writer waits until all of them are done.
+        """
+        lock = RWLock()
+        events = []
+
+        def writer():
+            with lock.writing():
+                events.append("write")
+
+        lock.acquire_read()
+        lock.acquire_read()  # a second reader does not block
+        thread = threading.Thread(target=writer)
+        thread.start()
+        time.sleep(0.05)
+        self.assertEqual(events, [], "Writer should wait for readers")
+        lock.release_read()
+        lock.release_read()
+        thread.join(1)
+        self.assertEqual(events, ["write"], "Writer should run after readers")
+
+    def test_file_lock(self):
+        """
+        Shared file locks coexist, an exclusive one waits for them.
+        """
+        path = Path("tests/adb_test.lock")
+        events = []
+
+        def writer():
+            with FileLock(path).exclusive():
+                events.append("write")
+
+        try:
+            with FileLock(path).shared(), FileLock(path).shared():
+                thread = threading.Thread(target=writer)
+                thread.start()
+                time.sleep(0.05)
+                self.assertEqual(events, [], "Exclusive lock should wait")
+            thread.join(1)
+            self.assertEqual(events, ["write"])
+        finally:
+            path.unlink()
+
+
+if __name__ == "__main__":
+    unittest.main()
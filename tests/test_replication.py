@@ -0,0 +1,72 @@
+import shutil
+import unittest
+from pathlib import Path
+
+import address_app
+from address_app.replication import Follower
+
+ROOT = Path("tests/replication")
+
+
+class TestReplication(unittest.TestCase):
+
+    def setUp(self):
+        address_app.AdbConnector.clear_instances()
+        self.primary = address_app.AdbConnector(ROOT / "primary", replicate=True)
+
+    def tearDown(self):
+        address_app.AdbConnector.clear_instances()
+        shutil.rmtree(ROOT, ignore_errors=True)
+
+    def test_follow(self):
+        db = self.primary.db_manager
+        db.create_empty_book("Friends")
+        db.add_contact("Friends", "John Doe", "123 Main St", "555-1234")
+
+        follower = Follower(ROOT / "primary", ROOT / "replica", format="xml")
+        self.assertEqual(follower.poll(), 3)
+        self.assertEqual(follower.metrics.lag_entries, 0)
+        self.assertEqual(
+            follower.db_manager.list_contacts("Friends")[0].name, "John Doe"
+        )
+
+        db.create_empty_book("Work")
+        db.add_contact("Work", "Jane Doe", "456 Elm St", "555-6789")
+        db.remove_book("Friends")
+        follower.poll()
+        self.assertEqual(
+            follower.db_manager.get_database_content(),
+            db.get_database_content(),
+        )
+        follower.close()
+
+        # A restarted follower resumes from its cursor
+        db.add_contact("Work", "John Doe", "123 Main St", "555-1234")
+        follower = Follower(ROOT / "primary", ROOT / "replica", format="xml")
+        self.assertEqual(follower.metrics.applied_seq, 6)
+        self.assertEqual(follower.poll(), 1)
+        self.assertEqual(len(follower.db_manager.list_contacts("Work")), 2)
+        follower.close()
+
+    def test_background(self):
+        follower = Follower(ROOT / "primary", ROOT / "replica")
+        follower.start(interval_ms=10)
+        db = self.primary.db_manager
+        db.apply_batch([("add_book", f"Book {i}") for i in range(10)])
+        # The first entry holds the database as it was, the second the batch
+        self.assertTrue(follower.wait_for(2, timeout=5))
+        follower.stop()
+        self.assertEqual(len(follower.db_manager.list_books()), 10)
+
+        # Deleting the primary starts a new log, and the follower starts over
+        self.primary.delete()
+        db.create_empty_book("New")
+        self.assertEqual(follower.poll(), 1)
+        self.assertEqual(
+            [book.name for book in follower.db_manager.list_books()], ["New"]
+        )
+        follower.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,12 +1,15 @@
 import unittest
 from unittest.mock import patch
 from pathlib import Path
+from shutil import rmtree
 from address_app.serialize import (
     SerializeStrategyRegistry,
     get_supported_formats,
+    get_supported_compressions,
 )
 from address_app.base.consts import DEFAULT_ROOT_PATH, RELATIVE_STORAGE_PATH
 from address_app.database.db_schema import DbSchema
+from address_app.base.exceptions import UnsupportedFormatVersionException
 
 
 class TestSerialize(unittest.TestCase):
@@ -39,7 +42,7 @@ class TestSerialize(unittest.TestCase):
         # print(yaml_res)
 
         self.assertEqual(
-            len(get_supported_formats()), 3, "Should have 3 supported formats"
+            len(get_supported_formats()), 6, "Should have 6 supported formats"
         )
 
         res_db_schema = self.json_strategy.deserialize(json_res)
@@ -47,6 +50,164 @@ class TestSerialize(unittest.TestCase):
             db_schema, res_db_schema, "Should deserialize to original schema"
         )
 
+    def test_binary_serialize(self):
+        db_schema = DbSchema()
+        db_schema.books = {"TestBook": [3914141904, 3914141905], "EmptyBook": []}
+        db_schema.contacts = {
+            3914141904: {
+                "name": "John Doe",
+                "address": "123 Main St",
+                "phone_no": "555-1234",
+            },
+            3914141905: {
+                "name": "Jane Doe",
+                "address": "123 Main St",
+                "phone_no": None,
+            },
+        }
+
+        bin_strategy = SerializeStrategyRegistry.get_strategy_for_extension("bin")
+        bin_res = bin_strategy.serialize(db_schema)
+        self.assertIsInstance(bin_res, bytes, "Should serialize to bytes")
+
+        res_db_schema = bin_strategy.deserialize(bin_res)
+        self.assertEqual(
+            res_db_schema.contacts, db_schema.contacts, "Should restore contacts"
+        )
+        self.assertEqual(res_db_schema.books, db_schema.books, "Should restore books")
+
+        with self.assertRaises(UnsupportedFormatVersionException):
+            bin_strategy.deserialize(bin_res[:4] + b"\xff\x00" + bin_res[6:])
+
+    def test_csv_serialize(self):
+        db_schema = DbSchema()
+        db_schema.books = {"TestBook": [3914141904], "EmptyBook": []}
+        db_schema.contacts = {
+            3914141904: {
+                "name": "Doe, John",
+                "address": "123 Main St",
+                "phone_no": None,
+            }
+        }
+
+        csv_strategy = SerializeStrategyRegistry.get_strategy_for_extension("csv")
+        res_db_schema = csv_strategy.deserialize(csv_strategy.serialize(db_schema))
+        self.assertEqual(
+            res_db_schema.contacts, db_schema.contacts, "Should restore contacts"
+        )
+        self.assertEqual(res_db_schema.books, db_schema.books, "Should restore books")
+
+        path = Path("tests/adb_csv_test")
+        try:
+            csv_strategy.write_file(db_schema, path)
+            self.assertTrue((path / "contacts.csv").exists())
+            self.assertTrue((path / "book_members.csv").exists())
+            self.assertEqual(
+                list(csv_strategy.iter_book_members(path)),
+                [("TestBook", 3914141904), ("EmptyBook", None)],
+                "Should stream book members row by row",
+            )
+            res_db_schema = csv_strategy.read_file(path)
+            self.assertEqual(res_db_schema.books, db_schema.books)
+        finally:
+            rmtree(path, ignore_errors=True)
+
+    def test_indexed_serialize(self):
+        db_schema = DbSchema()
+        db_schema.books = {"TestBook": [3914141905, 3914141904], "EmptyBook": []}
+        db_schema.contacts = {
+            3914141905: {
+                "name": "Jane Doe",
+                "address": "456 Elm St",
+                "phone_no": None,
+            },
+            3914141904: {
+                "name": "John Doe",
+                "address": "123 Main St",
+                "phone_no": "555-1234",
+            },
+        }
+
+        idx_strategy = SerializeStrategyRegistry.get_strategy_for_extension("idx")
+        res_db_schema = idx_strategy.deserialize(idx_strategy.serialize(db_schema))
+        self.assertEqual(
+            res_db_schema.as_dict(), db_schema.as_dict(), "Should restore schema"
+        )
+        self.assertEqual(
+            res_db_schema.contacts[3914141904],
+            db_schema.contacts[3914141904],
+            "Should decode a single contact",
+        )
+        self.assertNotIn(1, res_db_schema.contacts, "Should not find unknown id")
+
+        # Changes are layered over the decoded data
+        res_db_schema.books["TestBook"].append(1)
+        res_db_schema.contacts[1] = {"name": "A", "address": "B", "phone_no": None}
+        del res_db_schema.books["EmptyBook"]
+        self.assertEqual(len(res_db_schema.contacts), 3)
+        self.assertEqual(list(res_db_schema.books), ["TestBook"])
+        self.assertEqual(len(list(res_db_schema.contacts.items())), 3)
+        self.assertEqual(res_db_schema.books["TestBook"][-1], 1)
+
+        # Reading a book is not a change; `close` unmaps the file
+        path = Path("tests/indexed.idx")
+        self.addCleanup(path.unlink)
+        idx_strategy.write_file(db_schema, path)
+        mapped = idx_strategy.read_file(path)
+        self.assertEqual(mapped.books["TestBook"], [3914141905, 3914141904])
+        self.assertFalse(mapped.books._changed, "Should not record reads")
+        idx_strategy.close(mapped)
+        with self.assertRaises(ValueError):
+            mapped.contacts[3914141904]
+
+    def test_compressed_serialize(self):
+        db_schema = DbSchema()
+        db_schema.books = {"TestBook": [3914141904], "EmptyBook": []}
+        db_schema.contacts = {
+            3914141904: {
+                "name": "John Doe",
+                "address": "123 Main St",
+                "phone_no": None,
+            }
+        }
+
+        self.assertTrue(SerializeStrategyRegistry.is_supported("json.gz"))
+        self.assertFalse(SerializeStrategyRegistry.is_supported("json.zip"))
+        self.assertNotIn("json.gz", get_supported_formats())
+        self.assertEqual(get_supported_compressions(), ["gz", "bz2", "xz"])
+
+        path = Path(DEFAULT_ROOT_PATH) / "compressed"
+        path.mkdir(parents=True, exist_ok=True)
+        try:
+            for format in get_supported_formats():
+                for suffix in get_supported_compressions():
+                    strategy = SerializeStrategyRegistry.get_strategy_for_extension(
+                        f"{format}.{suffix}"
+                    )
+                    self.assertEqual(strategy.format(), f"{format}.{suffix}")
+                    self.assertIs(
+                        strategy,
+                        SerializeStrategyRegistry.get_strategy_for_extension(
+                            f"{format}.{suffix}"
+                        ),
+                        "Should reuse the wrapper class",
+                    )
+                    file_path = path / f"adb.{strategy.format()}"
+                    strategy.write_file(db_schema, file_path)
+                    res_db_schema = strategy.read_file(file_path)
+                    self.assertEqual(
+                        res_db_schema.as_dict(),
+                        db_schema.as_dict(),
+                        f"Should restore schema from {strategy.format()}",
+                    )
+                    self.assertEqual(
+                        strategy.serialize(db_schema),
+                        file_path.read_bytes(),
+                        "Should compress deterministically",
+                    )
+        finally:
+            rmtree(path, ignore_errors=True)
+
     def tearDown(self) -> None:
         # self.file_storage.delete()
         pass
@@ -0,0 +1,142 @@
+import asyncio
+import json
+import shutil
+import unittest
+
+import address_app
+from address_app.server import AdbServer
+
+ROOT = "tests/server"
+
+
+async def _request(reader, writer, method, path, payload=None):
+    body = json.dumps(payload).encode("utf-8") if payload is not None else b""
+    writer.write(
+        f"{method} {path} HTTP/1.1\r\nHost: localhost\r\n"
+        f"Content-Length: {len(body)}\r\n\r\n".encode("latin-1")
+        + body
+    )
+    status = int((await reader.readline()).split()[1])
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line == b"\r\n":
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.lower()] = value.strip()
+    body = await reader.readexactly(int(headers["content-length"]))
+    if headers["content-type"].startswith("application/json"):
+        body = json.loads(body)
+    return status, body
+
+
+class TestAdbServer(unittest.TestCase):
+
+    def setUp(self):
+        address_app.AdbConnector.clear_instances()
+        self.adb = address_app.AsyncAdbConnector(ROOT, "json")
+
+    def tearDown(self):
+        self.adb.connector.delete()
+        self.adb.db_manager.shutdown()
+        address_app.AdbConnector.clear_instances()
+        shutil.rmtree(ROOT, ignore_errors=True)
+
+    def test_endpoints(self):
+        async def run():
+            await self.adb.db_manager.clear_database()
+            server = AdbServer(self.adb, batch_delay_ms=20)
+            await server.start(port=0)
+            reader, writer = await asyncio.open_connection("127.0.0.1", server.port)
+
+            def request(*args):
+                # Every request goes through the same keep-alive connection
+                return _request(reader, writer, *args)
+
+            self.assertEqual(
+                await request("POST", "/books", {"name": "My Friends"}),
+                (201, {"name": "My Friends", "size": 0}),
+            )
+            status, _ = await request("POST", "/books", {"name": "My Friends"})
+            self.assertEqual(status, 409)
+
+            contacts = "/books/My%20Friends/contacts"
+
+            # Concurrent writes on separate connections are batched
+            async def add(i):
+                r, w = await asyncio.open_connection("127.0.0.1", server.port)
+                contact = {"name": f"Name {i}", "address": "Main St", "phone_no": "1"}
+                result = await _request(r, w, "POST", contacts, contact)
+                w.close()
+                return result
+
+            results = await asyncio.gather(*(add(i) for i in range(10)))
+            self.assertTrue(all(status == 201 for status, _ in results))
+            self.assertLess(server.stats.batches, 10)
+
+            contact = {"name": "A", "address": "B"}
+            status, _ = await request("POST", "/books/Missing/contacts", contact)
+            self.assertEqual(status, 404)
+            status, _ = await request("POST", contacts, {"name": "", "address": "B"})
+            self.assertEqual(status, 400)
+
+            self.assertEqual(
+                await request("GET", "/books"),
+                (200, [{"name": "My Friends", "size": 10}]),
+            )
+            status, book = await request("GET", "/books/My%20Friends")
+            self.assertEqual(len(book["contacts"]), 10)
+            status, found = await request("GET", f"{contacts}?name=Name%201")
+            self.assertEqual([c["name"] for c in found], ["Name 1"])
+            for query in ("book_name=x", "foo=1"):
+                status, _ = await request("GET", f"{contacts}?{query}")
+                self.assertEqual(status, 400)
+            status, page = await request("GET", "/render?format=md")
+            self.assertEqual(status, 200)
+            self.assertIn(b"Name 9", page)
+            status, _ = await request("GET", "/nothing")
+            self.assertEqual(status, 404)
+
+            # A field of the wrong type fails alone, not the batch it is part of
+            async def add_book(name):
+                r, w = await asyncio.open_connection("127.0.0.1", server.port)
+                result = await _request(r, w, "POST", "/books", {"name": name})
+                w.close()
+                return result[0]
+
+            names = ["Work", 123, "Family", "  "]
+            statuses = await asyncio.gather(*(add_book(name) for name in names))
+            self.assertEqual(statuses, [201, 400, 201, 400])
+            phone = {"name": "A", "address": "B", "phone_no": 5}
+            status, _ = await request("POST", contacts, phone)
+            self.assertEqual(status, 400)
+
+            # Names and fields are escaped in the HTML rendering
+            await request("POST", "/books", {"name": "<script>alert(1)</script>"})
+            status, page = await request("GET", "/render?format=html")
+            self.assertNotIn(b"<script>", page)
+            self.assertIn(b"&lt;script&gt;", page)
+
+            writer.close()
+            await server.close()
+
+        asyncio.run(run())
+
+
+    def test_close(self):
+        async def run():
+            server = AdbServer(self.adb)
+            await server.start(port=0)
+            reader, writer = await asyncio.open_connection("127.0.0.1", server.port)
+            status, _ = await _request(reader, writer, "GET", "/books")
+            self.assertEqual(status, 200)
+
+            # An idle keep-alive connection does not hold the server open
+            await asyncio.wait_for(server.close(), 2)
+            self.assertEqual(await asyncio.wait_for(reader.read(), 2), b"")
+            writer.close()
+
+        asyncio.run(run())
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,77 @@
+import shutil
+import unittest
+from pathlib import Path
+
+import address_app
+from address_app.sharded_adb import HashRing, ShardedAdbConnector
+
+ROOT = Path("tests/sharded_adb")
+
+
+class TestHashRing(unittest.TestCase):
+
+    def test_minimal_movement(self):
+        keys = [f"Book {i}" for i in range(1000)]
+        ring = HashRing(["a", "b", "c"])
+        before = {key: ring.node(key) for key in keys}
+        ring.add("d")
+        moved = [key for key in keys if ring.node(key) != before[key]]
+        self.assertTrue(all(ring.node(key) == "d" for key in moved))
+        self.assertLess(len(moved), len(keys) / 2)
+
+
+class TestShardedAdbConnector(unittest.TestCase):
+
+    def setUp(self):
+        address_app.AdbConnector.clear_instances()
+        self.adb = ShardedAdbConnector([ROOT / "a", ROOT / "b"], "json")
+
+    def tearDown(self):
+        self.adb.close()
+        address_app.AdbConnector.clear_instances()
+        shutil.rmtree(ROOT, ignore_errors=True)
+
+    def test_routing(self):
+        db = self.adb.db_manager
+        for i in range(20):
+            db.create_empty_book(f"Book {i}")
+            db.add_contact(f"Book {i}", f"Name {i}", "Main St", "555-1234")
+        for root in self.adb.roots:
+            books = self.adb.connector(root).db_manager.list_books()
+            self.assertTrue(all(self.adb.root_of(b.name) == root for b in books))
+        self.assertEqual(len(db.list_books()), 20)
+        self.assertEqual(db.list_contacts("Book 3")[0].name, "Name 3")
+        found = db.search(name="Name 1?")
+        self.assertEqual(sorted(found), sorted(f"Book 1{i}" for i in range(10)))
+
+        moved = self.adb.add_root(ROOT / "c")
+        self.assertGreater(moved, 0)
+        self.assertLess(moved, 20)
+        self.assertEqual(len(db.list_books()), 20)
+        self.assertEqual(len(db.get_database_content().contacts), 20)
+        self.assertEqual(db.list_contacts("Book 3")[0].name, "Name 3")
+
+    def test_update_contact(self):
+        db = self.adb.db_manager
+        books = [f"Book {i}" for i in range(6)]
+        for book in books:
+            db.create_empty_book(book)
+            db.add_contact(book, "John Doe", "123 Main St", "555-1234")
+        self.assertEqual(len({self.adb.root_of(book) for book in books}), 2)
+
+        self.assertIsNotNone(db.update_contact("John Doe", "123 Main St", "555-0000"))
+        for book in books:
+            self.assertEqual(db.list_contacts(book)[0].phone_no, "555-0000")
+        self.assertIsNone(db.update_contact("Jane Doe", "456 Elm St", "555-0000"))
+
+    def test_tenant_key(self):
+        adb = ShardedAdbConnector(
+            [ROOT / "a", ROOT / "b"], shard_key=lambda name: name.split("/")[0]
+        )
+        roots = {adb.root_of(f"acme/{name}") for name in ("a", "b", "c", "d")}
+        self.assertEqual(len(roots), 1)
+        adb.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,57 @@
+import unittest
+import address_app.database
+from address_app.database.db_schema import DbSchema
+from address_app.serialize import SerializeStrategyRegistry
+from address_app.storage import ShardedFileSystemStorage
+
+
+class TestShardedStorage(unittest.TestCase):
+
+    def setUp(self):
+        strategy = SerializeStrategyRegistry.get_strategy_for_extension("json")
+        self.storage = ShardedFileSystemStorage(strategy, "tests", contact_shards=4)
+
+    def _mtimes(self):
+        return {
+            path.name: path.stat().st_mtime_ns
+            for path in self.storage._storage_filepath.iterdir()
+        }
+
+    def test_storage_operations(self):
+        db = address_app.database.DatabaseManager(self.storage)
+        db.create_empty_book("Book1")
+        db.create_empty_book("Book2")
+        db.add_contact("Book1", "John Doe", "123 Main St", "555-1234")
+        db.add_contact("Book1", "Jane Doe", "456 Elm St", "555-6789")
+        db.add_contact("Book2", "Craig Denver", "456 Elm St", "555-6789")
+
+        db_contents = self.storage.read()
+        self.assertEqual(len(db_contents.contacts), 3)
+        self.assertEqual(list(db_contents.books), ["Book1", "Book2"])
+        self.assertEqual(
+            [c.name for c in db.list_contacts("Book1")], ["John Doe", "Jane Doe"]
+        )
+
+        # Writing the same schema back touches no file
+        before = self._mtimes()
+        self.storage.write(db_contents)
+        self.assertEqual(before, self._mtimes(), "Should not rewrite unchanged shards")
+
+        # Changing one book rewrites only its file
+        db_contents.books["Book2"] = []
+        self.storage.write(db_contents)
+        after = self._mtimes()
+        changed = [name for name in after if after[name] != before[name]]
+        self.assertEqual(len(changed), 1, "Should rewrite only the changed book")
+
+        del db_contents.books["Book2"]
+        self.storage.write(db_contents)
+        self.assertEqual(list(self.storage.read_books()), ["Book1"])
+        self.assertIsNone(self.storage.read_book("Book2"))
+
+    def tearDown(self) -> None:
+        self.storage.delete()
+
+
+if __name__ == "__main__":
+    unittest.main()
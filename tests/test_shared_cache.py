@@ -0,0 +1,108 @@
+import multiprocessing
+import shutil
+import threading
+import time
+import unittest
+from unittest.mock import patch
+
+from address_app.database.db_schema import DbSchema
+from address_app.serialize import SerializeStrategyRegistry
+from address_app.storage import StorageFactory
+from address_app.storage.shared_cache import is_shared_cache_supported
+
+ROOT = "tests/shared_cache"
+
+
+def _create_storage():
+    strategy = SerializeStrategyRegistry.get_strategy_for_extension("json")
+    return StorageFactory.create_storage(
+        "filesystem", strategy, ROOT, shared_cache=True
+    )
+
+
+def _read_in_worker(queue):
+    storage = _create_storage()
+    with patch.object(storage.storage, "read", side_effect=AssertionError("parsed")):
+        data = storage.read()
+        queue.put((storage.generation, dict(data.books), data.contacts[1]["name"]))
+
+
+@unittest.skipUnless(is_shared_cache_supported(), "requires Python 3.8+")
+class TestSharedCacheStorage(unittest.TestCase):
+
+    def setUp(self):
+        self.storage = _create_storage()
+        data = DbSchema()
+        data.contacts = {1: {"name": "John", "address": "Main St", "phone_no": "1"}}
+        data.books = {"Friends": [1]}
+        self.storage.write(data)
+
+    def tearDown(self):
+        self.storage.delete()
+        shutil.rmtree(ROOT, ignore_errors=True)
+
+    def test_shared_between_processes(self):
+        """
+        A worker maps the published generation instead of parsing the storage file.
+        """
+        generation = self.storage.generation
+        self.assertGreater(generation, 0)
+        queue = multiprocessing.get_context("spawn").Queue()
+        worker = multiprocessing.get_context("spawn").Process(
+            target=_read_in_worker, args=(queue,)
+        )
+        worker.start()
+        result = queue.get(timeout=30)
+        worker.join()
+        self.assertEqual(result, (generation, {"Friends": [1]}, "John"))
+
+    def test_generations(self):
+        """
+        Writes publish a new generation, older snapshots keep their data, and a
+        storage file changed without the cache is read again.
+        """
+        other = _create_storage()
+        snapshot = other.snapshot()
+        self.assertEqual(other.generation, self.storage.generation)
+
+        data = self.storage.read()
+        data.books["Work"] = []
+        self.storage.write(data)
+        self.assertEqual(other.read().books["Work"], [])
+        self.assertEqual(other.generation, self.storage.generation)
+        self.assertNotIn("Work", snapshot.books)
+
+        time.sleep(0.01)  # a distinct modification time
+        data.books["Family"] = [1]
+        self.storage.storage.write(data)
+        self.assertIn("Family", other.read().books)
+        self.assertGreater(other.generation, self.storage.generation)
+
+
+    def test_concurrent_writers(self):
+        """
+        A writer through another cache cannot slip in between a write and its
+        publication, which would publish older data as the newer file.
+        """
+        other = _create_storage()
+        inner_write = self.storage.storage.write
+        thread = threading.Thread(
+            target=other.write, args=(DbSchema(books={"FromB": []}),)
+        )
+
+        def write_then_yield(data, expected_version=None):
+            version = inner_write(data, expected_version)
+            thread.start()
+            time.sleep(0.1)
+            return version
+
+        with patch.object(self.storage.storage, "write", write_then_yield):
+            self.storage.write(DbSchema(books={"FromA": []}))
+        thread.join()
+        self.assertEqual(list(self.storage.storage.read().books), ["FromB"])
+        self.assertEqual(list(self.storage.read().books), ["FromB"])
+        self.assertEqual(self.storage.read().version, other.read().version)
+
+
+if __name__ == "__main__":
+    unittest.main()
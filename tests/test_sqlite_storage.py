@@ -0,0 +1,83 @@
+import unittest
+import address_app.storage
+import address_app.database
+from address_app.database.db_schema import DbSchema
+from address_app.storage import StorageFactory
+
+
+class TestSqliteStorage(unittest.TestCase):
+
+    def setUp(self):
+        self.storage = StorageFactory.create_storage("sqlite", root="tests")
+        self.storage.write(DbSchema())
+
+    def test_storage_operations(self):
+        """
+        Test that the SQLite storage round-trips the whole schema.
+        """
+        db_schema = DbSchema()
+        db_schema.books = {"TestBook": [3914141905, 3914141904], "EmptyBook": []}
+        db_schema.contacts = {
+            3914141904: {
+                "name": "John Doe",
+                "address": "123 Main St",
+                "phone_no": "555-1234",
+            },
+            3914141905: {
+                "name": "Jane Doe",
+                "address": "456 Elm St",
+                "phone_no": None,
+            },
+        }
+        self.storage.write(db_schema)
+        res_db_schema = self.storage.read()
+        self.assertEqual(res_db_schema.contacts, db_schema.contacts)
+        self.assertEqual(res_db_schema.books, db_schema.books)
+        self.assertEqual(self.storage.read_book("TestBook"), [3914141905, 3914141904])
+        self.assertIsNone(self.storage.read_book("NoneBook"))
+
+        # Only the differences are written
+        changes = self.storage._connection.total_changes
+        self.storage.write(db_schema)
+        self.assertEqual(
+            self.storage._connection.total_changes, changes, "Should skip no-op write"
+        )
+        db_schema.contacts[3914141905] = {"name": "Jane Roe", "address": "456 Elm St"}
+        db_schema.books = {"EmptyBook": [3914141905], "NewBook": [3914141904]}
+        self.storage.write(db_schema)
+        res_db_schema = self.storage.read()
+        self.assertEqual(res_db_schema.contacts[3914141905]["name"], "Jane Roe")
+        self.assertEqual(res_db_schema.books, db_schema.books)
+        self.assertEqual(list(res_db_schema.books), ["EmptyBook", "NewBook"])
+
+    def test_database_contacts(self):
+        db = address_app.database.DatabaseManager(self.storage)
+        self.assertTrue(db.create_empty_book("TestBook"))
+        self.assertFalse(db.create_empty_book("TestBook"), "Should not add twice")
+
+        db.add_contact("TestBook", "John Doe", "123 Main St", "555-1234")
+        db.add_contact("TestBook", "Jane Doe", "456 Elm St", None)
+        db.add_contact("TestBook", "Craig Denver", "456 Elm St", "555-6789")
+        self.assertEqual(len(db.get_book("TestBook")), 3)
+
+        res = db.add_contact("TestBook", "John Doe", "123 Main St", "555-1234")
+        self.assertIsNone(res, "Should not add duplicate contact to TestBook")
+        res = db.add_contact("NoneBook", "John Doe", "123 Main St", "555-1234")
+        self.assertIsNone(res, "Should not add contact to NoneBook")
+
+        self.assertEqual(
+            [c.name for c in db.list_contacts("TestBook")],
+            ["John Doe", "Jane Doe", "Craig Denver"],
+            "Should keep insertion order",
+        )
+        self.assertEqual(len(db.find_contacts("TestBook", name="*Doe")), 2)
+        self.assertEqual(len(db.find_contacts("TestBook", address="456*")), 2)
+        self.assertEqual(len(db.find_contacts("TestBook", phone_no="555*")), 2)
+        self.assertEqual(len(db.find_contacts("TestBook", phone_no="*")), 3)
+
+    def tearDown(self) -> None:
+        self.storage.delete()
+
+
+if __name__ == "__main__":
+    unittest.main()
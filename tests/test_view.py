@@ -0,0 +1,149 @@
+import io
+import json
+import shutil
+import unittest
+
+import address_app
+from address_app.database.db_schema import DbSchema
+from address_app.view import ViewerRegistry, iter_books
+from address_app.view.html_view import HtmlView
+from address_app.view.parallel_view import write_parallel
+
+
+class TestView(unittest.TestCase):
+
+    def setUp(self):
+        self.db = DbSchema(
+            contacts={
+                1: {"name": "John Doe", "address": "123 Main St", "phone_no": "555"},
+                2: {"name": "Jane Doe", "address": "456 Elm St", "phone_no": "777"},
+            },
+            books={"Friends": [1, 2], "Work": [2], "Empty": []},
+        )
+
+    def test_render(self):
+        self.assertEqual(
+            ViewerRegistry.render(self.db, "html", books=["Work"]),
+            "<div><h1>Address Book: Work</h1><ul><li>name: Jane Doe</li>"
+            "<li>address: 456 Elm St</li><li>phone_no: 777</li></ul></div>",
+        )
+        self.assertEqual(
+            ViewerRegistry.render(self.db, "md", books=["Empty", "Missing"]),
+            "# Address Book: Empty\n\n## Contacts\n",
+        )
+        self.assertIsNone(ViewerRegistry.render(self.db, "pdf"))
+
+    def test_export_views(self):
+        self.db.contacts[2]["name"] = 'Jane "JD" Doe'
+        self.assertEqual(
+            ViewerRegistry.render(self.db, "csv", books=["Work", "Empty"]),
+            'book,name,address,phone_no\nWork,"Jane ""JD"" Doe",456 Elm St,777\n',
+        )
+        lines = ViewerRegistry.render(self.db, "jsonl").splitlines()
+        self.assertEqual(len(lines), 3)
+        self.assertEqual(
+            json.loads(lines[1]),
+            {
+                "book": "Friends",
+                "name": 'Jane "JD" Doe',
+                "address": "456 Elm St",
+                "phone_no": "777",
+            },
+        )
+
+    def test_write(self):
+        for format in ViewerRegistry.get_supported_formats():
+            with self.subTest(format=format):
+                file = io.StringIO()
+                books = iter_books(self.db)
+                written = ViewerRegistry.write(books, file, format)
+                rendered = ViewerRegistry.render(self.db, format)
+                self.assertEqual(file.getvalue(), rendered)
+                self.assertEqual(written, len(file.getvalue()))
+
+        # Chunks are written once they reach the chunk size
+        writes = []
+        file = io.StringIO()
+        file.write = writes.append
+        HtmlView.write(iter_books(self.db), file, chunk_size=50)
+        self.assertGreater(len(writes), 2)
+        self.assertEqual("".join(writes), HtmlView.render(self.db))
+
+    def test_write_parallel(self):
+        file = io.StringIO()
+        written = write_parallel(HtmlView, iter_books(self.db), file, 2, 1)
+        self.assertEqual(file.getvalue(), HtmlView.render(self.db))
+        self.assertEqual(written, len(file.getvalue()))
+
+    def test_pagination(self):
+        pages = [
+            [name for name, _ in iter_books(self.db, offset=offset, limit=2)]
+            for offset in (0, 2)
+        ]
+        self.assertEqual(pages, [["Friends", "Work"], ["Empty"]])
+
+
+class TestRenderCache(unittest.TestCase):
+
+    def setUp(self):
+        address_app.AdbConnector.clear_instances()
+        ViewerRegistry.clear_cache()
+        self.adb = address_app.AdbConnector("tests/render_cache")
+
+    def tearDown(self):
+        address_app.AdbConnector.clear_instances()
+        ViewerRegistry.clear_cache()
+        shutil.rmtree("tests/render_cache", ignore_errors=True)
+
+    def test_cache(self):
+        db = self.adb.db_manager
+        db.apply_batch([("add_book", f"Book {i}") for i in range(4)])
+        first = self.adb.render("html")
+        stats = ViewerRegistry.cache.stats
+        self.assertEqual((stats.hits, stats.misses), (0, 4))
+
+        # Unchanged database: the whole rendering is reused
+        self.assertEqual(self.adb.render("html"), first)
+        self.assertEqual(stats.document_hits, 1)
+
+        # Only the changed book is rendered again
+        db.add_contact("Book 2", "John Doe", "123 Main St", "555-1234")
+        rendered = self.adb.render("html")
+        self.assertEqual((stats.hits, stats.misses), (3, 5))
+        self.assertEqual(rendered, HtmlView.render(db.get_database_content()))
+        self.assertIn("John Doe", rendered)
+        self.assertEqual(stats.hit_rate, 3 / 8)
+
+    def test_deleted_elsewhere(self):
+        """
+        A database deleted by another process is not served its old rendering.
+        """
+        db = self.adb.db_manager
+        db.create_empty_book("Old")
+        self.assertEqual(db.get_database_content().version, 2)
+        self.assertIn("Old", self.adb.render("html"))
+
+        # Not through the connector, so the cache is not invalidated
+        other = address_app.storage.DbFileSystemStorage(
+            self.adb._storage._strategy, "tests/render_cache"
+        )
+        other.delete()
+        db.create_empty_book("New")
+        db.create_empty_book("Newer")
+        self.assertEqual(db.get_database_content().version, 2)
+        rendered = self.adb.render("html")
+        self.assertIn("New", rendered)
+        self.assertNotIn("Old", rendered)
+
+    def test_eviction(self):
+        db = self.adb.db_manager
+        db.apply_batch([("add_book", f"Book {i}") for i in range(4)])
+        ViewerRegistry.configure_cache(max_size=100)
+        self.adb.render("md")
+        self.assertGreater(ViewerRegistry.cache.stats.evictions, 0)
+        self.assertLessEqual(len(ViewerRegistry.cache), 3)
+        ViewerRegistry.configure_cache()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,85 @@
+import time
+import unittest
+from unittest.mock import patch
+import address_app.database
+from address_app.base.exceptions import StorageClosedException
+from address_app.database.db_schema import DbSchema
+from address_app.storage import StorageFactory
+from address_app.serialize import SerializeStrategyRegistry
+
+
+class TestWriteBehindStorage(unittest.TestCase):
+
+    def setUp(self):
+        strategy = SerializeStrategyRegistry.get_strategy_for_extension("json")
+        self.storage = StorageFactory.create_storage(
+            "filesystem",
+            strategy,
+            "tests",
+            write_behind={"flush_interval_ms": 50, "flush_every": 3},
+        )
+        self.storage.write(DbSchema())
+        self.storage.flush()
+
+    def test_write_behind(self):
+        db = address_app.database.DatabaseManager(self.storage)
+        db.create_empty_book("TestBook")
+        db.add_contact("TestBook", "John Doe", "123 Main St", "555-1234")
+        self.assertEqual(len(db.get_book("TestBook")), 1, "Should read from memory")
+        self.assertEqual(self.storage.metrics.queue_depth, 2)
+
+        # The third mutation triggers a flush
+        db.add_contact("TestBook", "Jane Doe", "456 Elm St", "555-6789")
+        deadline = time.monotonic() + 2
+        while self.storage.metrics.queue_depth and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(self.storage.metrics.queue_depth, 0, "Should have flushed")
+        self.assertEqual(len(self.storage.storage.read().books["TestBook"]), 2)
+
+        db.create_empty_book("OtherBook")
+        self.storage.close()
+        self.assertIn("OtherBook", self.storage.storage.read().books)
+        self.assertGreaterEqual(self.storage.metrics.flushes, 2)
+
+        # Closed: changes would never be flushed
+        with self.assertRaises(StorageClosedException):
+            db.create_empty_book("LateBook")
+        with self.assertRaises(StorageClosedException):
+            self.storage.write(DbSchema())
+        self.assertNotIn("LateBook", self.storage.storage.read().books)
+
+    def test_failed_flush(self):
+        db = address_app.database.DatabaseManager(self.storage)
+        with patch.object(self.storage.storage, "write", side_effect=OSError("full")):
+            for i in range(4):
+                db.create_empty_book(f"Book {i}")
+            time.sleep(0.3)
+            # Retried every flush interval rather than in a loop
+            failed = self.storage.metrics.failed_flushes
+            self.assertGreaterEqual(failed, 1)
+            self.assertLessEqual(failed, 8)
+        self.storage.flush()
+        self.assertIn("Book 3", self.storage.storage.read().books)
+
+    def test_snapshot_isolation(self):
+        db = address_app.database.DatabaseManager(self.storage)
+        db.create_empty_book("TestBook")
+        db.add_contact("TestBook", "John Doe", "123 Main St", "555-1234")
+        snapshot = db.get_database_content()
+
+        db.add_contact("TestBook", "Jane Doe", "456 Elm St", "555-6789")
+        self.assertEqual(len(snapshot.books["TestBook"]), 1, "Should pin a version")
+        self.assertEqual(len(snapshot.contacts), 1)
+        self.assertEqual(len(db.get_book("TestBook")), 2)
+        current = db.get_database_content()
+        for cid, info in snapshot.contacts.items():
+            self.assertIs(current.contacts[cid], info, "Should share contacts")
+        with self.assertRaises(TypeError):
+            snapshot.books["TestBook"] = []
+
+    def tearDown(self) -> None:
+        self.storage.delete()
+
+
+if __name__ == "__main__":
+    unittest.main()